@@ -0,0 +1,244 @@
+"""Address validation with the checksums each chain defines.
+
+An address with a typo fails its checksum here instead of costing a
+request to a rate-limited explorer. Bitcoin: Base58Check (P2PKH, P2SH)
+and Bech32 / Bech32m segwit (BIP-173, BIP-350). Ethereum: the EIP-55
+mixed-case checksum, over Keccak-256 (pycryptodome or pysha3 when
+installed, pure Python otherwise). XRP: Base58Check over the Ripple
+alphabet. Solana addresses carry no checksum; they must decode to a
+32-byte public key.
+
+Every pattern is compiled once at import. screen() validates a batch,
+deciding each distinct address once and rejecting malformed ones on the
+pattern alone before anything is decoded.
+"""
+import hashlib
+import re
+
+# Keccak-256 in C when a library providing it is installed, else the pure-Python code below
+try:
+    from Crypto.Hash import keccak as _pycryptodome_keccak
+except ImportError:
+    _pycryptodome_keccak = None
+try:
+    import sha3 as _pysha3
+except ImportError:
+    _pysha3 = None
+
+
+BITCOIN_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+XRP_ALPHABET = 'rpshnaf39wBUDNEGHJKLM4PQRST7VWXYZ2bcdeCg65jkm8oFqi1tuvAxyz'
+
+# Base58Check version bytes of pay-to-pubkey-hash and pay-to-script-hash
+BITCOIN_VERSIONS = {0x00, 0x05}
+BITCOIN_TESTNET_VERSIONS = {0x6f, 0xc4}
+
+BECH32_CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+BECH32_CONST = 1
+BECH32M_CONST = 0x2bc830a3
+_BECH32_GENERATOR = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+
+_BASE58_PATTERN = re.compile(r'[1-9A-HJ-NP-Za-km-z]{25,35}')
+_BECH32_PATTERN = re.compile(r'(bc|tb)1[02-9ac-hj-np-z]{6,87}|(BC|TB)1[02-9AC-HJ-NP-Z]{6,87}')
+_ETHEREUM_PATTERN = re.compile(r'0x[0-9a-fA-F]{40}')
+_XRP_PATTERN = re.compile(r'r[1-9A-HJ-NP-Za-km-z]{24,34}')
+_SOLANA_PATTERN = re.compile(r'[1-9A-HJ-NP-Za-km-z]{32,44}')
+
+_DIGITS = {alphabet: {char: value for value, char in enumerate(alphabet)}
+           for alphabet in (BITCOIN_ALPHABET, XRP_ALPHABET)}
+_BECH32_DIGITS = {char: value for value, char in enumerate(BECH32_CHARSET)}
+
+
+def b58decode(text, alphabet=BITCOIN_ALPHABET):
+    """Bytes of a Base58 string, leading zero digits kept as zero bytes; KeyError if not Base58"""
+    digits = _DIGITS[alphabet]
+    number = 0
+    for char in text:
+        number = number * 58 + digits[char]
+    zeros = len(text) - len(text.lstrip(alphabet[0]))
+    return b'\0' * zeros + number.to_bytes((number.bit_length() + 7) // 8, 'big')
+
+
+def base58check(text, alphabet=BITCOIN_ALPHABET):
+    """Payload of a Base58Check string, None when the checksum does not match"""
+    try:
+        raw = b58decode(text, alphabet)
+    except KeyError:
+        return None
+    payload, checksum = raw[:-4], raw[-4:]
+    if len(payload) < 1 or hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        return None
+    return payload
+
+
+def _bech32_polymod(values):
+    checksum = 1
+    for value in values:
+        top = checksum >> 25
+        checksum = (checksum & 0x1ffffff) << 5 ^ value
+        for i in range(5):
+            if top >> i & 1:
+                checksum ^= _BECH32_GENERATOR[i]
+    return checksum
+
+
+def segwit_decode(address):
+    """(hrp, witness version, program) of a Bech32/Bech32m segwit address, None if invalid.
+
+    Version 0 must use Bech32 and a 20 or 32-byte program, versions 1 to
+    16 Bech32m (BIP-350).
+    """
+    if len(address) > 90 or address != address.lower() and address != address.upper():
+        return None
+    address = address.lower()
+    hrp, _, data = address.rpartition('1')
+    if not hrp or len(data) < 7:
+        return None
+    try:
+        values = [_BECH32_DIGITS[char] for char in data]
+    except KeyError:
+        return None
+    expanded = [ord(char) >> 5 for char in hrp] + [0] + [ord(char) & 31 for char in hrp]
+    const = _bech32_polymod(expanded + values)
+
+    version = values[0]
+    if version > 16 or const != (BECH32_CONST if version == 0 else BECH32M_CONST):
+        return None
+    # 5-bit groups back to bytes, the leftover bits must be zero padding
+    acc = bits = 0
+    program = bytearray()
+    for value in values[1:-6]:
+        acc = acc << 5 | value
+        bits += 5
+        if bits >= 8:
+            bits -= 8
+            program.append(acc >> bits & 0xff)
+    if bits >= 5 or acc & ((1 << bits) - 1):
+        return None
+    if not 2 <= len(program) <= 40 or version == 0 and len(program) not in (20, 32):
+        return None
+    return hrp, version, bytes(program)
+
+
+def is_bitcoin_address(address, testnet=False):
+    """Legacy (1..., 3...) or segwit (bc1...) address with a valid checksum.
+
+    Testnet addresses (m, n, 2, tb1) only pass with testnet=True; the
+    explorer serves mainnet.
+    """
+    if _BECH32_PATTERN.fullmatch(address):
+        decoded = segwit_decode(address)
+        return decoded is not None and decoded[0] == ('tb' if testnet else 'bc')
+    if not _BASE58_PATTERN.fullmatch(address):
+        return False
+    payload = base58check(address)
+    return (payload is not None and len(payload) == 21
+            and payload[0] in (BITCOIN_TESTNET_VERSIONS if testnet else BITCOIN_VERSIONS))
+
+
+# Keccak-256 as Ethereum uses it (not the NIST SHA3-256 of hashlib, which pads differently)
+_KECCAK_ROUND_CONSTANTS = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+)
+_KECCAK_ROTATIONS = (
+    (0, 36, 3, 41, 18), (1, 44, 10, 45, 2), (62, 6, 43, 15, 61), (28, 55, 25, 21, 56), (27, 20, 39, 8, 14),
+)
+# Rho and pi as one table: lane x + 5 * y moves to lane y + 5 * ((2x + 3y) % 5), rotated
+_KECCAK_MOVES = tuple((x + 5 * y, y + 5 * ((2 * x + 3 * y) % 5), _KECCAK_ROTATIONS[x][y])
+                      for x in range(5) for y in range(5))
+_LANE = (1 << 64) - 1
+_KECCAK_RATE = 136
+
+
+def _keccak_f(state):
+    for round_constant in _KECCAK_ROUND_CONSTANTS:
+        c = [state[x] ^ state[x + 5] ^ state[x + 10] ^ state[x + 15] ^ state[x + 20] for x in range(5)]
+        d = [c[x - 1] ^ ((c[(x + 1) % 5] << 1 | c[(x + 1) % 5] >> 63) & _LANE) for x in range(5)]
+        b = [0] * 25
+        for source, target, rotation in _KECCAK_MOVES:
+            lane = state[source] ^ d[source % 5]
+            b[target] = (lane << rotation | lane >> (64 - rotation)) & _LANE if rotation else lane
+        for row in range(0, 25, 5):
+            for x in range(5):
+                state[row + x] = b[row + x] ^ (~b[row + (x + 1) % 5] & b[row + (x + 2) % 5])
+        state[0] ^= round_constant
+
+
+def keccak256(data):
+    """Keccak-256 digest of bytes, from pycryptodome or pysha3 when installed"""
+    if _pycryptodome_keccak is not None:
+        return _pycryptodome_keccak.new(digest_bits=256, data=data).digest()
+    if _pysha3 is not None:
+        return _pysha3.keccak_256(data).digest()
+    return _keccak256(data)
+
+
+def _keccak256(data):
+    """Keccak-256 in pure Python, about 0.7 ms per 40-digit address"""
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b'\0' * (-len(padded) % _KECCAK_RATE))
+    padded[-1] |= 0x80
+    state = [0] * 25
+    for start in range(0, len(padded), _KECCAK_RATE):
+        block = padded[start:start + _KECCAK_RATE]
+        for i in range(_KECCAK_RATE // 8):
+            state[i] ^= int.from_bytes(block[8 * i:8 * i + 8], 'little')
+        _keccak_f(state)
+    return b''.join(lane.to_bytes(8, 'little') for lane in state[:4])
+
+
+def to_checksum_address(address):
+    """EIP-55 mixed-case form of a 0x-prefixed hex address"""
+    digits = address[2:].lower()
+    digest = keccak256(digits.encode()).hex()
+    return '0x' + ''.join(char.upper() if int(nibble, 16) >= 8 else char
+                          for char, nibble in zip(digits, digest))
+
+
+def is_ethereum_address(address):
+    """0x and 40 hex digits; mixed case must match the EIP-55 checksum.
+
+    All-lowercase and all-uppercase addresses carry no checksum and pass.
+    """
+    if not _ETHEREUM_PATTERN.fullmatch(address):
+        return False
+    digits = address[2:]
+    if digits == digits.lower() or digits == digits.upper():
+        return True
+    return to_checksum_address(address) == address
+
+
+def is_xrp_address(address):
+    """Classic r... address, Base58Check over the Ripple alphabet"""
+    if not _XRP_PATTERN.fullmatch(address):
+        return False
+    payload = base58check(address, XRP_ALPHABET)
+    return payload is not None and len(payload) == 21 and payload[0] == 0
+
+
+def is_solana_address(address):
+    """Base58 string of a 32-byte public key"""
+    if not _SOLANA_PATTERN.fullmatch(address):
+        return False
+    try:
+        return len(b58decode(address)) == 32
+    except KeyError:
+        return False
+
+
+def screen(is_valid, addresses):
+    """[bool] per address, each distinct address checked only once"""
+    verdicts = {}
+    result = []
+    for address in addresses:
+        verdict = verdicts.get(address)
+        if verdict is None:
+            verdict = verdicts[address] = is_valid(address.strip())
+        result.append(verdict)
+    return result
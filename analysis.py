@@ -0,0 +1,364 @@
+import heapq
+from datetime import datetime
+
+from crypto_api import Cryptocurrency
+from tx_columns import TYPE_CODES
+
+
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+
+def flow_statistics(table, percentiles=PERCENTILES, top_k=10):
+    """Statistics of a TransactionTable, computed with NumPy over its columns.
+
+    Shared by the Flow Details window, BatchAnalyzer and the command line.
+    Besides counts, totals and extremes there are medians and percentiles
+    of each side, fees, the inflow/outflow imbalance, day/week/month
+    volume buckets (UTC) and how concentrated the volume is among the
+    counterparties. USD totals use each transaction's own price, from the
+    table's usd_prices column, and leave out the unpriced ones. Values
+    about one side are None when there is no transaction on that side.
+    
+    Everything is about the coin itself; token transfers are only counted
+    per token, under 'tokens', and only add the fees they paid in the coin.
+    """
+    import numpy as np
+    
+    scale = table.scale
+    assets = np.array(table.assets, dtype=np.int32)
+    coin = assets == 0
+    tokens = _token_statistics(table, assets, coin)
+    # Fees are paid in the coin whatever was transferred
+    total_fees = int(np.array(table.fees, dtype=np.int64).sum()) / scale
+    if not coin.all():
+        table = _CoinRows(table, coin)
+    # Sums stay in integer base units and are divided by the scale once, at the end
+    amounts = np.array(table.amounts, dtype=np.int64)
+    types = np.array(table.types, dtype=np.int8)
+    timestamps = np.array(table.timestamps, dtype=np.float64)
+    
+    received = types == TYPE_CODES['received']
+    sent = types == TYPE_CODES['sent']
+    positive = amounts > 0
+    negative = amounts < 0
+    inflow = np.where(positive, amounts, 0)
+    outflow = np.where(negative, -amounts, 0)
+    total_received = int(inflow[received].sum()) / scale
+    total_sent = int(outflow[sent].sum()) / scale
+    moved = total_received + total_sent
+    
+    stats = {
+        'transactions': len(table),
+        'incoming': int(received.sum()),
+        'outgoing': int(sent.sum()),
+        'total_received': total_received,
+        'total_sent': total_sent,
+        'total_fees': total_fees,
+        'net_flow': total_received - total_sent,
+        # -1 when everything left the address, +1 when everything stayed
+        'imbalance': (total_received - total_sent) / moved if moved else None,
+    }
+    
+    prices = np.array(table.usd_prices, dtype=np.float64)
+    priced = ~np.isnan(prices)
+    stats['priced'] = int(priced.sum())
+    if stats['priced']:
+        stats['received_usd'] = float((inflow * prices)[received & priced].sum()) / scale
+        stats['sent_usd'] = float((outflow * prices)[sent & priced].sum()) / scale
+    else:
+        stats['received_usd'] = stats['sent_usd'] = None
+    
+    stats.update(_side_statistics('incoming', amounts[positive], percentiles, scale))
+    stats.update(_side_statistics('outgoing', outflow[negative], percentiles, scale))
+    
+    known = ~np.isnan(timestamps)
+    if not known.all():
+        timestamps, inflow, outflow = timestamps[known], inflow[known], outflow[known]
+    if len(timestamps):
+        stats['first_tx'] = datetime.fromtimestamp(timestamps.min())
+        stats['last_tx'] = datetime.fromtimestamp(timestamps.max())
+        
+        # One pass over the transactions into per-day totals, weeks and months are summed from those
+        days = (timestamps * (1 / 86400)).astype(np.int64)
+        first_day = days.min()
+        days -= first_day
+        day_counts = np.bincount(days)
+        day_received = _sum_by(days, inflow, len(day_counts))
+        day_sent = _sum_by(days, outflow, len(day_counts))
+        day_numbers = np.arange(first_day, first_day + len(day_counts))
+        # 1970-01-01 was a Thursday, weeks start on Monday
+        weeks = day_numbers - (day_numbers + 3) % 7
+        months = day_numbers.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        totals = (day_received, day_sent, day_counts, scale)
+        stats['daily'] = _volume_buckets(day_numbers, 'datetime64[D]', *totals)
+        stats['weekly'] = _volume_buckets(weeks, 'datetime64[D]', *totals)
+        stats['monthly'] = _volume_buckets(months, 'datetime64[M]', *totals)
+    else:
+        stats['first_tx'] = stats['last_tx'] = None
+        stats['daily'] = stats['weekly'] = stats['monthly'] = []
+    
+    stats.update(_concentration(table, top_k))
+    stats['tokens'] = tokens
+    return stats
+
+
+class _CoinRows:
+    """The columns flow_statistics reads, restricted to the coin's own transactions"""
+    
+    def __init__(self, table, coin):
+        import numpy as np
+        
+        self.scale = table.scale
+        self.parties = table.parties
+        for name in ('amounts', 'types', 'timestamps', 'usd_prices'):
+            setattr(self, name, np.asarray(getattr(table, name))[coin])
+        # Each flow belongs to the row whose flow_start range holds it
+        starts = np.asarray(table.flow_start, dtype=np.int64)
+        rows = np.repeat(coin, np.diff(starts))
+        self.flow_party = np.asarray(table.flow_party, dtype=np.int64)[rows]
+        self.flow_amount = np.asarray(table.flow_amount, dtype=np.int64)[rows]
+    
+    def __len__(self):
+        return len(self.amounts)
+
+
+def _token_statistics(table, assets, coin):
+    """Transfers, received and sent per token, largest volume first"""
+    import numpy as np
+    
+    if coin.all():
+        return []
+    amounts = np.array(table.amounts, dtype=np.int64)
+    types = np.array(table.types, dtype=np.int8)
+    received = np.where(types == TYPE_CODES['received'], np.maximum(amounts, 0), 0)
+    sent = np.where(types == TYPE_CODES['sent'], np.maximum(-amounts, 0), 0)
+    counts = np.bincount(assets, minlength=len(table.asset_names))
+    tokens = []
+    for i in np.flatnonzero(counts[1:]) + 1:
+        rows = assets == i
+        # Amounts saturated at MAX_UNITS would overflow an int64 sum, Python ints do not
+        tokens.append({'asset': table.asset_names[i], 'transactions': int(counts[i]),
+                       'received': sum(received[rows].tolist()) / table.scale,
+                       'sent': sum(sent[rows].tolist()) / table.scale})
+    return sorted(tokens, key=lambda token: token['received'] + token['sent'], reverse=True)
+
+
+def _side_statistics(side, values, percentiles, scale):
+    """Extremes, mean and percentiles of one side's amounts, given in base units"""
+    import numpy as np
+    
+    if not len(values):
+        return {f'largest_{side}': None, f'average_{side}': None, f'median_{side}': None,
+                f'{side}_percentiles': None}
+    # The median comes out of the same partition as the other percentiles
+    points = np.percentile(values, list(percentiles) + [50]) / scale
+    return {
+        f'largest_{side}': int(values.max()) / scale,
+        f'average_{side}': int(values.sum()) / scale / len(values),
+        f'median_{side}': float(points[-1]),
+        f'{side}_percentiles': {p: float(v) for p, v in zip(percentiles, points)},
+    }
+
+
+def _sum_by(index, values, length):
+    """Exact int64 sums of `values` grouped by `index` (np.bincount would sum them as floats)"""
+    import numpy as np
+    
+    sums = np.zeros(length, dtype=np.int64)
+    np.add.at(sums, index, values)
+    return sums
+
+
+def _volume_buckets(keys, unit, received, sent, counts, scale):
+    """Received/sent/count per period from per-day totals in base units, keys[i] being the period of day i"""
+    import numpy as np
+    
+    index = keys - keys[0]
+    length = int(index[-1]) + 1
+    received = _sum_by(index, received, length)
+    sent = _sum_by(index, sent, length)
+    counts = _sum_by(index, counts, length)
+    used = np.nonzero(counts)[0]
+    periods = (used + keys[0]).astype(unit)
+    return [{'period': str(period), 'received': int(r) / scale, 'sent': int(s) / scale, 'transactions': int(c)}
+            for period, r, s, c in zip(periods, received[used], sent[used], counts[used])]
+
+
+def _concentration(table, top_k):
+    """How much of the volume goes through the largest counterparties (HHI in 0..1)"""
+    import numpy as np
+    
+    parties = np.array(table.flow_party, dtype=np.int64)
+    volume = _sum_by(parties, np.abs(np.array(table.flow_amount, dtype=np.int64)), len(table.parties))
+    total = int(volume.sum())
+    if not total:
+        return {'counterparties': 0, 'top_counterparties': [], 'top_counterparty_share': None,
+                'top10_share': None, 'hhi': None}
+    
+    shares = volume / total
+    k = min(max(top_k, 10), len(volume))
+    top = np.argpartition(volume, len(volume) - k)[len(volume) - k:]
+    top = top[np.argsort(volume[top])[::-1]]
+    return {
+        'counterparties': int(np.count_nonzero(volume)),
+        'top_counterparties': [{'address': table.parties[i], 'volume': int(volume[i]) / table.scale,
+                                'share': float(shares[i])}
+                               for i in top[:top_k] if volume[i] > 0],
+        'top_counterparty_share': float(shares[top[0]]),
+        'top10_share': float(shares[top[:10]].sum()),
+        'hhi': float((shares ** 2).sum()),
+    }
+
+
+class FlowGraph:
+    """Directed money-flow graph between addresses.
+
+    Nodes carry the hop at which they were discovered, edges aggregate
+    every transfer from one address to another into a total amount and a
+    count. A transfer seen from both ends (once in each history) is only
+    counted once; several transfers between the same two addresses in one
+    transaction (internal transfers) all count.
+    """
+    
+    def __init__(self, crypto=None):
+        self.crypto = crypto
+        self.nodes = {}
+        self.edges = {}
+        self._transfers = set()
+    
+    def add_node(self, address, hop=None, **attrs):
+        node = self.nodes.setdefault(address, {'hop': hop, 'expanded': False})
+        if hop is not None and (node['hop'] is None or hop < node['hop']):
+            node['hop'] = hop
+        node.update(attrs)
+        return node
+    
+    def add_transfer(self, source, target, amount, tx_hash=None, occurrence=0):
+        """`occurrence` tells apart the transfers of one transaction between the same two addresses"""
+        if tx_hash is not None:
+            key = (tx_hash, source, target, occurrence)
+            if key in self._transfers:
+                return
+            self._transfers.add(key)
+        
+        self.add_node(source)
+        self.add_node(target)
+        edge = self.edges.setdefault((source, target), {'amount': 0, 'count': 0})
+        edge['amount'] += abs(amount)
+        edge['count'] += 1
+    
+    def add_history(self, address, transactions, counterparties, hop=0):
+        """Add the transfers of one address's parsed transactions.
+
+        `counterparties(tx, address)` returns {party: signed amount} as
+        MultiCryptoAPI.counterparties does. Returns the total value moved
+        with each counterparty. Token transfers are left out.
+        """
+        self.add_node(address, hop=hop)
+        volume = {}
+        # Rows of one hash between the same addresses are numbered in history order; the
+        # other end's history numbers them the same, so each is still only counted once
+        occurrences = {}
+        for tx in transactions:
+            # Token amounts are not added up with the coin's
+            if tx.get('asset'):
+                continue
+            for party, amount in counterparties(tx, address).items():
+                source, target = (party, address) if amount > 0 else (address, party)
+                key = (tx['hash'], source, target)
+                occurrence = occurrences[key] = occurrences.get(key, -1) + 1
+                self.add_transfer(source, target, amount, tx['hash'], occurrence)
+                self.add_node(party, hop=hop + 1)
+                volume[party] = volume.get(party, 0) + abs(amount)
+        return volume
+    
+    def summary(self):
+        """Node/edge counts, volume and the number of addresses found at each hop"""
+        hops = {}
+        for node in self.nodes.values():
+            hops[node['hop']] = hops.get(node['hop'], 0) + 1
+        return {
+            'nodes': len(self.nodes),
+            'edges': len(self.edges),
+            'transfers': sum(edge['count'] for edge in self.edges.values()),
+            'volume': sum(edge['amount'] for edge in self.edges.values()),
+            'expanded': sum(1 for node in self.nodes.values() if node['expanded']),
+            'hops': hops,
+        }
+    
+    def to_networkx(self):
+        """nx.DiGraph with node hops and edge amount/count (weight = amount)"""
+        import networkx as nx
+        
+        G = nx.DiGraph()
+        for address, node in self.nodes.items():
+            G.add_node(address, **node)
+        for (source, target), edge in self.edges.items():
+            G.add_edge(source, target, weight=edge['amount'], **edge)
+        return G
+    
+    def top_counterparties(self, center, k, others="Others", pinned=()):
+        """Copy of the flows around `center` keeping its k largest counterparties.
+
+        Counterparties are ranked by total value moved in both directions
+        and picked with a heap; the remaining ones are merged into a single
+        `others` node whose 'members' attribute counts them. Counterparties
+        in `pinned` are always kept, on top of the k.
+        """
+        volume = {}
+        for (source, target), edge in self.edges.items():
+            if source == center:
+                volume[target] = volume.get(target, 0) + edge['amount']
+            elif target == center:
+                volume[source] = volume.get(source, 0) + edge['amount']
+        pinned = set(pinned)
+        keep = set(heapq.nlargest(k, (p for p in volume if p not in pinned), key=volume.get))
+        keep.update(p for p in volume if p in pinned)
+        
+        result = FlowGraph(self.crypto)
+        result.add_node(center, **self.nodes.get(center, {'hop': 0}))
+        for party in keep:
+            result.add_node(party, **self.nodes[party])
+        if len(volume) > len(keep):
+            result.add_node(others, hop=(result.nodes[center]['hop'] or 0) + 1, members=len(volume) - len(keep))
+        
+        for (source, target), edge in self.edges.items():
+            if center not in (source, target):
+                continue
+            if source == center:
+                key = (center, target if target in keep else others)
+            else:
+                key = (source if source in keep else others, center)
+            merged = result.edges.setdefault(key, {'amount': 0, 'count': 0})
+            merged['amount'] += edge['amount']
+            merged['count'] += edge['count']
+        return result
+    
+    def to_dict(self):
+        """JSON-able form of the graph, see from_dict"""
+        return {
+            'crypto': self.crypto.value if self.crypto is not None else None,
+            'nodes': self.nodes,
+            'edges': [[source, target, edge['amount'], edge['count']] for (source, target), edge in self.edges.items()],
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        graph = cls(Cryptocurrency(data['crypto']) if data.get('crypto') else None)
+        graph.nodes = {address: dict(node) for address, node in data['nodes'].items()}
+        for source, target, amount, count in data['edges']:
+            graph.edges[(source, target)] = {'amount': amount, 'count': count}
+        return graph
+    
+    def merge(self, other):
+        """Add the nodes and flows of another FlowGraph.
+
+        Edges this graph already has are left alone: they were seen from
+        the other end first and counting them again would double them.
+        """
+        for address, node in other.nodes.items():
+            attrs = {key: value for key, value in node.items() if key not in ('hop', 'expanded')}
+            self.add_node(address, hop=node['hop'], **attrs)
+        for key, edge in other.edges.items():
+            if key not in self.edges:
+                self.edges[key] = dict(edge)
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from requests.adapters import HTTPAdapter
+
+from analysis import flow_statistics
+from crypto_api import CRYPTO_CONFIGS, MultiCryptoAPI
+from tx_columns import TransactionTable
+
+
+class BatchAnalyzer:
+    """Analyze many (Cryptocurrency, address) pairs concurrently.
+
+    Work runs on a thread pool sized to the sum of the per-explorer caps
+    in CRYPTO_CONFIGS ("max_concurrency"), and each explorer gets its own
+    semaphore, so a slow or strict provider never starves the others.
+    Results are yielded per address as soon as they complete.
+    """
+
+    def __init__(self, transaction_limit=500, keep_transactions=False, max_concurrency=None):
+        self.transaction_limit = transaction_limit
+        self.keep_transactions = keep_transactions
+        self.api = MultiCryptoAPI(error_callback=self._record_error)
+        self._errors = threading.local()
+
+        max_concurrency = max_concurrency or {}
+        self.provider_slots = {}
+        for crypto, config in CRYPTO_CONFIGS.items():
+            limit = max_concurrency.get(crypto, config['max_concurrency'])
+            self.provider_slots[config['explorer']] = threading.Semaphore(limit)
+        self.max_workers = sum(max_concurrency.get(crypto, config['max_concurrency'])
+                               for crypto, config in CRYPTO_CONFIGS.items())
+
+        # requests keeps 10 pooled connections per host by default
+        adapter = HTTPAdapter(pool_connections=len(CRYPTO_CONFIGS), pool_maxsize=self.max_workers)
+        self.api.session.mount('https://', adapter)
+
+        self._summary_lock = threading.Lock()
+        self.reset_summary()
+
+    def _record_error(self, message):
+        errors = getattr(self._errors, 'messages', None)
+        if errors is not None:
+            errors.append(message)
+
+    def reset_summary(self):
+        with self._summary_lock:
+            self._summary = {
+                'addresses': 0,
+                'succeeded': 0,
+                'failed': 0,
+                'invalid': 0,
+                'transactions': 0,
+                'balance': defaultdict(float),
+                'total_received': defaultdict(float),
+                'total_sent': defaultdict(float),
+                'started': time.monotonic(),
+            }
+
+    def summary(self):
+        """Snapshot of the aggregate statistics for everything analyzed so far"""
+        with self._summary_lock:
+            summary = dict(self._summary)
+            summary['balance'] = {crypto.value: v for crypto, v in summary['balance'].items()}
+            summary['total_received'] = {crypto.value: v for crypto, v in summary['total_received'].items()}
+            summary['total_sent'] = {crypto.value: v for crypto, v in summary['total_sent'].items()}
+            summary['elapsed'] = time.monotonic() - summary.pop('started')
+        return summary
+
+    def analyze(self, targets):
+        """Yield one result dict per (Cryptocurrency, address) pair, in completion order"""
+        targets = iter(targets)
+        pending = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Keep the queue bounded so huge case files are not submitted all at once
+            for crypto, address in targets:
+                pending.add(executor.submit(self.analyze_address, crypto, address))
+                if len(pending) >= self.max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def analyze_address(self, crypto, address):
+        """Fetch balance and history for one address, holding its explorer's slot"""
+        address = address.strip()
+        config = CRYPTO_CONFIGS[crypto]
+        result = {
+            'crypto': crypto,
+            'address': address,
+            'valid': self.api.validate_address(crypto, address),
+            'balance': None,
+            'transaction_count': None,
+            'stats': None,
+            'errors': [],
+        }
+
+        if not result['valid']:
+            result['errors'].append(f"Invalid {config['name']} address")
+            self._update_summary(result)
+            return result
+
+        started = time.monotonic()
+        self._errors.messages = result['errors']
+        try:
+            with self.provider_slots[config['explorer']]:
+                balance_data = self.api.fetch_balance(crypto, address)
+                transactions = []
+                if balance_data:
+                    transactions = self.api.fetch_transactions(crypto, address, self.transaction_limit)
+        except Exception as e:
+            result['errors'].append(str(e))
+            balance_data, transactions = None, []
+        finally:
+            self._errors.messages = None
+
+        if balance_data:
+            result['balance'] = balance_data['balance']
+            result['transaction_count'] = balance_data['transaction_count']
+            if result['transaction_count'] is None:
+                result['transaction_count'] = len(transactions)
+        table = TransactionTable(crypto, address)
+        table.extend(transactions, lambda tx: self.api.counterparties(crypto, tx, address))
+        result['stats'] = flow_statistics(table)
+        if self.keep_transactions:
+            result['transactions'] = transactions
+        result['elapsed'] = time.monotonic() - started
+
+        self._update_summary(result)
+        return result
+
+    def _update_summary(self, result):
+        crypto = result['crypto']
+        with self._summary_lock:
+            self._summary['addresses'] += 1
+            if not result['valid']:
+                self._summary['invalid'] += 1
+            elif result['balance'] is None:
+                self._summary['failed'] += 1
+            else:
+                self._summary['succeeded'] += 1
+                self._summary['balance'][crypto] += result['balance']
+                self._summary['transactions'] += result['stats']['transactions']
+                self._summary['total_received'][crypto] += result['stats']['total_received']
+                self._summary['total_sent'][crypto] += result['stats']['total_sent']
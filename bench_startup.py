@@ -0,0 +1,111 @@
+"""Startup benchmark for the GUI.
+
+Measures the `-X importtime` total of `import flow` and the wall time from
+process start until the main window has been drawn, and exits non-zero when
+either goes over budget or when a deferred dependency is imported eagerly.
+
+    python bench_startup.py
+    python bench_startup.py --runs 10 --window-budget-ms 1500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Only needed once a graph is drawn or something is copied
+DEFERRED_MODULES = ['matplotlib', 'networkx', 'pyperclip']
+
+WINDOW_SCRIPT = """
+import os, sys, tkinter as tk
+import flow
+root = tk.Tk()
+app = flow.MoneyFlowAnalyzer(root)
+root.update()
+print('ready', ','.join(m for m in {deferred!r} if m in sys.modules), flush=True)
+os._exit(0)
+"""
+
+
+def import_time(runs):
+    """Median total of the self times reported by -X importtime, in ms, and the slowest imports"""
+    totals = []
+    modules = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import flow'],
+                                cwd=HERE, capture_output=True, text=True, check=True)
+        total = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            total += int(self_us)
+            # Nested imports are indented by two more spaces per level, keep flow's direct imports
+            if len(name) - len(name.lstrip()) <= 3:
+                modules[name.strip()] = int(cumulative_us)
+        totals.append(total / 1000)
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:8]
+    return statistics.median(totals), slowest
+
+
+def eager_imports():
+    script = f"import sys, flow; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', script], cwd=HERE, capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(',') if m]
+
+
+def time_to_first_window(runs):
+    """Median ms from spawning the interpreter until the first window is drawn"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-c', WINDOW_SCRIPT.format(deferred=DEFERRED_MODULES)],
+                                   cwd=HERE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        line = process.stdout.readline()
+        elapsed = (time.perf_counter() - started) * 1000
+        process.wait()
+        if not line.startswith('ready'):
+            raise RuntimeError(process.stderr.read().strip() or "window did not open")
+        times.append(elapsed)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check GUI startup time against a budget")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--import-budget-ms', type=float, default=400)
+    parser.add_argument('--window-budget-ms', type=float, default=1200)
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    eager = eager_imports()
+    if eager:
+        failures.append(f"deferred modules imported at startup: {', '.join(eager)}")
+
+    total, slowest = import_time(args.runs)
+    print(f"import flow: {total:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    for name, cumulative in slowest:
+        print(f"  {name:<30} {cumulative / 1000:8.1f} ms")
+    if total > args.import_budget_ms:
+        failures.append(f"import time {total:.1f} ms over budget")
+
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+        print("time to first window: skipped, no display")
+    else:
+        window = time_to_first_window(args.runs)
+        print(f"time to first window: {window:.1f} ms (budget {args.window_budget_ms:.0f} ms)")
+        if window > args.window_budget_ms:
+            failures.append(f"time to first window {window:.1f} ms over budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
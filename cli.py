@@ -0,0 +1,198 @@
+"""Headless MoneyFlow: analyze addresses from the command line, no GUI required.
+
+    python cli.py 1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa
+    python cli.py --crypto eth --format csv < addresses.txt > results.csv
+
+Addresses come from the arguments or, one per line, from stdin. A line may
+also be "crypto,address" to mix chains in one file. Results are written as
+JSON Lines (default) or CSV, one row per address, one row per
+transaction with --transactions, one row per day/week/month with
+--buckets, or one row per flow between wallets with --hops N. A run
+summary goes to stderr. The exit status is 1 when an address failed, was
+invalid, or when no address was analyzed at all.
+"""
+import argparse
+import json
+import sys
+
+from batch import BatchAnalyzer
+from crawler import CounterpartyCrawler
+from crypto_api import CRYPTO_CONFIGS, Cryptocurrency
+from export import FORMATS, RowWriter
+
+
+CRYPTO_NAMES = {
+    'bitcoin': Cryptocurrency.BITCOIN,
+    'btc': Cryptocurrency.BITCOIN,
+    'ethereum': Cryptocurrency.ETHEREUM,
+    'eth': Cryptocurrency.ETHEREUM,
+    'xrp': Cryptocurrency.XRP,
+    'ripple': Cryptocurrency.XRP,
+    'solana': Cryptocurrency.SOLANA,
+    'sol': Cryptocurrency.SOLANA,
+}
+
+# Most specific formats first, Solana's plain base58 would match the others too
+DETECT_ORDER = [Cryptocurrency.ETHEREUM, Cryptocurrency.BITCOIN, Cryptocurrency.XRP, Cryptocurrency.SOLANA]
+
+ADDRESS_FIELDS = [
+    'crypto', 'address', 'valid', 'balance', 'transaction_count',
+    'incoming', 'outgoing', 'total_received', 'total_sent',
+    'largest_incoming', 'largest_outgoing', 'median_incoming', 'median_outgoing',
+    'total_fees', 'net_flow', 'imbalance', 'counterparties', 'top_counterparty_share', 'hhi',
+    'first_tx', 'last_tx', 'errors',
+]
+
+BUCKET_FIELDS = [
+    'crypto', 'address', 'period', 'received', 'sent', 'transactions',
+]
+
+BUCKETS = {'day': 'daily', 'week': 'weekly', 'month': 'monthly'}
+
+TRANSACTION_FIELDS = [
+    'crypto', 'address', 'hash', 'timestamp', 'type', 'amount', 'asset', 'fee', 'from', 'to',
+]
+
+FLOW_FIELDS = [
+    'crypto', 'address', 'source', 'target', 'amount', 'count', 'source_hop', 'target_hop',
+]
+
+
+def detect_crypto(api, address):
+    for crypto in DETECT_ORDER:
+        if api.validate_address(crypto, address):
+            return crypto
+    return None
+
+
+def read_targets(api, addresses, default_crypto):
+    """Yield (Cryptocurrency, address) pairs, inferring the chain when not given"""
+    for line in addresses:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        crypto = default_crypto
+        if ',' in line:
+            name, line = [part.strip() for part in line.split(',', 1)]
+            crypto = CRYPTO_NAMES.get(name.lower())
+            if crypto is None:
+                print(f"Unknown cryptocurrency '{name}', skipping {line}", file=sys.stderr)
+                continue
+        if crypto is None:
+            crypto = detect_crypto(api, line)
+            if crypto is None:
+                print(f"Could not recognise address {line}, skipping", file=sys.stderr)
+                continue
+        yield crypto, line
+
+
+def address_rows(result):
+    values = dict(result['stats'] or {})
+    values.update(result)
+    values['errors'] = "; ".join(result['errors'])
+    yield {key: values.get(key) for key in ADDRESS_FIELDS}
+
+
+def transaction_rows(result):
+    for tx in result.get('transactions', []):
+        yield {
+            'crypto': result['crypto'],
+            'address': result['address'],
+            'hash': tx['hash'],
+            'timestamp': tx['timestamp'],
+            'type': tx['type'],
+            'amount': tx['amount'],
+            'asset': tx.get('asset') or CRYPTO_CONFIGS[result['crypto']]['symbol'],
+            'fee': tx['fee'],
+            'from': tx.get('from'),
+            'to': tx.get('to'),
+        }
+
+
+def bucket_rows(result, period):
+    for bucket in (result['stats'] or {}).get(BUCKETS[period], []):
+        yield {'crypto': result['crypto'], 'address': result['address'], **bucket}
+
+
+def flow_rows(crypto, address, graph):
+    for (source, target), edge in graph.edges.items():
+        yield {
+            'crypto': crypto,
+            'address': address,
+            'source': source,
+            'target': target,
+            'amount': edge['amount'],
+            'count': edge['count'],
+            'source_hop': graph.nodes[source]['hop'],
+            'target_hop': graph.nodes[target]['hop'],
+        }
+
+
+def crawl_results(targets, args):
+    """Yield flow rows for every target crawled --hops out"""
+    for crypto, address in targets:
+        crawler = CounterpartyCrawler(max_hops=args.hops, max_fanout=args.fanout,
+                                      min_value=args.min_value, request_budget=args.budget,
+                                      transaction_limit=args.limit)
+        graph = crawler.crawl(crypto, address)
+        print(json.dumps({'address': address, **graph.summary(), 'errors': len(crawler.errors)}),
+              file=sys.stderr)
+        yield flow_rows(crypto, address, graph)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze cryptocurrency addresses without the GUI")
+    parser.add_argument('addresses', nargs='*', help="addresses to analyze (default: read from stdin)")
+    parser.add_argument('-c', '--crypto', choices=sorted(CRYPTO_NAMES), help="chain of every address (default: detect)")
+    parser.add_argument('-f', '--format', choices=FORMATS, default='jsonl', help="output format")
+    parser.add_argument('-o', '--output', help="output file (default: stdout)")
+    parser.add_argument('-l', '--limit', type=int, default=500, help="max transactions fetched per address")
+    parser.add_argument('-t', '--transactions', action='store_true', help="write one row per transaction")
+    parser.add_argument('--buckets', choices=sorted(BUCKETS), help="write received/sent volume per day, week or month")
+    parser.add_argument('--hops', type=int, help="follow funds this many hops out and write one row per flow")
+    parser.add_argument('--fanout', type=int, default=10, help="counterparties expanded per wallet when crawling")
+    parser.add_argument('--min-value', type=float, default=0.0, help="smallest flow worth following when crawling")
+    parser.add_argument('--budget', type=int, default=500, help="explorer requests allowed per crawl")
+    args = parser.parse_args(argv)
+
+    analyzer = BatchAnalyzer(transaction_limit=args.limit, keep_transactions=args.transactions)
+    default_crypto = CRYPTO_NAMES[args.crypto] if args.crypto else None
+    targets = read_targets(analyzer.api, args.addresses or sys.stdin, default_crypto)
+
+    if args.hops is not None:
+        fields = FLOW_FIELDS
+        results = crawl_results(targets, args)
+    elif args.buckets:
+        fields = BUCKET_FIELDS
+        results = (bucket_rows(result, args.buckets) for result in analyzer.analyze(targets))
+    else:
+        fields = TRANSACTION_FIELDS if args.transactions else ADDRESS_FIELDS
+        rows_for = transaction_rows if args.transactions else address_rows
+        results = (rows_for(result) for result in analyzer.analyze(targets))
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    analyzed = 0
+    try:
+        writer = RowWriter(out, fields, args.format)
+        for rows in results:
+            writer.write_all(rows)
+            out.flush()
+            analyzed += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    # Every input skipped as unrecognised is bad input, not an empty success
+    if not analyzed:
+        print("No address to analyze", file=sys.stderr)
+        return 1
+    if args.hops is not None:
+        return 0
+
+    summary = analyzer.summary()
+    print(json.dumps(summary), file=sys.stderr)
+    return 0 if summary['failed'] == 0 and summary['invalid'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
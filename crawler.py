@@ -0,0 +1,108 @@
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from analysis import FlowGraph
+from crypto_api import CRYPTO_CONFIGS, ETHEREUM_ACTIONS, Cryptocurrency, MultiCryptoAPI
+
+
+class CounterpartyCrawler:
+    """Follow funds breadth-first from a starting address.
+
+    Each hop fetches the history of every address in the frontier
+    concurrently, records the transfers in a FlowGraph and expands the
+    `max_fanout` largest counterparties (by value moved, at least
+    `min_value`) that have not been visited yet. Crawling stops after
+    `max_hops`, when the frontier is empty or when `request_budget`
+    explorer requests have been spent. Every history fetched is charged
+    the streams it opens at once (Ethereum walks three account lists)
+    before it starts, so the fetches in flight never overrun the budget.
+    """
+
+    def __init__(self, api=None, max_hops=3, max_fanout=10, min_value=0.0,
+                 request_budget=500, transaction_limit=200, max_workers=None):
+        self.errors = []
+        self._errors_lock = threading.Lock()
+        self.api = api or MultiCryptoAPI(error_callback=self._record_error)
+        self.max_hops = max_hops
+        self.max_fanout = max_fanout
+        self.min_value = min_value
+        self.request_budget = request_budget
+        self.transaction_limit = transaction_limit
+        self.max_workers = max_workers
+
+    def _record_error(self, message):
+        with self._errors_lock:
+            self.errors.append(message)
+
+    def crawl(self, crypto, address, progress=None):
+        """Crawl from `address` and return the FlowGraph.
+
+        `progress`, if given, is called as progress(hop, expanded, discovered)
+        after every expanded address.
+        """
+        address = address.strip()
+        graph = FlowGraph(crypto)
+        graph.add_node(address, hop=0)
+        visited = {address}
+        frontier = [address]
+        budget_start = self.api.requests_sent
+        cost = len(ETHEREUM_ACTIONS) if crypto == Cryptocurrency.ETHEREUM else 1
+        max_workers = self.max_workers or CRYPTO_CONFIGS[crypto]['max_concurrency']
+        expanded = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for hop in range(self.max_hops + 1):
+                if not frontier:
+                    break
+                # Submit lazily so the budget is checked against requests actually made,
+                # plus the streams of the fetches still in flight
+                queue = iter(frontier)
+                pending = {}
+
+                def submit_next():
+                    for node in queue:
+                        spent = self.api.requests_sent - budget_start
+                        if spent + (len(pending) + 1) * cost > self.request_budget:
+                            return
+                        future = executor.submit(self.api.fetch_transactions, crypto, node, self.transaction_limit)
+                        pending[future] = node
+                        return
+
+                for _ in range(max_workers):
+                    submit_next()
+
+                candidates = {}
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        node = pending.pop(future)
+                        self._expand(graph, crypto, node, hop, future.result(), visited, candidates)
+                        expanded += 1
+                        if progress:
+                            progress(hop, expanded, len(graph.nodes))
+                        submit_next()
+
+                if hop == self.max_hops:
+                    break
+
+                # Per-node fan-out cap, largest counterparties first
+                frontier = []
+                for node, parties in candidates.items():
+                    eligible = [(value, party) for party, value in parties.items() if value >= self.min_value]
+                    for value, party in heapq.nlargest(self.max_fanout, eligible):
+                        if party not in visited:
+                            visited.add(party)
+                            frontier.append(party)
+
+                if self.api.requests_sent - budget_start + cost > self.request_budget:
+                    break
+
+        return graph
+
+    def _expand(self, graph, crypto, node, hop, transactions, visited, candidates):
+        """Record a fetched history in the graph and collect unvisited counterparties"""
+        graph.nodes[node]['expanded'] = True
+        volume = graph.add_history(node, transactions,
+                                   lambda tx, address: self.api.counterparties(crypto, tx, address), hop)
+        candidates[node] = {party: value for party, value in volume.items() if party not in visited}
@@ -0,0 +1,1252 @@
+import heapq
+import itertools
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from urllib.parse import urlparse
+
+import requests
+
+from address_check import (is_bitcoin_address, is_ethereum_address, is_solana_address,
+                           is_xrp_address, screen)
+from json_stream import iter_items
+
+
+class Cryptocurrency(Enum):
+    BITCOIN = "bitcoin"
+    ETHEREUM = "ethereum"
+    XRP = "ripple"
+    SOLANA = "solana"
+    
+
+CRYPTO_CONFIGS = {
+    Cryptocurrency.BITCOIN: {
+        "name": "Bitcoin",
+        "symbol": "BTC",
+        "explorer": "blockchain.info",
+        "api_base": "https://blockchain.info",
+        "decimals": 8,
+        "page_size": 50,
+        "max_concurrency": 2,
+        "rate_limit": 1.0,
+        "burst": 3,
+        "color": "#F7931A", 
+    },
+    Cryptocurrency.ETHEREUM: {
+        "name": "Ethereum",
+        "symbol": "ETH",
+        "explorer": "etherscan.io",
+        "api_base": "https://api.etherscan.io/api",
+        "decimals": 18,
+        "page_size": 1000,
+        "max_concurrency": 4,
+        "rate_limit": 5.0,
+        "burst": 5,
+        "color": "#627EEA",  
+    },
+    Cryptocurrency.XRP: {
+        "name": "XRP",
+        "symbol": "XRP",
+        "explorer": "xrpscan.com",
+        "api_base": "https://api.xrpscan.com/api/v1",
+        "decimals": 6,
+        "max_concurrency": 4,
+        "rate_limit": 4.0,
+        "burst": 4,
+        "color": "#FF0000", 
+    },
+    Cryptocurrency.SOLANA: {
+        "name": "Solana",
+        "symbol": "SOL",
+        "explorer": "Solana RPC",
+        # Any JSON-RPC node, a private or local one through MONEYFLOW_SOLANA_RPC
+        "api_base": os.environ.get("MONEYFLOW_SOLANA_RPC", "https://api.mainnet-beta.solana.com"),
+        "decimals": 9,
+        "page_size": 1000,
+        "rpc_batch": 50,
+        "max_concurrency": 2,
+        "rate_limit": 2.0,
+        "burst": 2,
+        "color": "#00FFA3",
+    }
+}
+
+# Etherscan account lists read for an address: transactions, ERC-20 transfers, internal transfers
+ETHEREUM_ACTIONS = ('txlist', 'tokentx', 'txlistinternal')
+
+# Etherscan refuses page * offset beyond this many results of one query
+ETHERSCAN_WINDOW = 10000
+
+# 10 ** decimals, computed once rather than for every output parsed
+SATOSHIS = {decimals: 10 ** decimals for decimals in range(19)}
+
+
+def split_units(amount, weights):
+    """{key: integer share} of `amount` in proportion to `weights`, adding up to it exactly.
+
+    Largest-remainder rounding; keys whose share rounds to nothing are left out.
+    """
+    total = sum(weights.values())
+    if not amount or not total:
+        return {}
+    shares = {}
+    remainders = {}
+    for key, weight in weights.items():
+        shares[key], remainders[key] = divmod(amount * weight, total)
+    left = amount - sum(shares.values())
+    if left:
+        for key in heapq.nlargest(left, remainders, key=remainders.get):
+            shares[key] += 1
+    return {key: share for key, share in shares.items() if share}
+
+
+def bitcoin_flows(tx, address):
+    """What a blockchain.info transaction means for `address`, in integer satoshis.
+
+    One pass over the inputs and one over the outputs. Outputs going back
+    to the address or to any other input of the transaction are change
+    (common-input-ownership); the rest is what was sent. When other
+    addresses fund the transaction too (a CoinJoin, say), the address is
+    charged only its share of the outputs, in proportion to its inputs and
+    never more than it spent. Returns:
+
+    sender   True when the address funded the transaction
+    amount   signed value moved: +received, or -sent to counterparties
+    change   value that came back to the spending inputs
+    fee      transaction fee (inputs - outputs when not reported)
+    net      change of the address's balance, fee included
+    parties  {counterparty: signed satoshis}, receipts attributed to the
+             inputs and the address's share of sends spread over the
+             outputs, in proportion to their value, summing to exactly
+             `amount`
+    """
+    total_in = 0
+    senders = {}
+    for inp in tx.get('inputs', ()):
+        prev_out = inp.get('prev_out')
+        if prev_out:
+            addr = prev_out.get('addr')
+            value = prev_out.get('value') or 0
+            total_in += value
+            senders[addr] = senders.get(addr, 0) + value
+    senders.pop(None, None)
+    # The address is one of the inputs when it is the one spending
+    sender = address in senders
+    own_in = senders.pop(address) if sender else 0
+
+    own_out = total_out = change = 0
+    parties = {}
+    if sender:
+        for out in tx.get('out', ()):
+            addr = out.get('addr')
+            value = out.get('value') or 0
+            total_out += value
+            if addr == address:
+                own_out += value
+            elif addr in senders:
+                change += value
+            elif addr:
+                parties[addr] = parties.get(addr, 0) - value
+    else:
+        for out in tx.get('out', ()):
+            value = out.get('value') or 0
+            total_out += value
+            if out.get('addr') == address:
+                own_out += value
+
+    fee = tx.get('fee')
+    if fee is None:
+        fee = max(total_in - total_out, 0)
+
+    if sender:
+        change += own_out
+        amount = sum(parties.values())
+        if senders and total_in:
+            sent = min(-amount * own_in // total_in, max(own_in - own_out, 0))
+            parties = {addr: -share for addr, share in
+                       split_units(sent, {addr: -value for addr, value in parties.items()}).items()}
+            amount = -sent
+    else:
+        amount = own_out
+        parties = split_units(amount, senders)
+
+    return {
+        'sender': sender,
+        'amount': amount,
+        'change': change,
+        'fee': fee,
+        'net': own_out - own_in,
+        'parties': parties,
+    }
+
+
+def solana_flows(tx, address):
+    """What a getTransaction result (json encoding) means for `address`, in lamports.
+
+    Solana reports balances, not transfers: every account's lamports
+    before and after. The address's own delta, less the fee when it paid
+    it, is the value moved; the accounts whose balance moved the other way
+    are the counterparties, each attributed its share of that value.
+    Returns:
+
+    amount   signed value moved, fee excluded
+    fee      transaction fee, 0 when another account paid it
+    parties  {counterparty: signed lamports} summing to exactly `amount`
+    """
+    meta = tx.get('meta') or {}
+    message = (tx.get('transaction') or {}).get('message') or {}
+    # jsonParsed encoding gives the keys as objects
+    keys = [key.get('pubkey') if isinstance(key, dict) else key for key in message.get('accountKeys', ())]
+    # Versioned transactions load more accounts from lookup tables, listed after the static ones
+    loaded = meta.get('loadedAddresses') or {}
+    keys += loaded.get('writable', []) + loaded.get('readonly', [])
+
+    deltas = {}
+    for key, pre, post in zip(keys, meta.get('preBalances', ()), meta.get('postBalances', ())):
+        if post != pre:
+            deltas[key] = deltas.get(key, 0) + post - pre
+    # The first account pays the fee, it is not value moved to anyone
+    fee = meta.get('fee') or 0
+    if keys and fee:
+        deltas[keys[0]] = deltas.get(keys[0], 0) + fee
+
+    amount = deltas.pop(address, 0)
+    if amount > 0:
+        parties = split_units(amount, {key: -delta for key, delta in deltas.items() if delta < 0})
+    elif amount < 0:
+        parties = {key: -share for key, share in
+                   split_units(-amount, {key: delta for key, delta in deltas.items() if delta > 0}).items()}
+    else:
+        parties = {}
+
+    return {
+        'amount': amount,
+        'fee': fee if keys and keys[0] == address else 0,
+        'parties': parties,
+    }
+
+
+# XRP ledger times count seconds from 2000-01-01 UTC
+RIPPLE_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def xrp_amount(amount):
+    """(drops, issued) of an XRP ledger amount.
+
+    XRP is a string of drops; an issued currency (IOU) is an object with
+    currency, issuer and a decimal value string, returned as `issued`
+    with drops None. Some explorers also write XRP as an object in XRP.
+    """
+    if amount is None:
+        return 0, None
+    if isinstance(amount, dict):
+        if amount.get('currency') == 'XRP' and not amount.get('issuer'):
+            return round(float(amount.get('value', 0)) * 10 ** 6), None
+        return None, {'currency': amount.get('currency'), 'issuer': amount.get('issuer'),
+                      'value': amount.get('value')}
+    return int(amount), None
+
+
+def xrp_currency(code):
+    """Readable name of an XRP ledger currency code.
+
+    Codes longer than three characters are 40 hex digits, usually ASCII
+    padded with zero bytes; those that are not stay as they are.
+    """
+    if code and len(code) == 40:
+        try:
+            name = bytes.fromhex(code).rstrip(b'\0').decode('ascii')
+        except ValueError:
+            return code
+        if name.isprintable() and name:
+            return name
+    return code
+
+
+def xrp_flows(tx, address):
+    """What an XRP ledger transaction means for `address`, in drops.
+
+    Payments count what was delivered (meta delivered_amount), not the
+    Amount field, which a partial payment only caps. Failed transactions
+    and transaction types that move no XRP to anyone are interactions.
+    An issued currency (IOU) payment is a token transfer: its amount is in
+    millionths of the currency, the scale of drops. Returns:
+
+    type     'sent', 'received' or 'interaction'
+    amount   signed drops delivered, or millionths of the issued currency
+    fee      drops of fee, 0 when the address did not submit it
+    parties  {counterparty: signed amount}
+    asset    currency code of an IOU payment, None for XRP
+    """
+    meta = tx.get('meta') or tx.get('metaData') or {}
+    account = tx.get('Account')
+    destination = tx.get('Destination')
+    fee = int(tx.get('Fee') or 0) if account == address else 0
+
+    result = meta.get('TransactionResult', 'tesSUCCESS')
+    if tx.get('TransactionType', 'Payment') != 'Payment' or result != 'tesSUCCESS' or account == destination:
+        return {'type': 'interaction', 'amount': 0, 'fee': fee, 'parties': {}, 'asset': None}
+
+    delivered = meta.get('delivered_amount', meta.get('DeliveredAmount'))
+    # Ledgers before 2014 did not record it
+    if delivered is None or delivered == 'unavailable':
+        delivered = tx.get('Amount')
+    value, issued = xrp_amount(delivered)
+    asset = None
+    if issued:
+        # Decimal keeps the value string exact ("1e-3" included) down to the sixth place
+        value = int(Decimal(issued['value'] or 0).scaleb(6).to_integral_value())
+        asset = xrp_currency(issued['currency'])
+    value = value or 0
+
+    if account == address:
+        tx_type, amount, party = 'sent', -value, destination
+    elif destination == address:
+        tx_type, amount, party = 'received', value, account
+    else:
+        return {'type': 'interaction', 'amount': 0, 'fee': fee, 'parties': {}, 'asset': None}
+    return {
+        'type': tx_type,
+        'amount': amount,
+        'fee': fee,
+        'parties': {party: amount} if party and amount else {},
+        'asset': asset,
+    }
+
+
+class RPCError(Exception):
+    """A JSON-RPC node failed or refused a request"""
+
+
+class FetchError(Exception):
+    """A provider answered a history page with an error; the message is the one shown"""
+
+
+class RateLimiter:
+    """Token bucket for one explorer, adapting its rate to throttling.
+
+    Every 429 halves the rate (down to a tenth of the configured one) and
+    every successful request wins a little of it back.
+    """
+    
+    def __init__(self, rate, burst):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+    
+    def throttled(self, retry_after=None):
+        """Provider pushed back: slow down and honour Retry-After"""
+        with self.lock:
+            self.rate = max(self.max_rate / 10, self.rate / 2)
+            self.tokens = 0
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+    
+    def succeeded(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class MultiCryptoAPI:    
+    # Transient statuses worth retrying, everything else is returned as is
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, error_callback=None):
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        self.error_callback = error_callback
+        
+        # Short-lived response cache shared by balance, count and history lookups
+        self.cache_ttl = 30
+        self.cache_max_entries = 128
+        self.cache_max_bytes = 64 * 1024 * 1024
+        self._cache_lock = threading.Lock()
+        self._response_cache = OrderedDict()
+        self._cache_bytes = 0
+        self._inflight = {}
+        
+        # One token bucket per explorer host, retries with jittered exponential backoff
+        self.max_retries = 4
+        self.backoff_base = 0.5
+        self.backoff_max = 30
+        self.rate_limiters = {
+            urlparse(config['api_base']).netloc: RateLimiter(config['rate_limit'], config['burst'])
+            for config in CRYPTO_CONFIGS.values()
+        }
+        
+        # Network requests actually sent, retries included (callers use it as a budget)
+        self.requests_sent = 0
+        self._count_lock = threading.Lock()
+        
+        # History pages are decoded as they download and handed on in batches of this size
+        self.stream_chunk_size = 64 * 1024
+        self.stream_batch = 250
+        
+        # Histories read on their own thread (XRP markers, Ethereum lists) stay this many pages ahead
+        self.prefetch_pages = 3
+    
+    def show_error(self, message):
+        """Display error message through callback"""
+        if self.error_callback:
+            self.error_callback(message)
+    
+    def get(self, url, params=None, timeout=10):
+        """GET through the response cache.
+
+        Identical requests made while one is already in flight wait for
+        that request instead of hitting the network again, and successful
+        responses are reused for `cache_ttl` seconds.
+        """
+        key = (url, tuple(sorted(params.items())) if params else ())
+        
+        with self._cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is not None:
+                expires, response = entry
+                if expires > time.monotonic():
+                    self._response_cache.move_to_end(key)
+                    return response
+                self._evict(key)
+            
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            response = self._send(url, params, timeout)
+        except Exception as e:
+            with self._cache_lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        
+        with self._cache_lock:
+            self._inflight.pop(key, None)
+            size = len(response.content)
+            if response.status_code == 200 and not self._is_throttled(response) and size <= self.cache_max_bytes:
+                self._response_cache[key] = (time.monotonic() + self.cache_ttl, response)
+                self._cache_bytes += size
+                while (len(self._response_cache) > self.cache_max_entries
+                       or self._cache_bytes > self.cache_max_bytes):
+                    self._evict(next(iter(self._response_cache)))
+        future.set_result(response)
+        return response
+
+    def get_stream(self, url, params=None, timeout=10):
+        """GET whose body is left on the wire for stream_items to decode.
+
+        A response still in the cache is reused; a streamed one is not
+        cached, its body is never held as a whole. Close it when done.
+        """
+        key = (url, tuple(sorted(params.items())) if params else ())
+        with self._cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._response_cache.move_to_end(key)
+                return entry[1]
+        return self._send(url, params, timeout, stream=True)
+
+    def stream_items(self, response, path=(), header=None):
+        """Items of the JSON array at `path` in a response body, see json_stream.iter_items"""
+        chunks = getattr(response, 'chunks', None)
+        if chunks is None:
+            chunks = response.iter_content(self.stream_chunk_size)
+        return iter_items(chunks, path, header)
+
+    def _send(self, url, params, timeout, stream=False, json_body=None):
+        """Rate-limited GET (POST with `json_body`), retried on timeouts, throttling and transient 5xx"""
+        limiter = self.rate_limiters.get(urlparse(url).netloc)
+        attempt = 0
+        while True:
+            if limiter:
+                limiter.acquire()
+            with self._count_lock:
+                self.requests_sent += 1
+            try:
+                if json_body is not None:
+                    response = self.session.post(url, json=json_body, timeout=timeout)
+                else:
+                    response = self.session.get(url, params=params, timeout=timeout, stream=stream)
+                if stream:
+                    # The first chunk is read ahead, throttling is told by the start of the body
+                    chunks = response.iter_content(self.stream_chunk_size)
+                    response.head = next(chunks, b'')
+                    response.chunks = itertools.chain([response.head], chunks)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            
+            throttled = self._is_throttled(response)
+            if not throttled and response.status_code not in self.RETRY_STATUSES:
+                if limiter:
+                    limiter.succeeded()
+                return response
+            
+            retry_after = self._retry_after(response)
+            if limiter and throttled:
+                limiter.throttled(retry_after)
+            if attempt >= self.max_retries:
+                return response
+            response.close()
+            time.sleep(retry_after if retry_after is not None else self._backoff(attempt))
+            attempt += 1
+
+    def rpc(self, url, calls, timeout=15):
+        """Results of JSON-RPC calls sent as one batch request, in order.
+
+        `calls` is a list of (method, params). A call the node answered
+        with an error gets None; an HTTP failure raises RPCError.
+        """
+        batch = [{'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+                 for i, (method, params) in enumerate(calls)]
+        response = self._send(url, None, timeout, json_body=batch)
+        if response.status_code != 200:
+            raise RPCError(f"{urlparse(url).netloc} answered {response.status_code}")
+        answers = response.json()
+        if isinstance(answers, dict):
+            # Nodes that refuse a batch answer with a single error object
+            raise RPCError(answers.get('error', {}).get('message', 'Batch request refused'))
+        # Batch answers may come back in any order
+        results = [None] * len(calls)
+        for answer in answers:
+            if isinstance(answer.get('id'), int) and 0 <= answer['id'] < len(calls):
+                results[answer['id']] = answer.get('result')
+        return results
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _is_throttled(self, response):
+        if response.status_code == 429:
+            return True
+        # Etherscan answers 200 with a status 0 "Max rate limit reached" body
+        head = getattr(response, 'head', None)
+        if head is None:
+            head = response.content
+        return response.status_code == 200 and b'rate limit reached' in head[:200]
+
+    def _retry_after(self, response):
+        """Seconds from a Retry-After header (delta or HTTP date), capped at backoff_max"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(seconds, 0), self.backoff_max)
+
+    def _evict(self, key):
+        """Drop a cached response, caller holds _cache_lock"""
+        _, response = self._response_cache.pop(key)
+        self._cache_bytes -= len(response.content)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._response_cache.clear()
+            self._cache_bytes = 0
+
+
+    def validate_address(self, crypto, address):
+        validate = self.address_validator(crypto)
+        return validate(address.strip()) if validate else False
+
+
+    def validate_addresses(self, crypto, addresses):
+        """[bool] per address, checksums included; screens a batch before anything is fetched"""
+        validate = self.address_validator(crypto)
+        if validate is None:
+            return [False] * len(addresses)
+        return screen(validate, addresses)
+
+
+    def address_validator(self, crypto):
+        return {
+            Cryptocurrency.BITCOIN: self.validate_bitcoin_address,
+            Cryptocurrency.ETHEREUM: self.validate_ethereum_address,
+            Cryptocurrency.XRP: self.validate_xrp_address,
+            Cryptocurrency.SOLANA: self.validate_solana_address,
+        }.get(crypto)
+
+    
+    def validate_bitcoin_address(self, address):
+        """Validate Bitcoin address (P2PKH, P2SH, segwit v0 and taproot), checksum included"""
+        return is_bitcoin_address(address.strip())
+
+
+    def validate_ethereum_address(self, address):
+        """Validate Ethereum, EIP-55 checksum included when the address is mixed-case"""
+        return is_ethereum_address(address.strip())
+    
+
+    def validate_xrp_address(self, address):
+        """Validate XRP, Base58Check over the Ripple alphabet"""
+        return is_xrp_address(address.strip())
+    
+
+    def validate_solana_address(self, address):
+        """Validate Solana, a Base58 32-byte public key"""
+        return is_solana_address(address.strip())
+    
+
+    def fetch_balance(self, crypto, address):
+        """Fetch balance for specific wallet"""
+        config = CRYPTO_CONFIGS[crypto]
+        
+        try:
+            if crypto == Cryptocurrency.BITCOIN:
+                # Same request as the first history page, so the two share one download
+                response = self.get(self._rawaddr_url(address, config, 0), timeout=15)
+                if response.status_code == 200:
+                    data = response.json()
+                    balance = data.get('final_balance', 0) / (10 ** config['decimals'])
+                    total_received = data.get('total_received', 0) / (10 ** config['decimals'])
+                    total_sent = data.get('total_sent', 0) / (10 ** config['decimals'])
+                    tx_count = data.get('n_tx', 0)
+                    
+                    return {
+                        'balance': balance,
+                        'total_received': total_received,
+                        'total_sent': total_sent,
+                        'transaction_count': tx_count,
+                        'raw_data': data
+                    }
+                else:
+                    self.show_error(f"Failed to fetch Bitcoin balance. Status code: {response.status_code}")
+            
+            elif crypto == Cryptocurrency.ETHEREUM:
+                api_url = f"{config['api_base']}?module=account&action=balance&address={address}&tag=latest"
+                response = self.get(api_url, timeout=10)
+                if response.status_code == 200:
+                    data = response.json()
+                    if data.get('status') == '1':
+                        balance = int(data.get('result', 0)) / (10 ** config['decimals'])
+                        
+                        # Count the rows of every list the history merges from their first
+                        # pages, which fetch_transactions reuses. A full page means the count
+                        # is only known once the history is walked.
+                        page_size = config['page_size']
+                        tx_count = 0
+                        for action in ETHEREUM_ACTIONS:
+                            tx_response = self.get(self._txlist_url(address, 0, 99999999, 1, page_size, action),
+                                                   timeout=15)
+                            result = tx_response.json().get('result') if tx_response.status_code == 200 else None
+                            if not isinstance(result, list) or len(result) >= page_size:
+                                tx_count = None
+                                break
+                            tx_count += len(result)
+                        
+                        return {
+                            'balance': balance,
+                            'total_received': None,
+                            'total_sent': None,
+                            'transaction_count': tx_count,
+                            'raw_data': data
+                        }
+                    else:
+                        self.show_error(f"Etherscan API error: {data.get('message', 'Unknown error')}")
+                else:
+                    self.show_error(f"Failed to fetch Ethereum balance. Status code: {response.status_code}")
+            
+            elif crypto == Cryptocurrency.XRP:
+                url = f"{config['api_base']}/account/{address}"
+                response = self.get(url, timeout=10)
+                if response.status_code == 200:
+                    data = response.json()
+                    balance = float(data.get('xrpBalance', 0))
+                    
+                    return {
+                        'balance': balance,
+                        'total_received': None,
+                        'total_sent': None,
+                        'transaction_count': data.get('transactions', 0),
+                        'raw_data': data
+                    }
+                else:
+                    self.show_error(f"Failed to fetch XRP balance. Status code: {response.status_code}")
+            
+            elif crypto == Cryptocurrency.SOLANA:
+                data, = self.rpc(config['api_base'], [('getBalance', [address])], timeout=10)
+                if data is not None:
+                    balance = data.get('value', 0) / (10 ** config['decimals'])
+                    
+                    # The node does not count an address's transactions, the history walk does
+                    return {
+                        'balance': balance,
+                        'total_received': None,
+                        'total_sent': None,
+                        'transaction_count': None,
+                        'raw_data': data
+                    }
+                else:
+                    self.show_error("Failed to fetch Solana balance from the RPC node")
+        
+        except requests.exceptions.Timeout:
+            self.show_error(f"Timeout while fetching {crypto.name} balance. Please try again.")
+        except requests.exceptions.ConnectionError:
+            self.show_error(f"Connection error while fetching {crypto.name} balance. Check your internet connection.")
+        except Exception as e:
+            self.show_error(f"Error fetching {crypto.name} balance: {str(e)}")
+        return None
+    
+    
+    def fetch_transactions(self, crypto, address, limit=500):
+        """Fetch transactions for specific coin"""
+        transactions = []
+        for batch in self.iter_transactions(crypto, address, limit):
+            transactions.extend(batch)
+        return transactions
+
+
+    def iter_transactions(self, crypto, address, limit=500, since=None, walk=None):
+        """Yield parsed transaction batches page by page, newest first.
+
+        Follows each provider's pagination (offset, page or marker) until
+        the history is exhausted or `limit` transactions have been yielded.
+        Pages are decoded and parsed as they download, long ones are
+        yielded in batches of stream_batch.
+        Pass limit=None to walk the full history. With `since` (a block,
+        ledger or slot index from tx_cursor) paging stops once it reaches
+        transactions older than that point, so only the delta is fetched.
+        
+        Failures are reported through show_error and end the walk early.
+        `walk`, a dict if given, tells the two apart: walk['complete'] is
+        True once paging reached `since`, `limit` or the end of the history,
+        and stays False when a timeout or an error answer cut it short.
+        """
+        config = CRYPTO_CONFIGS[crypto]
+        parse = self.parser(crypto)
+        if walk is None:
+            walk = {}
+        walk['complete'] = False
+        
+        fetched = 0
+        try:
+            if crypto == Cryptocurrency.BITCOIN:
+                pages = self._iter_bitcoin_pages(address, config)
+            elif crypto == Cryptocurrency.ETHEREUM:
+                # The three lists download side by side, each newest first, and are merged as they arrive
+                streams = [itertools.chain.from_iterable(
+                               self._prefetch(self._iter_ethereum_pages(address, config, since or 0, action)))
+                           for action in ETHEREUM_ACTIONS]
+                pages = [heapq.merge(*streams, key=lambda tx: -int(tx.get('timeStamp') or 0))]
+            elif crypto == Cryptocurrency.XRP:
+                pages = self._prefetch(self._iter_xrp_pages(address, config))
+            else:
+                pages = self._iter_solana_pages(address, config, min_slot=since)
+            
+            for raw_txs in pages:
+                batch = []
+                reached_since = False
+                for tx in raw_txs:
+                    tx_data = parse(tx, address, config)
+                    if not tx_data:
+                        continue
+                    if since is not None:
+                        cursor = self.tx_cursor(crypto, tx_data)
+                        if cursor is not None and cursor < since:
+                            reached_since = True
+                            continue
+                    batch.append(tx_data)
+                    if limit is not None and fetched + len(batch) >= limit:
+                        break
+                    # Long pages are handed on in slices while the rest is still downloading
+                    if len(batch) >= self.stream_batch:
+                        fetched += len(batch)
+                        yield batch
+                        batch = []
+                if batch:
+                    fetched += len(batch)
+                    yield batch
+                if reached_since or (limit is not None and fetched >= limit):
+                    walk['complete'] = True
+                    return
+            walk['complete'] = True
+            if not fetched and since is None:
+                self.show_error(f"No {config['name']} transactions found for address: {address}")
+        
+        except FetchError as e:
+            self.show_error(str(e))
+        except requests.exceptions.Timeout:
+            self.show_error(f"Timeout while fetching {crypto.name} transactions. Please try again.")
+        except requests.exceptions.ConnectionError:
+            self.show_error(f"Connection error while fetching {crypto.name} transactions. Check your internet connection.")
+        except Exception as e:
+            self.show_error(f"Error fetching {crypto.name} transactions: {str(e)}")
+
+
+    def parser(self, crypto):
+        """The provider parser of a coin, parse(raw_tx, address, config) -> parsed dict or None"""
+        return {
+            Cryptocurrency.BITCOIN: self._parse_bitcoin_tx,
+            Cryptocurrency.ETHEREUM: self._parse_ethereum_tx,
+            Cryptocurrency.XRP: self._parse_xrp_tx,
+            Cryptocurrency.SOLANA: self._parse_solana_tx,
+        }[crypto]
+
+
+    def tx_cursor(self, crypto, tx):
+        """Chain position of a parsed transaction (block height, ledger index or slot)"""
+        raw = tx.get('raw_data', {})
+        try:
+            if crypto == Cryptocurrency.BITCOIN:
+                value = raw.get('block_height')
+            elif crypto == Cryptocurrency.ETHEREUM:
+                value = raw.get('blockNumber')
+            elif crypto == Cryptocurrency.XRP:
+                value = raw.get('ledger_index')
+            else:
+                value = raw.get('slot')
+            return int(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+
+    def newest_cursor(self, crypto, transactions, current=None):
+        """Highest tx_cursor among the transactions, or `current` if none is higher"""
+        newest = current
+        for tx in transactions:
+            cursor = self.tx_cursor(crypto, tx)
+            if cursor is not None and (newest is None or cursor > newest):
+                newest = cursor
+        return newest
+
+
+    def counterparties(self, crypto, tx, address):
+        """Counterparty addresses of a parsed transaction with signed amounts.
+
+        Positive amounts were received from that counterparty, negative ones
+        were sent to it. Bitcoin receipts are attributed to the inputs in
+        proportion to the value each one contributed, and change going
+        back to any of the inputs is not a counterparty, see bitcoin_flows.
+        Solana counterparties are the accounts whose balance moved the
+        other way, see solana_flows.
+        """
+        raw = tx.get('raw_data') or {}
+        amount = tx.get('amount', 0)
+        parties = {}
+        
+        if crypto in (Cryptocurrency.BITCOIN, Cryptocurrency.SOLANA):
+            # Worked out while parsing; transactions read back from the cache only have the raw JSON
+            units = tx.get('flows')
+            if units is None:
+                flows = bitcoin_flows if crypto == Cryptocurrency.BITCOIN else solana_flows
+                units = flows(raw, address)['parties']
+            scale = SATOSHIS[CRYPTO_CONFIGS[crypto]['decimals']]
+            parties = {addr: value / scale for addr, value in units.items()}
+        
+        elif crypto == Cryptocurrency.ETHEREUM:
+            if tx.get('type') == 'sent' and tx.get('to'):
+                parties[tx['to']] = amount
+            elif tx.get('type') == 'received' and tx.get('from'):
+                parties[tx['from']] = amount
+        
+        elif crypto == Cryptocurrency.XRP:
+            units = tx.get('flows')
+            if units is None:
+                units = xrp_flows(raw, address)['parties']
+            scale = SATOSHIS[CRYPTO_CONFIGS[crypto]['decimals']]
+            parties = {addr: value / scale for addr, value in units.items()}
+        
+        return parties
+
+
+    def _rawaddr_url(self, address, config, offset):
+        return f"https://blockchain.info/rawaddr/{address}?limit={config['page_size']}&offset={offset}"
+
+
+    def _txlist_url(self, address, start_block, end_block, page, offset, action='txlist'):
+        api_base = CRYPTO_CONFIGS[Cryptocurrency.ETHEREUM]['api_base']
+        return (f"{api_base}?module=account&action={action}&address={address}"
+                f"&startblock={start_block}&endblock={end_block}&sort=desc&page={page}&offset={offset}")
+
+
+    def _stream_page(self, response, path, header, page):
+        """Raw transactions of a streamed page; page['count'] and page['last'] follow them"""
+        with response:
+            for tx in self.stream_items(response, path, header):
+                page['count'] += 1
+                page['last'] = tx
+                yield tx
+
+
+    def _prefetch(self, pages):
+        """The pages of a page iterator, read on a thread up to prefetch_pages ahead.
+
+        Each page is downloaded and decoded on the thread, so the next ones
+        arrive while the caller works on the current one. The thread never
+        reports anything itself: a failed page (FetchError) or any other
+        error is queued behind the pages before it and raised in the caller,
+        where show_error reaches the caller's error capture. Once the caller
+        stops reading, so does the thread.
+        """
+        ready = queue.Queue(maxsize=self.prefetch_pages)
+        stop = threading.Event()
+        done = object()
+        
+        def put(item):
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def read():
+            try:
+                for page in pages:
+                    if not put(list(page)):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+        
+        threading.Thread(target=read, daemon=True).start()
+        try:
+            while True:
+                item = ready.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+
+    def _iter_bitcoin_pages(self, address, config):
+        """rawaddr pages, walked with limit/offset"""
+        offset = 0
+        while True:
+            response = self.get_stream(self._rawaddr_url(address, config, offset), timeout=15)
+            if response.status_code != 200:
+                response.close()
+                raise FetchError(f"Failed to fetch Bitcoin transactions. Status code: {response.status_code}")
+            # n_tx comes before txs, the offset check needs the page to be read through
+            header = {}
+            page = {'count': 0, 'last': None}
+            yield self._stream_page(response, ('txs',), header, page)
+            if not page['count']:
+                return
+            offset += page['count']
+            if offset >= header.get('n_tx', 0):
+                return
+
+
+    def _iter_ethereum_pages(self, address, config, start_block=0, action='txlist'):
+        """Pages of one Etherscan account list (see ETHEREUM_ACTIONS), newest first.
+
+        Etherscan refuses page * offset beyond ETHERSCAN_WINDOW results, so
+        once that window is used up the block range is narrowed to end at
+        the oldest block seen and paging restarts from page 1. Token and internal
+        transfers are tagged with the list they came from ('endpoint').
+        """
+        page_size = config['page_size']
+        end_block = 99999999
+        boundary_hashes = set()
+        while True:
+            page = 1
+            oldest_block = None
+            oldest_hashes = set()
+            while True:
+                url = self._txlist_url(address, start_block, end_block, page, page_size, action)
+                response = self.get_stream(url, timeout=15)
+                if response.status_code != 200:
+                    response.close()
+                    raise FetchError(f"Failed to fetch Ethereum transactions. Status code: {response.status_code}")
+                
+                header = {}
+                counted = {'count': 0, 'last': None}
+                oldest = {'block': oldest_block, 'hashes': oldest_hashes}
+                
+                def txs(result):
+                    for tx in result:
+                        block = int(tx.get('blockNumber', 0))
+                        # One transaction can hold several token or internal transfers
+                        key = (tx.get('hash'), tx.get('logIndex'), tx.get('traceId'))
+                        if oldest['block'] is None or block < oldest['block']:
+                            oldest['block'] = block
+                            oldest['hashes'] = set()
+                        if block == oldest['block']:
+                            oldest['hashes'].add(key)
+                        if key not in boundary_hashes:
+                            if action != 'txlist':
+                                tx['endpoint'] = action
+                            yield tx
+                
+                yield txs(self._stream_page(response, ('result',), header, counted))
+                oldest_block, oldest_hashes = oldest['block'], oldest['hashes']
+                if header.get('status') != '1' or 'result' in header:
+                    # Etherscan reports an exhausted range as status 0 with an empty result
+                    if 'result' not in header and not counted['count']:
+                        return
+                    raise FetchError(f"Etherscan API error: {header.get('message', 'Unknown error')}")
+                
+                if counted['count'] < page_size:
+                    return
+                if (page + 1) * page_size > ETHERSCAN_WINDOW:
+                    break
+                page += 1
+            
+            if oldest_block is None:
+                return
+            if oldest_block == end_block:
+                # A single block holds more than a full window, nothing left to narrow
+                end_block -= 1
+                boundary_hashes = set()
+            else:
+                # Re-enter at the oldest block, skipping the rows already yielded from it
+                end_block = oldest_block
+                boundary_hashes = oldest_hashes
+
+
+    def _iter_xrp_pages(self, address, config):
+        """xrpscan account transactions, walked with the response marker.
+
+        A page's marker is only known once the page is read, so pages
+        cannot be asked for side by side; iter_transactions reads them
+        through _prefetch, the next ones downloading while earlier ones
+        are parsed.
+        """
+        url = f"{config['api_base']}/account/{address}/transactions"
+        marker = None
+        while True:
+            # Markers are objects on some servers, sent back as the JSON they came in
+            params = {'marker': marker if isinstance(marker, str) else json.dumps(marker)} if marker else None
+            response = self.get_stream(url, params=params, timeout=15)
+            if response.status_code != 200:
+                response.close()
+                raise FetchError(f"Failed to fetch XRP transactions. Status code: {response.status_code}")
+            header = {}
+            page = {'count': 0, 'last': None}
+            yield self._stream_page(response, ('transactions',), header, page)
+            marker = header.get('marker')
+            if not marker or not page['count']:
+                return
+
+
+    def _iter_solana_pages(self, address, config, min_slot=None):
+        """getSignaturesForAddress pages, walked with `before`.
+
+        The transactions of a page are fetched with getTransaction in
+        batches of rpc_batch calls per request. With `min_slot` paging
+        stops at the first signature older than that slot.
+        """
+        url = config['api_base']
+        page_size = config['page_size']
+        before = None
+        while True:
+            options = {'limit': page_size}
+            if before:
+                options['before'] = before
+            signatures, = self.rpc(url, [('getSignaturesForAddress', [address, options])])
+            if signatures is None:
+                raise FetchError("Failed to fetch Solana signatures from the RPC node")
+            reached = min_slot is not None and any(sig.get('slot', 0) < min_slot for sig in signatures)
+            if reached:
+                signatures = [sig for sig in signatures if sig.get('slot', 0) >= min_slot]
+            if signatures:
+                yield self._solana_transactions(url, signatures, config['rpc_batch'])
+            if reached or len(signatures) < page_size:
+                return
+            before = signatures[-1].get('signature')
+
+
+    def _solana_transactions(self, url, signatures, batch_size):
+        """getTransaction results of signature infos, many calls per request"""
+        options = {'encoding': 'json', 'maxSupportedTransactionVersion': 0}
+        for start in range(0, len(signatures), batch_size):
+            batch = signatures[start:start + batch_size]
+            results = self.rpc(url, [('getTransaction', [sig['signature'], options]) for sig in batch])
+            for sig, tx in zip(batch, results):
+                # Transactions the node has pruned still count, with their signature info only
+                tx = tx or {'slot': sig.get('slot'), 'blockTime': sig.get('blockTime')}
+                tx['signature'] = sig['signature']
+                yield tx
+    
+
+    def _parse_bitcoin_tx(self, tx, address, config):
+        """get Bitcoin transaction from blockchain.info, amounts worked out in satoshis"""
+        try:
+            flows = bitcoin_flows(tx, address)
+            scale = SATOSHIS[config['decimals']]
+            return {
+                'hash': tx.get('hash', ''),
+                'timestamp': datetime.fromtimestamp(tx.get('time', 0)),
+                'amount': flows['amount'] / scale,
+                'type': 'sent' if flows['sender'] else 'received',
+                'fee': flows['fee'] / scale,
+                'confirmations': tx.get('block_height', 'pending'),
+                'units': flows['amount'],
+                'fee_units': flows['fee'],
+                'flows': flows['parties'],
+                'raw_data': tx
+            }
+        
+        except Exception as e:
+            self.show_error(f"Error parsing Bitcoin transaction: {str(e)}")
+            return None
+    
+
+    def _parse_ethereum_tx(self, tx, address, config):
+        """get Ethereum transaction, ERC-20 or internal transfer from Etherscan"""
+        try:
+            timestamp = datetime.fromtimestamp(int(tx.get('timeStamp', 0)))
+            tx_hash = tx.get('hash', '')
+            endpoint = tx.get('endpoint')
+            
+            from_addr = tx.get('from', '').lower()
+            # Internal transfers creating a contract have no 'to'
+            to_addr = (tx.get('to') or tx.get('contractAddress', '')).lower()
+            address_lower = address.lower()
+            
+            decimals = int(tx.get('tokenDecimal') or 0) if endpoint == 'tokentx' else config['decimals']
+            amount = int(tx.get('value') or 0) / (10 ** decimals)
+            
+            if endpoint == 'txlistinternal' and tx.get('isError') == '1':
+                tx_type = 'interaction'
+                amount = 0
+            elif from_addr == address_lower:
+                tx_type = 'sent'
+                amount = -amount
+            elif to_addr == address_lower:
+                tx_type = 'received'
+            else:
+                tx_type = 'interaction'
+            
+            # Token and internal transfers ride on a transaction whose gas is counted with it
+            if endpoint:
+                fee = 0
+            else:
+                gas_used = int(tx.get('gasUsed', 0))
+                gas_price = int(tx.get('gasPrice', 0))
+                fee = (gas_used * gas_price) / (10 ** config['decimals'])
+            
+            parsed = {
+                'hash': tx_hash,
+                'timestamp': timestamp,
+                'amount': amount,
+                'type': tx_type,
+                'fee': fee,
+                'confirmations': int(tx.get('confirmations', 0)),
+                'from': from_addr,
+                'to': to_addr,
+                'raw_data': tx
+            }
+            if endpoint == 'tokentx':
+                parsed['asset'] = tx.get('tokenSymbol') or tx.get('contractAddress', '').lower()
+                parsed['entry'] = f"{endpoint}:{tx.get('logIndex', '')}"
+            elif endpoint:
+                parsed['entry'] = f"{endpoint}:{tx.get('traceId', '')}"
+            return parsed
+        
+        except Exception as e:
+            self.show_error(f"Error parsing Ethereum transaction: {str(e)}")
+            return None
+        
+    
+    def _parse_xrp_tx(self, tx, address, config):
+        """get XRP transaction, delivered amounts worked out in drops"""
+        try:
+            date = tx.get('date')
+            if isinstance(date, (int, float)):
+                timestamp = (RIPPLE_EPOCH + timedelta(seconds=date)).astimezone()
+            elif date:
+                # fromisoformat only reads a 'Z' suffix from Python 3.11 on
+                timestamp = datetime.fromisoformat(date[:-1] + '+00:00' if date.endswith('Z') else date)
+            else:
+                timestamp = None
+            
+            flows = xrp_flows(tx, address)
+            scale = SATOSHIS[config['decimals']]
+            parsed = {
+                'hash': tx.get('hash', ''),
+                'timestamp': timestamp,
+                'amount': flows['amount'] / scale,
+                'type': flows['type'],
+                'fee': flows['fee'] / scale,
+                'confirmations': tx.get('ledger_index', 0),
+                'units': flows['amount'],
+                'fee_units': flows['fee'],
+                'flows': flows['parties'],
+                'raw_data': tx
+            }
+            if flows['asset']:
+                parsed['asset'] = flows['asset']
+            return parsed
+        
+        except Exception as e:
+            self.show_error(f"Error parsing XRP transaction: {str(e)}")
+            return None
+    
+    def _parse_solana_tx(self, tx, address, config):
+        """get Solana transaction from getTransaction, amounts worked out in lamports"""
+        try:
+            flows = solana_flows(tx, address)
+            scale = SATOSHIS[config['decimals']]
+            amount = flows['amount']
+            if amount > 0:
+                tx_type = 'received'
+            elif amount < 0:
+                tx_type = 'sent'
+            else:
+                tx_type = 'interaction'
+            
+            return {
+                'hash': tx.get('signature', ''),
+                'timestamp': datetime.fromtimestamp(tx.get('blockTime') or 0),
+                'amount': amount / scale,
+                'type': tx_type,
+                'fee': flows['fee'] / scale,
+                'confirmations': tx.get('slot', 'pending'),
+                'units': amount,
+                'fee_units': flows['fee'],
+                'flows': flows['parties'],
+                'raw_data': tx
+            }
+        
+        except Exception as e:
+            self.show_error(f"Error parsing Solana transaction: {str(e)}")
+            return None
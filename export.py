@@ -0,0 +1,84 @@
+"""Streaming CSV / JSON Lines output shared by the command line and the GUI export.
+
+Rows are dicts written one at a time as they come out of a generator, so
+an export never holds more than one row in memory.
+"""
+import csv
+import json
+from datetime import datetime
+
+from crypto_api import Cryptocurrency, CRYPTO_CONFIGS
+
+
+FORMATS = ['jsonl', 'csv']
+
+TABLE_FIELDS = [
+    'crypto', 'address', 'hash', 'timestamp', 'type', 'amount', 'asset', 'fee', 'counterparty',
+    'usd_price', 'usd_value', 'usd_value_now',
+]
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Cryptocurrency):
+        return CRYPTO_CONFIGS[value]['symbol']
+    return value
+
+
+class RowWriter:
+    """Write dict rows to a text file as CSV (header first) or JSON Lines"""
+
+    def __init__(self, out, fields, fmt='jsonl'):
+        self.out = out
+        self.fields = fields
+        self.count = 0
+        self.writer = None
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(out, fieldnames=fields)
+            self.writer.writeheader()
+
+    def write(self, row):
+        row = {key: format_value(value) for key, value in row.items()}
+        if self.writer:
+            self.writer.writerow(row)
+        else:
+            self.out.write(json.dumps(row) + "\n")
+        self.count += 1
+
+    def write_all(self, rows):
+        for row in rows:
+            self.write(row)
+        return self.count
+
+
+def table_rows(table, price=0):
+    """One export row per transaction of a TransactionTable, built lazily.
+
+    usd_value is at the price of the day of the transaction, usd_value_now
+    at `price`. asset is the symbol of the amount, the coin's or a token's;
+    token transfers have no USD value.
+    """
+    for tx in table:
+        yield {
+            'crypto': table.crypto,
+            'address': table.address,
+            'hash': tx['hash'],
+            'timestamp': tx['timestamp'],
+            'type': tx['type'],
+            'amount': tx['amount'],
+            'asset': tx['asset'] or table.symbol,
+            'fee': tx['fee'],
+            'counterparty': tx['counterparty'],
+            'usd_price': tx['usd_price'],
+            'usd_value': abs(tx['amount']) * tx['usd_price'] if tx['usd_price'] is not None else None,
+            'usd_value_now': abs(tx['amount']) * price if price > 0 and not tx['asset'] else None,
+        }
+
+
+def export_table(path, table, price=0, fmt=None):
+    """Stream a TransactionTable to `path`; the format follows the extension unless given"""
+    if fmt is None:
+        fmt = 'jsonl' if path.lower().endswith(('.jsonl', '.json')) else 'csv'
+    with open(path, 'w', newline='') as out:
+        return RowWriter(out, TABLE_FIELDS, fmt).write_all(table_rows(table, price))
@@ -1,449 +1,18 @@
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import requests
-import matplotlib.pyplot as plt
-import networkx as nx
 from datetime import datetime
 import threading
-from collections import defaultdict
-import pyperclip
-import re
-from enum import Enum
-from matplotlib.patches import Patch
-import time
-
-
-class Cryptocurrency(Enum):
-    BITCOIN = "bitcoin"
-    ETHEREUM = "ethereum"
-    XRP = "ripple"
-    SOLANA = "solana"
-    
-
-CRYPTO_CONFIGS = {
-    Cryptocurrency.BITCOIN: {
-        "name": "Bitcoin",
-        "symbol": "BTC",
-        "explorer": "blockchain.info",
-        "api_base": "https://blockchain.info",
-        "decimals": 8,
-        "color": "#F7931A", 
-    },
-    Cryptocurrency.ETHEREUM: {
-        "name": "Ethereum",
-        "symbol": "ETH",
-        "explorer": "etherscan.io",
-        "api_base": "https://api.etherscan.io/api",
-        "decimals": 18,
-        "color": "#627EEA",  
-    },
-    Cryptocurrency.XRP: {
-        "name": "XRP",
-        "symbol": "XRP",
-        "explorer": "xrpscan.com",
-        "api_base": "https://api.xrpscan.com/api/v1",
-        "decimals": 6,
-        "color": "#FF0000", 
-    },
-    Cryptocurrency.SOLANA: {
-        "name": "Solana",
-        "symbol": "SOL",
-        "explorer": "solscan.io",
-        "api_base": "https://public-api.solscan.io",
-        "decimals": 9,
-        "color": "#00FFA3",
-    }
-}
-
-class MultiCryptoAPI:    
-    def __init__(self, error_callback=None):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        self.error_callback = error_callback
-    
-    def show_error(self, message):
-        """Display error message through callback"""
-        if self.error_callback:
-            self.error_callback(message)
-    
-    def validate_address(self, crypto, address):
-        if crypto == Cryptocurrency.BITCOIN:
-            return self.validate_bitcoin_address(address)
-        elif crypto == Cryptocurrency.ETHEREUM:
-            return self.validate_ethereum_address(address)
-        elif crypto == Cryptocurrency.XRP:
-            return self.validate_xrp_address(address)
-        elif crypto == Cryptocurrency.SOLANA:
-            return self.validate_solana_address(address)
-        return False
-
-    
-    def validate_bitcoin_address(self, address):
-        """Validate Bitcoin address (supports P2PKH, P2SH, and Bech32)"""
-        address = address.strip()
-        
-        # P2PKH(1)
-        if re.match(r'^1[1-9A-HJ-NP-Za-km-z]{25,34}$', address):
-            return True
-        
-        # P2SH (3)
-        if re.match(r'^3[1-9A-HJ-NP-Za-km-z]{25,34}$', address):
-            return True
-        
-        # Bech32 (bc1)
-        if address.startswith('bc1'):
-            if len(address) < 42 or len(address) > 62:
-                return False
-            if not re.match(r'^bc1[02-9ac-hj-np-z]{11,71}$', address.lower()):
-                return False
-            return True
-        
-        # Testnet
-        if address.startswith('tb1') or address.startswith('2') or address.startswith('m') or address.startswith('n'):
-            return True
-        
-        return False
-
-
-    def validate_ethereum_address(self, address):
-        """Validate Ethereum"""
-        address = address.strip()
-        if not address.startswith('0x'):
-            return False
-        if len(address) != 42:
-            return False
-        try:
-            int(address[2:], 16)
-            return True
-        except:
-            return False
-    
-
-    def validate_xrp_address(self, address):
-        """Validate XRP """
-        address = address.strip()
-        if not address.startswith('r'):
-            return False
-        if len(address) < 25 or len(address) > 35:
-            return False
-        if not re.match(r'^r[1-9A-HJ-NP-Za-km-z]{24,33}$', address):
-            return False
-        return True
-    
-
-    def validate_solana_address(self, address):
-        """Validate Solana"""
-        address = address.strip()
-        if len(address) < 32 or len(address) > 44:
-            return False
-        if not re.match(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$', address):
-            return False
-        return True
-    
-
-    def fetch_balance(self, crypto, address):
-        """Fetch balance for specific wallet"""
-        config = CRYPTO_CONFIGS[crypto]
-        
-        try:
-            if crypto == Cryptocurrency.BITCOIN:
-                api_url = f"https://blockchain.info/rawaddr/{address}"
-                response = self.session.get(api_url, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    balance = data.get('final_balance', 0) / (10 ** config['decimals'])
-                    total_received = data.get('total_received', 0) / (10 ** config['decimals'])
-                    total_sent = data.get('total_sent', 0) / (10 ** config['decimals'])
-                    tx_count = data.get('n_tx', 0)
-                    
-                    return {
-                        'balance': balance,
-                        'total_received': total_received,
-                        'total_sent': total_sent,
-                        'transaction_count': tx_count,
-                        'raw_data': data
-                    }
-                else:
-                    self.show_error(f"Failed to fetch Bitcoin balance. Status code: {response.status_code}")
-            
-            elif crypto == Cryptocurrency.ETHEREUM:
-                api_url = f"https://api.etherscan.io/api?module=account&action=balance&address={address}&tag=latest"
-                response = self.session.get(api_url, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('status') == '1':
-                        balance = int(data.get('result', 0)) / (10 ** config['decimals'])
-                        
-                        tx_url = f"https://api.etherscan.io/api?module=account&action=txlist&address={address}&startblock=0&endblock=99999999&sort=asc"
-                        tx_response = self.session.get(tx_url, timeout=10)
-                        tx_count = 0
-                        if tx_response.status_code == 200:
-                            tx_data = tx_response.json()
-                            tx_count = len(tx_data.get('result', []))
-                        
-                        return {
-                            'balance': balance,
-                            'total_received': None,
-                            'total_sent': None,
-                            'transaction_count': tx_count,
-                            'raw_data': data
-                        }
-                    else:
-                        self.show_error(f"Etherscan API error: {data.get('message', 'Unknown error')}")
-                else:
-                    self.show_error(f"Failed to fetch Ethereum balance. Status code: {response.status_code}")
-            
-            elif crypto == Cryptocurrency.XRP:
-                url = f"{config['api_base']}/account/{address}"
-                response = self.session.get(url, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    balance = float(data.get('xrpBalance', 0))
-                    
-                    return {
-                        'balance': balance,
-                        'total_received': None,
-                        'total_sent': None,
-                        'transaction_count': data.get('transactions', 0),
-                        'raw_data': data
-                    }
-                else:
-                    self.show_error(f"Failed to fetch XRP balance. Status code: {response.status_code}")
-            
-            elif crypto == Cryptocurrency.SOLANA:
-                url = f"{config['api_base']}/account/{address}"
-                response = self.session.get(url, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    balance = data.get('lamports', 0) / (10 ** config['decimals'])
-                    
-                    return {
-                        'balance': balance,
-                        'total_received': None,
-                        'total_sent': None,
-                        'transaction_count': data.get('transactionCount', 0),
-                        'raw_data': data
-                    }
-                else:
-                    self.show_error(f"Failed to fetch Solana balance. Status code: {response.status_code}")
-        
-        except requests.exceptions.Timeout:
-            self.show_error(f"Timeout while fetching {crypto.name} balance. Please try again.")
-        except requests.exceptions.ConnectionError:
-            self.show_error(f"Connection error while fetching {crypto.name} balance. Check your internet connection.")
-        except Exception as e:
-            self.show_error(f"Error fetching {crypto.name} balance: {str(e)}")
-        return None
-    
-    
-    def fetch_transactions(self, crypto, address, limit=500):
-        """Fetch transactions for specific coin"""
-        config = CRYPTO_CONFIGS[crypto]
-        transactions = []
-        
-        try:
-            if crypto == Cryptocurrency.BITCOIN:
-                url = f"https://blockchain.info/rawaddr/{address}?limit={limit}"
-                response = self.session.get(url, timeout=15)
-                if response.status_code == 200:
-                    data = response.json()
-                    for tx in data.get('txs', []):
-                        tx_data = self._parse_bitcoin_tx(tx, address, config)
-                        if tx_data:
-                            transactions.append(tx_data)
-                    if not transactions:
-                        self.show_error(f"No Bitcoin transactions found for address: {address}")
-                else:
-                    self.show_error(f"Failed to fetch Bitcoin transactions. Status code: {response.status_code}")
-            
-            elif crypto == Cryptocurrency.ETHEREUM:
-                url = f"https://api.etherscan.io/api?module=account&action=txlist&address={address}&startblock=0&endblock=99999999&sort=desc&page=1&offset={limit}"
-                response = self.session.get(url, timeout=15)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('status') == '1':
-                        for tx in data.get('result', []):
-                            tx_data = self._parse_ethereum_tx(tx, address, config)
-                            if tx_data:
-                                transactions.append(tx_data)
-                        if not transactions:
-                            self.show_error(f"No Ethereum transactions found for address: {address}")
-                    else:
-                        self.show_error(f"Etherscan API error: {data.get('message', 'Unknown error')}")
-                else:
-                    self.show_error(f"Failed to fetch Ethereum transactions. Status code: {response.status_code}")
-            
-            elif crypto == Cryptocurrency.XRP:
-                url = f"{config['api_base']}/account/{address}/transactions"
-                response = self.session.get(url, timeout=15)
-                if response.status_code == 200:
-                    data = response.json()
-                    for tx in data.get('transactions', []):
-                        tx_data = self._parse_xrp_tx(tx, address, config)
-                        if tx_data:
-                            transactions.append(tx_data)
-                    if not transactions:
-                        self.show_error(f"No XRP transactions found for address: {address}")
-                else:
-                    self.show_error(f"Failed to fetch XRP transactions. Status code: {response.status_code}")
-            
-            elif crypto == Cryptocurrency.SOLANA:
-                url = f"{config['api_base']}/account/transactions?account={address}&limit={limit}"
-                response = self.session.get(url, timeout=15)
-                if response.status_code == 200:
-                    data = response.json()
-                    for tx in data:
-                        tx_data = self._parse_solana_tx(tx, address, config)
-                        if tx_data:
-                            transactions.append(tx_data)
-                    if not transactions:
-                        self.show_error(f"No Solana transactions found for address: {address}")
-                else:
-                    self.show_error(f"Failed to fetch Solana transactions. Status code: {response.status_code}")
-        
-        except requests.exceptions.Timeout:
-            self.show_error(f"Timeout while fetching {crypto.name} transactions. Please try again.")
-        except requests.exceptions.ConnectionError:
-            self.show_error(f"Connection error while fetching {crypto.name} transactions. Check your internet connection.")
-        except Exception as e:
-            self.show_error(f"Error fetching {crypto.name} transactions: {str(e)}")
-        return transactions[:limit]
-    
-
-    
-    def _parse_bitcoin_tx(self, tx, address, config):
-        """get Bitcoin transaction from blockchain.info"""
-        try:
-            timestamp = datetime.fromtimestamp(tx.get('time', 0))
-            tx_hash = tx.get('hash', '')
-            
-            amount = 0
-            tx_type = 'unknown'
-            
-            is_sender = False
-            for inp in tx.get('inputs', []):
-                prev_out = inp.get('prev_out', {})
-                if prev_out.get('addr') == address:
-                    is_sender = True
-            
-            for out in tx.get('out', []):
-                if out.get('addr') == address:
-                    amount += out.get('value', 0) / (10 ** config['decimals'])
-            
-            if is_sender:
-                total_sent = 0
-                for out in tx.get('out', []):
-                    if out.get('addr') != address:
-                        total_sent += out.get('value', 0) / (10 ** config['decimals'])
-                amount = -total_sent
-                tx_type = 'sent'
-            else:
-                tx_type = 'received'
-            
-            return {
-                'hash': tx_hash,
-                'timestamp': timestamp,
-                'amount': amount,
-                'type': tx_type,
-                'fee': tx.get('fee', 0) / (10 ** config['decimals']),
-                'confirmations': tx.get('block_height', 'pending'),
-                'raw_data': tx
-            }
-        
-        except Exception as e:
-            self.show_error(f"Error parsing Bitcoin transaction: {str(e)}")
-            return None
-    
-
-    def _parse_ethereum_tx(self, tx, address, config):
-        """get Ethereum transaction from Etherscan"""
-        try:
-            timestamp = datetime.fromtimestamp(int(tx.get('timeStamp', 0)))
-            tx_hash = tx.get('hash', '')
-            
-            from_addr = tx.get('from', '').lower()
-            to_addr = tx.get('to', '').lower()
-            address_lower = address.lower()
-            
-            amount = int(tx.get('value', 0)) / (10 ** config['decimals'])
-            
-            if from_addr == address_lower:
-                tx_type = 'sent'
-                amount = -amount
-            elif to_addr == address_lower:
-                tx_type = 'received'
-            else:
-                tx_type = 'interaction'
-            
-            gas_used = int(tx.get('gasUsed', 0))
-            gas_price = int(tx.get('gasPrice', 0))
-            fee = (gas_used * gas_price) / (10 ** config['decimals'])
-            
-            return {
-                'hash': tx_hash,
-                'timestamp': timestamp,
-                'amount': amount,
-                'type': tx_type,
-                'fee': fee,
-                'confirmations': int(tx.get('confirmations', 0)),
-                'from': from_addr,
-                'to': to_addr,
-                'raw_data': tx
-            }
-        
-        except Exception as e:
-            self.show_error(f"Error parsing Ethereum transaction: {str(e)}")
-            return None
-        
-    
-    def _parse_xrp_tx(self, tx, address, config):
-        """Pet XRP transaction"""
-        try:
-            timestamp = datetime.strptime(tx.get('date', ''), '%Y-%m-%dT%H:%M:%S%z') if tx.get('date') else datetime.now()
-            tx_hash = tx.get('hash', '')
-            
-            amount = float(tx.get('Amount', 0)) / (10 ** config['decimals'])
-            tx_type = 'received' if tx.get('Destination') == address else 'sent'
-            
-            if tx_type == 'sent':
-                amount = -amount
-            
-            return {
-                'hash': tx_hash,
-                'timestamp': timestamp,
-                'amount': amount,
-                'type': tx_type,
-                'fee': float(tx.get('Fee', 0)) / (10 ** config['decimals']),
-                'confirmations': tx.get('ledger_index', 0),
-                'raw_data': tx
-            }
-        
-        except Exception as e:
-            self.show_error(f"Error parsing XRP transaction: {str(e)}")
-            return None
-    
-    def _parse_solana_tx(self, tx, address, config):
-        """get Solana transaction"""
-        try:
-            timestamp = datetime.fromtimestamp(tx.get('blockTime', 0))
-            tx_hash = tx.get('txHash', '')
-            
-            return {
-                'hash': tx_hash,
-                'timestamp': timestamp,
-                'amount': 0,
-                'type': 'unknown',
-                'fee': tx.get('fee', 0) / (10 ** config['decimals']),
-                'confirmations': 1,
-                'raw_data': tx
-            }
-        
-        except Exception as e:
-            self.show_error(f"Error parsing Solana transaction: {str(e)}")
-            return None
+from analysis import flow_statistics, FlowGraph
+from crawler import CounterpartyCrawler
+from crypto_api import Cryptocurrency, CRYPTO_CONFIGS, MultiCryptoAPI
+from export import export_table
+from parse_pool import ParsePool
+from price_history import PriceHistory, day_span, table_day_span
+from price_service import PriceService
+from session import SESSION_EXTENSION, save_session, load_session
+from tx_cache import TransactionCache
+from tx_columns import TransactionTable
+from tx_table import VirtualTreeview
 
 
 class MoneyFlowAnalyzer:
@@ -465,19 +34,36 @@ class MoneyFlowAnalyzer:
         # vars
         self.address = tk.StringVar()
         self.crypto_var = tk.StringVar(value="Bitcoin (BTC)")
-        self.transaction_limit = 2000
+        self.transaction_limit = 25000
+        self.crawl_hops = 3
+        self.graph_top_k = 20
+        self.expand_limit = 200
+        self.report_page_size = 200
         self.transactions_data = []
+        self.display_price = 0
+        self.balance_data = None
         self.stats_labels = {}
         self.status_var = tk.StringVar(value="Ready. Select cryptocurrency and enter address.")
-        self.current_prices = {}
-        self.full_txids = {}
+        # Last saved quote first, the refresh thread replaces it once a provider answers
+        self.price_service = PriceService(on_update=lambda: self.root.after(0, self.update_price_labels),
+                                          on_error=self.show_price_error)
+        self.current_prices = dict(self.price_service.prices)
         self.current_fig = None
         self.current_canvas = None
+        self.graph_view = None
+        self.graph_toolbar = None
+        self.flow_graph = None
+        self.graph_root = None
+        self.graph_positions = {}
         self.api_handler = MultiCryptoAPI(error_callback=self.show_api_error)
+        self.tx_cache = TransactionCache()
+        self.price_history = PriceHistory()
+        self.parse_pool = ParsePool()
         
         self.setup_styles()
         self.setup_gui()
-        threading.Thread(target=self.fetch_all_prices, daemon=True).start()
+        self.update_price_labels()
+        self.price_service.start()
         
 
     # styles for ui
@@ -532,7 +118,13 @@ class MoneyFlowAnalyzer:
         analyze_btn.pack(side=tk.LEFT, padx=(0, 5))
         
         clear_btn = ttk.Button(control_frame, text="Clear", command=self.clear_data)
-        clear_btn.pack(side=tk.LEFT)
+        clear_btn.pack(side=tk.LEFT, padx=(0, 15))
+        
+        save_btn = ttk.Button(control_frame, text="Save Session...", command=self.save_session)
+        save_btn.pack(side=tk.LEFT, padx=(0, 5))
+        
+        open_btn = ttk.Button(control_frame, text="Open Session...", command=self.open_session)
+        open_btn.pack(side=tk.LEFT)
         
         # Row with Coin Prices
         stats_frame = ttk.Frame(content_frame)
@@ -568,6 +160,9 @@ class MoneyFlowAnalyzer:
             label.pack(side=tk.LEFT, padx=(0, 15))
             self.price_labels[crypto] = label
         
+        self.price_age_label = ttk.Label(prices_group, text="", font=('Segoe UI', 9))
+        self.price_age_label.pack(side=tk.LEFT)
+        
         ttk.Label(stats_frame, text="", font=('Segoe UI', 9)).pack(side=tk.LEFT, expand=True)
         
         # Content Panels
@@ -639,9 +234,8 @@ class MoneyFlowAnalyzer:
         self.status_var.set(f"Selected: {crypto_name}")
         
         if self.address.get():
-            self.transaction_tree.delete(*self.transaction_tree.get_children())
-            for widget in self.graph_frame.winfo_children():
-                widget.destroy()
+            self.transaction_table.clear()
+            self.clear_graph()
             self.status_var.set(f"Ready to analyze {crypto_name} address")
 
 
@@ -669,9 +263,9 @@ class MoneyFlowAnalyzer:
         tree.tag_configure('received', foreground='#44FF44') 
         tree.tag_configure('interaction', foreground='#FFAA44')  
         
-        # scrollbar
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
+        # scrollbar, driven by the virtual table rather than the Treeview
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+        self.transaction_table = VirtualTreeview(tree, scrollbar)
         
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -683,137 +277,10 @@ class MoneyFlowAnalyzer:
         return tree
     
     
-    def fetch_all_prices(self):
-        """Fetch current prices for all cryptocurrencies with fallback options"""
-        attempts = [
-            ("CoinGecko", self.fetch_coingecko_prices),
-            ("CoinMarketCap", self.fetch_coinmarketcap_prices),
-            ("CoinPaprika", self.fetch_coinpaprika_prices)
-        ]
-        
-        for attempt_name, fetch_func in attempts:
-            try:
-                self.root.after(0, lambda: self.status_var.set(f"Fetching prices from {attempt_name}..."))
-                prices, error = fetch_func()
-                if prices:
-                    self.current_prices = prices
-                    self.root.after(0, self.update_price_labels)
-                    self.root.after(0, lambda: self.status_var.set("Prices updated successfully"))
-                    return
-                else:
-                    self.show_price_error(f"Failed to fetch from {attempt_name}: {error}")
-            except Exception as e:
-                self.show_price_error(f"Error with {attempt_name}: {str(e)}")
-            time.sleep(2)  
-        
 
-        # If all attempts fail, use hardcoded recent prices (Feb 5, 2026 estimates)
-        self.show_price_error("All price fetch attempts failed. Using estimated recent prices.")
-
-        # 5/2/2026 prices 
-        self.current_prices = {
-            'bitcoin': 69589,  
-            'ethereum': 2770,   
-            'ripple': 1.36,      
-            'solana': 90      
-        }
-        self.root.after(0, self.update_price_labels)
-    
-
-    def fetch_coingecko_prices(self):
-        """Fetch prices from CoinGecko"""
-        try:
-            url = "https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                'ids': 'bitcoin,ethereum,ripple,solana',
-                'vs_currencies': 'usd'
-            }
-            response = requests.get(url, params=params, timeout=15)
-            if response.status_code == 200:
-                data = response.json()
-                prices = {
-                    'bitcoin': data.get('bitcoin', {}).get('usd', 0),
-                    'ethereum': data.get('ethereum', {}).get('usd', 0),
-                    'ripple': data.get('ripple', {}).get('usd', 0),
-                    'solana': data.get('solana', {}).get('usd', 0)
-                }
-                return prices, None
-            else:
-                return None, f"Status code: {response.status_code}"
-        except Exception as e:
-            return None, str(e)
-
-
-    def fetch_coinmarketcap_prices(self):
-        """Fetch prices from CoinMarketCap (free tier)"""
-        try:
-            url = "https://api.coinmarketcap.com/data-api/v3/cryptocurrency/listing"
-            params = {
-                'start': '1',
-                'limit': '100',
-                'sortBy': 'market_cap',
-                'sortType': 'desc',
-                'convert': 'USD'
-            }
-            response = requests.get(url, params=params, timeout=15)
-            if response.status_code == 200:
-                data = response.json()
-                prices = {}
-                for coin in data.get('data', {}).get('cryptoCurrencyList', []):
-                    symbol = coin.get('symbol', '').lower()
-                    if symbol == 'btc':
-                        prices['bitcoin'] = coin.get('quotes', [{}])[0].get('price', 0)
-                    elif symbol == 'eth':
-                        prices['ethereum'] = coin.get('quotes', [{}])[0].get('price', 0)
-                    elif symbol == 'xrp':
-                        prices['ripple'] = coin.get('quotes', [{}])[0].get('price', 0)
-                    elif symbol == 'sol':
-                        prices['solana'] = coin.get('quotes', [{}])[0].get('price', 0)
-                
-                # Check if we got all prices
-                required = ['bitcoin', 'ethereum', 'ripple', 'solana']
-                if all(req in prices for req in required):
-                    return prices, None
-                else:
-                    return None, "Missing some coin prices"
-            else:
-                return None, f"Status code: {response.status_code}"
-        except Exception as e:
-            return None, str(e)
-        
-    
-    def fetch_coinpaprika_prices(self):
-        """Fetch prices from CoinPaprika"""
-        try:
-            url = "https://api.coinpaprika.com/v1/tickers"
-            response = requests.get(url, timeout=15)
-            if response.status_code == 200:
-                data = response.json()
-                prices = {}
-                for coin in data:
-                    symbol = coin.get('symbol', '').lower()
-                    if symbol == 'btc':
-                        prices['bitcoin'] = coin.get('quotes', {}).get('USD', {}).get('price', 0)
-                    elif symbol == 'eth':
-                        prices['ethereum'] = coin.get('quotes', {}).get('USD', {}).get('price', 0)
-                    elif symbol == 'xrp':
-                        prices['ripple'] = coin.get('quotes', {}).get('USD', {}).get('price', 0)
-                    elif symbol == 'sol':
-                        prices['solana'] = coin.get('quotes', {}).get('USD', {}).get('price', 0)
-                
-                # Check if we got all prices
-                required = ['bitcoin', 'ethereum', 'ripple', 'solana']
-                if all(req in prices for req in required):
-                    return prices, None
-                else:
-                    return None, "Missing some coin prices"
-            else:
-                return None, f"Status code: {response.status_code}"
-        except Exception as e:
-            return None, str(e)
-        
-    
     def update_price_labels(self):
+        if self.price_service.prices:
+            self.current_prices = dict(self.price_service.prices)
         for crypto, price in self.current_prices.items():
             if crypto in self.price_labels:
                 display_name = crypto.title()
@@ -822,14 +289,25 @@ class MoneyFlowAnalyzer:
                 self.price_labels[crypto].config(
                     text=f"{display_name}: ${price:,.2f}"
                 )
+        
+        # How old the quote is, in red once it is past its TTL
+        age = self.price_service.age()
+        if age is None:
+            text = "(no quote yet)" if not self.current_prices else "(from session)"
+        elif age < 60:
+            text = f"({self.price_service.source}, just now)"
+        elif age < 3600:
+            text = f"({self.price_service.source}, {int(age // 60)} min ago)"
+        elif age < 86400:
+            text = f"({self.price_service.source}, {int(age // 3600)} h ago)"
+        else:
+            text = f"({self.price_service.source}, {int(age // 86400)} days ago)"
+        stale = self.price_service.is_stale()
+        self.price_age_label.config(text=text, foreground="#FF6B6B" if stale else self.fg_color)
     
     def show_price_error(self, message):
-        """Show price fetch errors in status bar and messagebox"""
+        """Show price fetch errors in the status bar, the last good quote stays in use"""
         self.root.after(0, lambda: self.status_var.set(f"Price Error: {message}"))
-        self.root.after(0, lambda: messagebox.showwarning(
-            "Price Fetch Warning", 
-            f"{message}\n\nUsing estimated prices for calculations."
-        ))
 
     
     def show_api_error(self, message):
@@ -866,9 +344,11 @@ class MoneyFlowAnalyzer:
                                 f"Please check and try again.")
             return
         
-        self.transaction_tree.delete(*self.transaction_tree.get_children())
-        for widget in self.graph_frame.winfo_children():
-            widget.destroy()
+        self.transaction_table.clear()
+        self.transactions_data = TransactionTable(crypto, address)
+        self.balance_data = None
+        self.transaction_table.set_rows(self.transactions_data, self.format_transaction_row)
+        self.clear_graph()
         
         if 'crypto_name' in self.stats_labels:
             for widget in self.stats_labels['crypto_name'].master.winfo_children():
@@ -903,43 +383,145 @@ class MoneyFlowAnalyzer:
                 self.root.after(0, lambda: self.show_error(f"Failed to fetch balance for {config['name']} address"))
                 return
             
-            # Fetch transactions
-            self.root.after(0, lambda: self.status_var.set("Fetching transactions..."))
-            transactions = self.api_handler.fetch_transactions(crypto, address, self.transaction_limit)
-            
-            if not transactions:
-                self.root.after(0, self.show_error, f"No transactions found for this {config['name']} address")
-                return
-            
             # Get current price - use correct coingecko key
             coingecko_key = crypto.value  # 'bitcoin', 'ethereum', 'ripple', 'solana'
             crypto_price = self.current_prices.get(coingecko_key, 0)
             balance_usd = balance_data['balance'] * crypto_price
             
+            # Addresses analyzed before only need the delta since the newest cached block
+            fetched = 0
+            span = None
+            if self.tx_cache.is_cached(crypto, address):
+                self.root.after(0, lambda: self.status_var.set("Fetching new transactions since last analysis..."))
+                # The new pages only go to the cache, the table is parsed from it below
+                for _ in self.tx_cache.fetch(self.api_handler, crypto, address, self.transaction_limit):
+                    pass
+                
+                # Re-parsed from the cached JSON, large histories on all cores at once
+                self.root.after(0, lambda: self.status_var.set("Parsing cached transactions..."))
+                raw_txs = self.tx_cache.raw_transactions(crypto, address, self.transaction_limit)
+                table = self.parse_pool.parse(crypto, address, raw_txs)
+                fetched = len(table)
+                span = table_day_span(table)
+                self.root.after(0, self.set_transactions, address, table, crypto_price)
+            else:
+                # Fetch transactions, handing each page to the GUI as it arrives
+                self.root.after(0, lambda: self.status_var.set("Fetching transactions..."))
+                for batch in self.tx_cache.fetch(self.api_handler, crypto, address, self.transaction_limit):
+                    fetched += len(batch)
+                    span = day_span(batch, span)
+                    self.root.after(0, self.append_transactions, crypto, address, batch, crypto_price)
+                    self.root.after(0, lambda n=fetched: self.status_var.set(f"Fetching transactions... {n} loaded"))
+            
+            if not fetched:
+                self.root.after(0, self.show_error, f"No transactions found for this {config['name']} address")
+                return
+            
+            # Daily prices over the whole span take a request per year of it, none once they are stored
+            if span is not None:
+                self.root.after(0, lambda: self.status_var.set("Fetching historical prices..."))
+                try:
+                    _, failed = self.price_history.ensure(crypto.value, *span)
+                except Exception as e:
+                    failed = [str(e)]
+                if failed:
+                    # The days of a failed range stay unpriced, the rest is priced as usual
+                    message = f"Some historical prices unavailable, using current price there: {'; '.join(failed)}"
+                    self.root.after(0, lambda: self.status_var.set(message))
+            self.root.after(0, self.apply_usd_prices, crypto, address)
+            
             # Update display
-            self.root.after(0, self.update_display, crypto, address, balance_data, transactions, crypto_price, balance_usd)
+            self.root.after(0, self.update_display, crypto, address, balance_data, crypto_price, balance_usd)
             
         except Exception as e:
             self.root.after(0, self.show_error, f"Analysis error: {str(e)}")
     
 
 
-    def update_display(self, crypto, address, balance_data, transactions, price, balance_usd):
+    def append_transactions(self, crypto, address, transactions, price):
+        """Add a page of fetched transactions to the list"""
+        # Pages still arriving for an address analyzed before are dropped
+        if getattr(self.transactions_data, 'address', None) != address:
+            return
+        self.display_price = price
+        
+        # Counterparties are taken out of the raw JSON now, the table does not keep it
+        self.transactions_data.extend(transactions, lambda tx: self.api_handler.counterparties(crypto, tx, address))
+        
+        # Only the rows in view are drawn, once the GUI is idle
+        self.transaction_table.rows_added()
+
+
+    def set_transactions(self, address, table, price):
+        """Show a whole TransactionTable parsed off the GUI thread"""
+        if getattr(self.transactions_data, 'address', None) != address:
+            return
+        self.display_price = price
+        self.transactions_data = table
+        self.transaction_table.set_rows(table, self.format_transaction_row)
+
+
+    def apply_usd_prices(self, crypto, address):
+        """Price every transaction at its own day, from the stored daily prices"""
+        if getattr(self.transactions_data, 'address', None) != address:
+            return
+        prices = self.price_history.prices_at(crypto.value, self.transactions_data.timestamps)
+        self.transactions_data.set_usd_prices(prices)
+        self.transaction_table.reformat()
+
+
+    def format_transaction_row(self, tx):
+        """Treeview values and tags of one row of transactions_data"""
+        amount = tx['amount']
+        symbol = tx['asset'] or self.transactions_data.symbol
+        tx_type = tx['type']
+        # At the price of the transaction's day, the current one when that is unknown; tokens are not priced
+        if tx['asset']:
+            price = 0
+        else:
+            price = tx['usd_price'] if tx['usd_price'] is not None else self.display_price
+        usd_amount = abs(amount) * price if price > 0 else 0
+        
+        time_str = tx['timestamp'].strftime('%Y-%m-%d %H:%M') if tx['timestamp'] else "Unknown"
+        amount_formatted = f"{amount:+.8f} {symbol}" if amount != 0 else f"0.00000000 {symbol}"
+        usd_formatted = f"${usd_amount:,.2f}" if usd_amount > 0 else "$0.00"
+        
+        tx_hash = tx['hash']
+        if len(tx_hash) > 40:
+            hash_display = tx_hash[:40] + "..."
+        else:
+            hash_display = tx_hash
+        
+        tags = ()
+        if tx_type in ('sent', 'received', 'interaction'):
+            tags = (tx_type,)
+        
+        values = (time_str, tx_type.capitalize(), amount_formatted, usd_formatted, hash_display)
+        return values, tags
+
+
+    def update_display(self, crypto, address, balance_data, price, balance_usd, flow_graph=None):
         """Update the GUI with analysis results"""
         try:
             config = CRYPTO_CONFIGS[crypto]
             symbol = config['symbol']
+            self.balance_data = balance_data
+            
+            # Providers that can't report a count up front get the number walked
+            tx_count = balance_data['transaction_count']
+            if tx_count is None:
+                tx_count = len(self.transactions_data)
             
             # Update statistics
             self.stats_labels['balance'].config(text=f"{balance_data['balance']:.6f} {symbol}")
-            self.stats_labels['tx_count'].config(text=str(balance_data['transaction_count']))
+            self.stats_labels['tx_count'].config(text=str(tx_count))
             self.stats_labels['value_usd'].config(text=f"${balance_usd:,.2f}")
             
-            if transactions:
-                dates = [tx['timestamp'] for tx in transactions if isinstance(tx['timestamp'], datetime)]
-                if dates:
-                    first_tx = min(dates).strftime('%Y-%m-%d')
-                    last_tx = max(dates).strftime('%Y-%m-%d')
+            if self.transactions_data:
+                first, last = self.transactions_data.time_range()
+                if first:
+                    first_tx = first.strftime('%Y-%m-%d')
+                    last_tx = last.strftime('%Y-%m-%d')
                     self.stats_labels['first_tx'].config(text=first_tx)
                     self.stats_labels['last_tx'].config(text=last_tx)
                 else:
@@ -949,62 +531,10 @@ class MoneyFlowAnalyzer:
                 self.stats_labels['first_tx'].config(text="No tx")
                 self.stats_labels['last_tx'].config(text="No tx")
             
-            self.transactions_data = []
-            
-            # Add transactions to treeview
-            for tx in transactions:
-                tx_hash = tx.get('hash', 'Unknown')[:64]
-                
-                timestamp = tx.get('timestamp', datetime.now())
-                if isinstance(timestamp, datetime):
-                    time_str = timestamp.strftime('%Y-%m-%d %H:%M')
-                else:
-                    time_str = str(timestamp)
-                
-                amount = tx.get('amount', 0)
-                tx_type = tx.get('type', 'unknown').lower()
-                
-                usd_amount = abs(amount) * price if price > 0 else 0
-                
-                amount_formatted = f"{amount:+.8f} {symbol}" if amount != 0 else f"0.00000000 {symbol}"
-                usd_formatted = f"${usd_amount:,.2f}" if usd_amount > 0 else "$0.00"
-                
-                if len(tx_hash) > 40:
-                    hash_display = tx_hash[:40] + "..."
-                else:
-                    hash_display = tx_hash
-                
-                tags = ()
-                if tx_type == 'sent':
-                    tags = ('sent',)
-                elif tx_type == 'received':
-                    tags = ('received',)
-                elif tx_type == 'interaction':
-                    tags = ('interaction',)
-                
-                item_id = self.transaction_tree.insert('', tk.END, values=(
-                    time_str,
-                    tx_type.capitalize(),
-                    amount_formatted,
-                    usd_formatted,
-                    hash_display
-                ), tags=tags)
-                
-                self.full_txids[item_id] = tx_hash
-                
-                self.transactions_data.append({
-                    'hash': tx_hash,
-                    'type': tx_type,
-                    'amount': amount,
-                    'timestamp': time_str,
-                    'address': address,
-                    'full_tx_data': tx
-                })
-            
             # Create money flow graph
-            self.create_money_flow_graph(crypto)
+            self.create_money_flow_graph(crypto, flow_graph)
             
-            self.status_var.set(f"Analysis complete. Found {balance_data['transaction_count']} transactions")
+            self.status_var.set(f"Analysis complete. Found {tx_count} transactions")
             self.progress_bar.stop()
             
         except Exception as e:
@@ -1012,159 +542,389 @@ class MoneyFlowAnalyzer:
             self.progress_bar.stop()
     
 
-    def create_money_flow_graph(self, crypto):
-        """Create the money flow graph visualization"""
+    def create_money_flow_graph(self, crypto, flow_graph=None):
+        """Build the money flow graph from the analyzed transactions and draw it.
+
+        A `flow_graph` given (from a saved session) is drawn as it is.
+        """
         if not self.transactions_data:
+            self.clear_graph()
             no_data_label = ttk.Label(self.graph_frame, text="No transaction data available", font=('Segoe UI', 12))
             no_data_label.pack(expand=True)
             return    
         try:
-            for widget in self.graph_frame.winfo_children():
-                widget.destroy()
+            # Real counterparties, parallel transfers aggregated into one weighted edge
+            target = self.transactions_data.address
+            if flow_graph is None:
+                flows = FlowGraph(crypto)
+                flows.add_history(target, self.transactions_data, self.transactions_data.counterparties)
+                flow_graph = flows.top_counterparties(target, self.graph_top_k, others="Others")
+            
+            # Positions are only worth keeping while the same address is shown
+            if target != self.graph_root:
+                self.graph_positions = {}
+            self.graph_root = target
+            self.flow_graph = flow_graph
+        except Exception as e:
+            self.show_graph_error(e)
+            return
+        self.draw_flow_graph(crypto)
+
+
+    def draw_flow_graph(self, crypto):
+        """Draw self.flow_graph into the graph tab.
+
+        The figure and toolbar are reused and nodes already on screen keep
+        their positions, so only nodes added since the last draw are laid out.
+        """
+        try:
+            # The plotting stack is imported on first use, it dominates startup time
+            import graph_render
+            from matplotlib.patches import Patch
             
             config = CRYPTO_CONFIGS[crypto]
+            target = self.graph_root
+            G = self.flow_graph.to_networkx()
+            self.graph_positions = graph_render.layout(G, target, previous=self.graph_positions)
             
-            self.current_fig = plt.figure(figsize=(12, 10))
+            if self.current_canvas is None:
+                self.create_graph_canvas()
+            self.current_fig.clear()
             ax = self.current_fig.add_subplot(111)
             
-            G = nx.DiGraph()
-            
+            # Size a node by the value it moved with the wallet that brought it into the graph
             crypto_color = config['color']
-            G.add_node("Target", size=1400, color=crypto_color, label=f"Target\n({config['symbol']})")
-            
-            # Add transaction nodes (green for received, red for sent)
-            max_nodes = min(15, len(self.transactions_data))
-            for i, tx in enumerate(self.transactions_data[:max_nodes]):
-                node_id = f"Tx{i+1}"
-                node_color = "#44FF44" if tx['type'] == 'received' else "#FF4444"
-                G.add_node(node_id, size=600, color=node_color, label=f"Tx{i+1}")
-                
-                if tx['type'] == 'received':
-                    G.add_edge("Source", node_id, weight=abs(tx['amount']))
-                    G.add_edge(node_id, "Target", weight=abs(tx['amount']))
-                elif tx['type'] == 'sent':
-                    G.add_edge("Target", node_id, weight=abs(tx['amount']))
-                    G.add_edge(node_id, "Destination", weight=abs(tx['amount']))
-
-            # colors for nodes 
-            G.add_node("Source", size=800, color="#44FF44", label="Sources")  
-            G.add_node("Destination", size=800, color="#FF4444", label="Destinations") 
+            volume = {}
+            for (source, dest), edge in self.flow_graph.edges.items():
+                source_hop = G.nodes[source]['hop'] or 0
+                dest_hop = G.nodes[dest]['hop'] or 0
+                if source_hop != dest_hop:
+                    party = dest if dest_hop > source_hop else source
+                    volume[party] = volume.get(party, 0) + edge['amount']
+            max_volume = max(volume.values(), default=0) or 1
             
-            try:
-                pos = nx.spring_layout(G, k=1.5, iterations=100, seed=42)
-            except:
-                pos = nx.circular_layout(G)
-            
-            node_colors = [G.nodes[n]['color'] for n in G.nodes()]
-            node_sizes = [G.nodes[n]['size'] for n in G.nodes()]
-            nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=node_sizes, 
-                                 alpha=0.85, ax=ax, linewidths=0.5, edgecolors='white')
-            
-            if G.edges():
-                edge_weights = [G[u][v].get('weight', 1) for u, v in G.edges()]
-                if edge_weights:
-                    max_weight = max(edge_weights)
-                    edge_widths = [0.5 + (w / max_weight * 2) for w in edge_weights]
+            node_colors = []
+            node_sizes = []
+            labels = {}
+            expanded_parties = False
+            for n in G.nodes():
+                if n == target:
+                    node_colors.append(crypto_color)
+                    node_sizes.append(1400)
+                    labels[n] = f"Target\n({config['symbol']})"
+                    continue
+                sends = G.has_edge(n, target)
+                receives = G.has_edge(target, n)
+                if 'members' in G.nodes[n]:
+                    node_colors.append("#888888")
+                    labels[n] = f"Others\n({G.nodes[n]['members']})"
+                elif (G.nodes[n]['hop'] or 0) > 1:
+                    node_colors.append("#44AAFF")
+                    labels[n] = f"{n[:6]}...{n[-4:]}"
+                    expanded_parties = True
+                elif sends and receives:
+                    node_colors.append("#FFAA44")
+                    labels[n] = f"{n[:6]}...{n[-4:]}"
+                elif sends:
+                    node_colors.append("#44FF44")
+                    labels[n] = f"{n[:6]}...{n[-4:]}"
                 else:
-                    edge_widths = [1] * len(G.edges())
-                
-                nx.draw_networkx_edges(G, pos, width=edge_widths, alpha=0.6, edge_color='#666666', 
-                                      arrows=True, arrowsize=8, arrowstyle='->', ax=ax, 
-                                      connectionstyle='arc3,rad=0.1')
+                    node_colors.append("#FF4444")
+                    labels[n] = f"{n[:6]}...{n[-4:]}"
+                node_sizes.append(300 + 700 * volume.get(n, 0) / max_volume)
             
-            # Add labels
-            labels = {n: G.nodes[n]['label'] for n in G.nodes()}
-            nx.draw_networkx_labels(G, pos, labels, font_size=8, font_weight='bold', ax=ax)
-            ax.axis('off')
+            # Transaction count on edges that aggregate several transfers
+            edge_labels = {(u, v): f"x{d['count']}" for u, v, d in G.edges(data=True) if d['count'] > 1}
+            self.graph_view = graph_render.draw_graph(ax, G, target, node_colors, node_sizes, labels, edge_labels,
+                                                      pos=self.graph_positions)
 
             # colors 2             
             legend_elements = [
                 Patch(facecolor=crypto_color, label=f'Target Address ({config["symbol"]})'),
-                Patch(facecolor="#44FF44", label='Incoming Transactions (Received)'),
-                Patch(facecolor="#FF4444", label='Outgoing Transactions (Sent)'),
+                Patch(facecolor="#44FF44", label='Sent to Target (Sources)'),
+                Patch(facecolor="#FF4444", label='Received from Target (Destinations)'),
+                Patch(facecolor="#FFAA44", label='Both Directions'),
             ]
+            if expanded_parties:
+                legend_elements.append(Patch(facecolor="#44AAFF", label='Counterparties of Expanded Wallets'))
             ax.legend(handles=legend_elements, loc='upper left', framealpha=0.3)
-            plt.tight_layout()
-            
-            container = ttk.Frame(self.graph_frame)
-            container.pack(fill=tk.BOTH, expand=True)
+            self.current_fig.tight_layout()
             
-            self.current_canvas = FigureCanvasTkAgg(self.current_fig, container)
-            self.current_canvas.draw()
+            # New view limits become the toolbar's Home
+            self.graph_toolbar.update()
+            self.current_canvas.draw_idle()
             
-            class CustomToolbar(NavigationToolbar2Tk):
-                def __init__(self, canvas, parent, analyzer):
-                    NavigationToolbar2Tk.__init__(self, canvas, parent)
-                    self.analyzer = analyzer
-                    
-                    save_button_index = -1
+        except Exception as e:
+            self.show_graph_error(e)
+
+
+    def create_graph_canvas(self):
+        """Figure, canvas and toolbar of the graph tab, created once per analysis"""
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        
+        for widget in self.graph_frame.winfo_children():
+            widget.destroy()
+        self.current_fig = plt.figure(figsize=(12, 10))
+        
+        container = ttk.Frame(self.graph_frame)
+        container.pack(fill=tk.BOTH, expand=True)
+        
+        self.current_canvas = FigureCanvasTkAgg(self.current_fig, container)
+        self.current_canvas.mpl_connect('button_press_event', self.on_graph_click)
+        
+        class CustomToolbar(NavigationToolbar2Tk):
+            def __init__(self, canvas, parent, analyzer):
+                NavigationToolbar2Tk.__init__(self, canvas, parent)
+                self.analyzer = analyzer
+                
+                save_button_index = -1
+                for i, child in enumerate(self.winfo_children()):
+                    if isinstance(child, tk.Button) and 'Save' in child.cget('text'):
+                        save_button_index = i
+                        break
+                
+                self.refresh_btn = tk.Button(self, text="Refresh Graph", 
+                                            command=self.refresh_graph,
+                                            bg="#404040", fg="white",
+                                            relief=tk.RAISED, bd=1,
+                                            padx=5, pady=2,
+                                            font=('Segoe UI', 9))
+                
+                self.flow_details_btn = tk.Button(self, text="📊 Flow Details", 
+                                                 command=self.show_flow_details,
+                                                 bg="#404040", fg="white",
+                                                 relief=tk.RAISED, bd=1,
+                                                 padx=5, pady=2,
+                                                 font=('Segoe UI', 9))
+                
+                self.follow_funds_btn = tk.Button(self, text="Follow Funds", 
+                                                 command=self.follow_funds,
+                                                 bg="#404040", fg="white",
+                                                 relief=tk.RAISED, bd=1,
+                                                 padx=5, pady=2,
+                                                 font=('Segoe UI', 9))
+                
+                if save_button_index != -1:
+                    after_save_widget = None
                     for i, child in enumerate(self.winfo_children()):
-                        if isinstance(child, tk.Button) and 'Save' in child.cget('text'):
-                            save_button_index = i
+                        if i > save_button_index:
+                            after_save_widget = child
                             break
                     
-                    self.refresh_btn = tk.Button(self, text="Refresh Graph", 
-                                                command=self.refresh_graph,
-                                                bg="#404040", fg="white",
-                                                relief=tk.RAISED, bd=1,
-                                                padx=5, pady=2,
-                                                font=('Segoe UI', 9))
-                    
-                    self.flow_details_btn = tk.Button(self, text="📊 Flow Details", 
-                                                     command=self.show_flow_details,
-                                                     bg="#404040", fg="white",
-                                                     relief=tk.RAISED, bd=1,
-                                                     padx=5, pady=2,
-                                                     font=('Segoe UI', 9))
-                    
-                    if save_button_index != -1:
-                        after_save_widget = None
-                        for i, child in enumerate(self.winfo_children()):
-                            if i > save_button_index:
-                                after_save_widget = child
-                                break
-                        
-                        if after_save_widget:
-                            self.refresh_btn.pack(side=tk.LEFT, before=after_save_widget, padx=(2, 2))
-                            self.flow_details_btn.pack(side=tk.LEFT, before=after_save_widget, padx=(2, 2))
-                        else:
-                            self.refresh_btn.pack(side=tk.LEFT, padx=(2, 2))
-                            self.flow_details_btn.pack(side=tk.LEFT, padx=(2, 2))
+                    if after_save_widget:
+                        self.refresh_btn.pack(side=tk.LEFT, before=after_save_widget, padx=(2, 2))
+                        self.flow_details_btn.pack(side=tk.LEFT, before=after_save_widget, padx=(2, 2))
+                        self.follow_funds_btn.pack(side=tk.LEFT, before=after_save_widget, padx=(2, 2))
                     else:
                         self.refresh_btn.pack(side=tk.LEFT, padx=(2, 2))
                         self.flow_details_btn.pack(side=tk.LEFT, padx=(2, 2))
-                
-                def refresh_graph(self):
-                    self.analyzer.refresh_graph()
-                
-                def show_flow_details(self):
-                    self.analyzer.show_flow_details()
+                        self.follow_funds_btn.pack(side=tk.LEFT, padx=(2, 2))
+                else:
+                    self.refresh_btn.pack(side=tk.LEFT, padx=(2, 2))
+                    self.flow_details_btn.pack(side=tk.LEFT, padx=(2, 2))
+                    self.follow_funds_btn.pack(side=tk.LEFT, padx=(2, 2))
             
-            toolbar = CustomToolbar(self.current_canvas, container, self)
-            toolbar.update()
+            def refresh_graph(self):
+                self.analyzer.refresh_graph()
             
-            self.current_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            toolbar.pack(fill=tk.X)
+            def show_flow_details(self):
+                self.analyzer.show_flow_details()
             
+            def follow_funds(self):
+                self.analyzer.follow_funds()
+        
+        self.graph_toolbar = CustomToolbar(self.current_canvas, container, self)
+        self.graph_toolbar.update()
+        
+        self.current_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.graph_toolbar.pack(fill=tk.X)
 
-        except Exception as e:
-            error_label = ttk.Label(self.graph_frame, text=f"Error creating graph: {str(e)}", 
-                                   font=('Segoe UI', 10), foreground="#FF6B6B")
-            error_label.pack(expand=True)
-            messagebox.showerror("Graph Error", f"Failed to create money flow graph: {str(e)}")
+
+    def clear_graph(self):
+        """Remove the graph tab's widgets and figure, positions are kept for the same address"""
+        for widget in self.graph_frame.winfo_children():
+            widget.destroy()
+        if self.current_fig is not None:
+            import matplotlib.pyplot as plt
+            plt.close(self.current_fig)
+        self.current_fig = None
+        self.current_canvas = None
+        self.graph_toolbar = None
+        self.graph_view = None
+        self.flow_graph = None
+
+
+    def show_graph_error(self, e):
+        self.clear_graph()
+        error_label = ttk.Label(self.graph_frame, text=f"Error creating graph: {str(e)}", 
+                               font=('Segoe UI', 10), foreground="#FF6B6B")
+        error_label.pack(expand=True)
+        messagebox.showerror("Graph Error", f"Failed to create money flow graph: {str(e)}")
     
 
     def refresh_graph(self):
-        if self.transactions_data:
-            crypto = self.get_current_crypto()
-            self.create_money_flow_graph(crypto)
+        """Redraw the current graph, nothing is fetched or laid out again"""
+        if self.flow_graph is not None:
+            self.draw_flow_graph(self.get_current_crypto())
+        elif self.transactions_data:
+            self.create_money_flow_graph(self.get_current_crypto())
+
+
+    def on_graph_click(self, event):
+        """Double-click a counterparty to pull its own counterparties into the graph"""
+        if not event.dblclick or event.inaxes is None or self.graph_toolbar.mode:
+            return
+        node = self.graph_node_at(event)
+        if node is not None:
+            self.expand_graph_node(self.get_current_crypto(), node)
+
+
+    def graph_node_at(self, event, radius=12):
+        """Node drawn within `radius` pixels of a mouse event, if any"""
+        import numpy as np
+        
+        nodes = list(self.graph_positions)
+        if not nodes:
+            return None
+        xy = event.inaxes.transData.transform(np.array([self.graph_positions[n] for n in nodes], dtype=float))
+        distance = np.hypot(xy[:, 0] - event.x, xy[:, 1] - event.y)
+        nearest = int(distance.argmin())
+        return nodes[nearest] if distance[nearest] <= radius else None
+
+
+    def expand_graph_node(self, crypto, node):
+        """Fetch a counterparty's history in background and add its flows to the graph"""
+        attrs = self.flow_graph.nodes.get(node, {})
+        if node == self.graph_root or 'members' in attrs:
+            return
+        short = f"{node[:6]}...{node[-4:]}"
+        if attrs.get('expanded'):
+            self.status_var.set(f"{short} is already expanded")
+            return
+        if not self.api_handler.validate_address(crypto, node):
+            self.status_var.set(f"Cannot expand {short}, not a {CRYPTO_CONFIGS[crypto]['name']} address")
+            return
+        
+        # Marked up front so a second double-click does not fetch it again
+        attrs['expanded'] = True
+        self.status_var.set(f"Expanding {short}...")
+        self.progress_bar.start()
+        threading.Thread(target=self.perform_expand, args=(crypto, self.graph_root, node), daemon=True).start()
+
+
+    def perform_expand(self, crypto, root, node):
+        try:
+            transactions = self.api_handler.fetch_transactions(crypto, node, self.expand_limit)
+        except Exception as e:
+            self.show_error(f"Expand error: {str(e)}")
+            transactions = None
+        self.root.after(0, self.add_expansion, crypto, root, node, transactions)
+
+
+    def add_expansion(self, crypto, root, node, transactions):
+        """Merge an expanded node's top counterparties into the graph and redraw it"""
+        self.progress_bar.stop()
+        # A new analysis may have replaced the graph while the history was loading
+        if self.flow_graph is None or self.graph_root != root or node not in self.flow_graph.nodes:
+            return
+        if transactions is None:
+            self.flow_graph.nodes[node]['expanded'] = False
+            return
+        
+        expansion = FlowGraph(crypto)
+        expansion.add_history(node, transactions,
+                              lambda tx, address: self.api_handler.counterparties(crypto, tx, address),
+                              hop=self.flow_graph.nodes[node]['hop'] or 1)
+        # Wallets already on screen stay as themselves instead of vanishing into Others
+        expansion = expansion.top_counterparties(node, self.graph_top_k, others=f"Others:{node}",
+                                                 pinned=self.flow_graph.nodes)
+        before = len(self.flow_graph.nodes)
+        self.flow_graph.merge(expansion)
+        self.flow_graph.nodes[node]['expanded'] = True
+        
+        self.draw_flow_graph(crypto)
+        self.status_var.set(f"Expanded {node[:6]}...{node[-4:]}: {len(transactions)} transactions, "
+                            f"{len(self.flow_graph.nodes) - before} new wallets")
+
+
+    def follow_funds(self):
+        """Crawl counterparties several hops out from the analyzed address"""
+        address = self.address.get().strip()
+        if not self.transactions_data or not address:
+            messagebox.showinfo("No Data", "Analyze an address before following its funds.")
+            return
+        
+        crypto = self.get_current_crypto()
+        self.status_var.set(f"Following funds up to {self.crawl_hops} hops...")
+        self.progress_bar.start()
+        threading.Thread(target=self.perform_crawl, args=(crypto, address), daemon=True).start()
+
+
+    def perform_crawl(self, crypto, address):
+        """Run the counterparty crawl in background thread"""
+        try:
+            crawler = CounterpartyCrawler(max_hops=self.crawl_hops)
+            
+            def progress(hop, expanded, discovered):
+                self.root.after(0, lambda: self.status_var.set(
+                    f"Following funds: hop {hop + 1}, {expanded} wallets expanded, {discovered} found"))
+            
+            graph = crawler.crawl(crypto, address, progress=progress)
+            self.root.after(0, self.show_crawl_graph, crypto, address, graph, len(crawler.errors))
+        except Exception as e:
+            self.root.after(0, self.show_error, f"Crawl error: {str(e)}")
+
+
+    def show_crawl_graph(self, crypto, address, graph, error_count):
+        """Draw a crawled FlowGraph in its own window"""
+        import graph_render
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from matplotlib.patches import Patch
+        
+        self.progress_bar.stop()
+        config = CRYPTO_CONFIGS[crypto]
+        summary = graph.summary()
+        status = f"Crawl complete. {summary['nodes']} wallets, {summary['edges']} flows"
+        if error_count:
+            status += f" ({error_count} fetch errors)"
+        self.status_var.set(status)
+        
+        window = tk.Toplevel(self.root)
+        window.title(f"{config['name']} Multi-hop Money Flow")
+        window.geometry("1100x900")
+        
+        fig = Figure(figsize=(11, 9))
+        ax = fig.add_subplot(111)
+        G = graph.to_networkx()
+        
+        hop_colors = [config['color'], "#44AAFF", "#FFAA44", "#AA66FF", "#44FFAA", "#FF66AA", "#AAAAAA"]
+        node_colors = [hop_colors[min(G.nodes[n]['hop'] or 0, len(hop_colors) - 1)] for n in G.nodes()]
+        node_sizes = [900 if n == address else (120 if G.nodes[n]['expanded'] else 40) for n in G.nodes()]
+        
+        labels = {n: f"{n[:6]}...{n[-4:]}" for n in G.nodes()}
+        labels[address] = "Target"
+        window.graph_view = graph_render.draw_graph(ax, G, address, node_colors, node_sizes, labels)
+        
+        legend_elements = [Patch(facecolor=hop_colors[min(hop, len(hop_colors) - 1)],
+                                 label='Target Address' if hop == 0 else f'Hop {hop}')
+                           for hop in sorted(h for h in summary['hops'] if h is not None)]
+        ax.legend(handles=legend_elements, loc='upper left', framealpha=0.3)
+        fig.tight_layout()
+        
+        canvas = FigureCanvasTkAgg(fig, window)
+        canvas.draw()
+        toolbar = NavigationToolbar2Tk(canvas, window)
+        toolbar.update()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
     
     def clear_data(self):
         self.address.set("")
-        self.transaction_tree.delete(*self.transaction_tree.get_children())
-        for widget in self.graph_frame.winfo_children():
-            widget.destroy()
+        self.balance_data = None
+        self.transaction_table.clear()
+        self.clear_graph()
         
         for key in self.stats_labels:
             if key != 'crypto_name':
@@ -1183,8 +943,6 @@ class MoneyFlowAnalyzer:
             default_label.pack(side=tk.LEFT, padx=(3, 0))
             self.stats_labels['crypto_name'] = default_label
         
-        self.full_txids.clear()
-        
         self.status_var.set("Ready. Select cryptocurrency and enter address.")
         self.progress_bar.stop()
     
@@ -1209,12 +967,14 @@ class MoneyFlowAnalyzer:
                     col_name = columns[col_index]
                     values = self.transaction_tree.item(item, 'values')
                     
-                    if col_name == 'Hash' and item in self.full_txids:
-                        value_to_copy = self.full_txids[item]
+                    row = self.transaction_table.row(item)
+                    if col_name == 'Hash' and row is not None:
+                        value_to_copy = row['hash']
                     else:
                         value_to_copy = values[col_index] if col_index < len(values) else ""
                     
                     try:
+                        import pyperclip
                         pyperclip.copy(str(value_to_copy))
                         display_text = str(value_to_copy)[:30]
                         if len(str(value_to_copy)) > 30:
@@ -1230,13 +990,19 @@ class MoneyFlowAnalyzer:
     
 
     def show_flow_details(self):
-        """Show flow analysis window"""
+        """Show flow analysis window, built in background and listed page by page"""
         if not self.transactions_data:
             messagebox.showinfo("No Data", "No transaction data available to analyze.")
             return
         
-        crypto = self.get_current_crypto()
+        # The table analyzed, not what the selector and address box show now
+        table = self.transactions_data
+        crypto = table.crypto
         config = CRYPTO_CONFIGS[crypto]
+        crypto_price = self.current_prices.get(crypto.value, 0)
+        target_address = table.address
+        total = len(table)
+        pages = max(1, -(-total // self.report_page_size))
         
         details_window = tk.Toplevel(self.root)
         details_window.title(f"{config['name']} Detailed Flow Analysis")
@@ -1262,7 +1028,7 @@ class MoneyFlowAnalyzer:
                               fg=config['color'])
         title_label.pack()
         
-        ttk.Label(title_frame, text=f"Target Address: {self.address.get().strip()}", 
+        ttk.Label(title_frame, text=f"Target Address: {target_address}", 
                  font=('Segoe UI', 10)).pack()
         
         # Notebook for tabs
@@ -1273,6 +1039,9 @@ class MoneyFlowAnalyzer:
         flow_frame = ttk.Frame(notebook)
         notebook.add(flow_frame, text="Flow Analysis")
         
+        page_frame = ttk.Frame(flow_frame)
+        page_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=(0, 5))
+        
         flow_text = scrolledtext.ScrolledText(flow_frame, wrap=tk.WORD, 
                                             font=('Courier New', 9),
                                             bg=self.card_bg, fg=self.fg_color,
@@ -1289,37 +1058,74 @@ class MoneyFlowAnalyzer:
                                               relief=tk.FLAT, borderwidth=2)
         stats_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Generate analysis content
-        flow_content, stats_content = self.generate_flow_analysis(crypto)
+        def set_text(widget, content):
+            widget.config(state=tk.NORMAL)
+            widget.delete('1.0', tk.END)
+            widget.insert(tk.END, content)
+            widget.config(state=tk.DISABLED)
+        
+        set_text(flow_text, "Generating flow analysis...")
+        set_text(stats_text, "Generating statistics...")
+        
+        # Only one page of the transaction listing exists as text at a time
+        report = {'page': 0, 'summary': None}
+        
+        prev_btn = ttk.Button(page_frame, text="< Previous", state=tk.DISABLED)
+        prev_btn.pack(side=tk.LEFT)
+        page_label = ttk.Label(page_frame, text="")
+        page_label.pack(side=tk.LEFT, expand=True)
+        next_btn = ttk.Button(page_frame, text="Next >", state=tk.DISABLED)
+        next_btn.pack(side=tk.RIGHT)
+        
+        def show_page(page):
+            report['page'] = page
+            listing = self.flow_report_page(crypto, table, crypto_price, page, total)
+            set_text(flow_text, report['summary'] + "\n" + listing)
+            page_label.config(text=f"Page {page + 1} of {pages}")
+            prev_btn.config(state=tk.NORMAL if page > 0 else tk.DISABLED)
+            next_btn.config(state=tk.NORMAL if page < pages - 1 else tk.DISABLED)
+        
+        prev_btn.config(command=lambda: show_page(report['page'] - 1))
+        next_btn.config(command=lambda: show_page(report['page'] + 1))
+        
+        def report_ready(summary_content, stats_content):
+            if not details_window.winfo_exists():
+                return
+            report['summary'] = summary_content
+            set_text(stats_text, stats_content)
+            show_page(0)
         
-        flow_text.insert(tk.END, flow_content)
-        stats_text.insert(tk.END, stats_content)
+        def build_report():
+            try:
+                contents = self.generate_flow_analysis(crypto, table, crypto_price, target_address)
+                self.root.after(0, report_ready, *contents)
+            except Exception as e:
+                self.show_error(f"Flow analysis error: {str(e)}")
         
-        flow_text.config(state=tk.DISABLED)
-        stats_text.config(state=tk.DISABLED)
+        threading.Thread(target=build_report, daemon=True).start()
         
         # Buttons
         button_frame = ttk.Frame(main_container)
         button_frame.pack(fill=tk.X, pady=(10, 0))
         
-        copy_flow_btn = ttk.Button(button_frame, text="Copy Flow Analysis", 
-                                  command=lambda: self.copy_to_clipboard(flow_content))
+        copy_flow_btn = ttk.Button(button_frame, text="Copy Page", 
+                                  command=lambda: self.copy_to_clipboard(flow_text.get('1.0', tk.END)))
         copy_flow_btn.pack(side=tk.LEFT, padx=(0, 10))
         
+        export_btn = ttk.Button(button_frame, text="Export Transactions...", 
+                               command=lambda: self.export_transactions(details_window, table, crypto_price))
+        export_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
         close_btn = ttk.Button(button_frame, text="Close", command=details_window.destroy)
         close_btn.pack(side=tk.RIGHT)
 
 
-    def generate_flow_analysis(self, crypto):
-        """Generate flow analysis text"""
-        if not self.transactions_data:
+    def generate_flow_analysis(self, crypto, table, crypto_price, target_address):
+        """Generate the flow summary and statistics text, the listing is paged by flow_report_page"""
+        if not table:
             return "No transaction data available.", "No statistics available."
         
         config = CRYPTO_CONFIGS[crypto]
-        target_address = self.address.get().strip()
-        # Get price using correct coingecko key
-        coingecko_key = crypto.value
-        crypto_price = self.current_prices.get(coingecko_key, 0)
         
         flow = []
         flow.append(f"{config['name']} Money Flow analysis \n")
@@ -1327,36 +1133,23 @@ class MoneyFlowAnalyzer:
         flow.append(f"Target Address: {target_address}")
         flow.append(f"Cryptocurrency: {config['name']} ({config['symbol']})")
         flow.append(f"Current Price: ${crypto_price:,.2f}")
-        flow.append(f"Total Transactions Analyzed: {len(self.transactions_data)}")
+        flow.append(f"Total Transactions Analyzed: {len(table)}")
         flow.append("-" * 60 + "\n")
         
-        # lists 
-        incoming_txs = [tx for tx in self.transactions_data if tx['type'] == 'received']
-        outgoing_txs = [tx for tx in self.transactions_data if tx['type'] == 'sent']
-        total_incoming = sum(tx['amount'] for tx in incoming_txs if tx['amount'] > 0)
-        total_outgoing = sum(abs(tx['amount']) for tx in outgoing_txs if tx['amount'] < 0)
+        summary = flow_statistics(table)
+        total_incoming = summary['total_received']
+        total_outgoing = summary['total_sent']
         
-        flow.append(f"Incoming Transactions: {len(incoming_txs)}")
+        flow.append(f"Incoming Transactions: {summary['incoming']}")
         flow.append(f"Total Received: {total_incoming:.8f} {config['symbol']}")
         flow.append(f"Value: ${total_incoming * crypto_price:,.2f}")
-        flow.append(f"\nOutgoing Transactions: {len(outgoing_txs)}")
+        if summary['received_usd'] is not None:
+            flow.append(f"Value at Transaction Time: ${summary['received_usd']:,.2f}")
+        flow.append(f"\nOutgoing Transactions: {summary['outgoing']}")
         flow.append(f"Total Sent: {total_outgoing:.8f} {config['symbol']}")
         flow.append(f"Value: ${total_outgoing * crypto_price:,.2f}")
-        
-        # Show all transactions
-        flow.append("\n" + "=" * 60)
-        flow.append(f"All Transactions ({len(self.transactions_data)} total)")
-        flow.append("=" * 60)
-        
-        for i, tx in enumerate(self.transactions_data, 1):
-            flow.append(f"\n{i}. {tx['type'].upper()}: {abs(tx['amount']):.8f} {config['symbol']}")
-            flow.append(f"   Date: {tx['timestamp']}")
-            flow.append(f"   Value: ${abs(tx['amount']) * crypto_price:,.2f}")
-            flow.append(f"   Hash: {tx['hash'][:50]}...")
-        
-        flow.append("\n" + "=" * 60)
-        flow.append("END OF ANALYSIS")
-        flow.append("=" * 60)
+        if summary['sent_usd'] is not None:
+            flow.append(f"Value at Transaction Time: ${summary['sent_usd']:,.2f}")
         
         # Statistics
         stats = []
@@ -1371,22 +1164,52 @@ class MoneyFlowAnalyzer:
         stats.append("-" * 80)
         
         stats.append("\nTransaction Statistics:")
-        stats.append(f"Total Transactions: {len(self.transactions_data)}")
-        stats.append(f"Incoming Transactions: {len(incoming_txs)}")
-        stats.append(f"Outgoing Transactions: {len(outgoing_txs)}")
-        
-        if self.transactions_data:
-            amounts = [tx['amount'] for tx in self.transactions_data]
-            positive_amounts = [a for a in amounts if a > 0]
-            negative_amounts = [a for a in amounts if a < 0]
-            
-            stats.append(f"\nAmounts ({config['symbol']}):")
-            if positive_amounts:
-                stats.append(f"Largest Incoming: {max(positive_amounts):.8f}")
-                stats.append(f"Average Incoming: {sum(positive_amounts)/len(positive_amounts):.8f}")
-            if negative_amounts:
-                stats.append(f"Largest Outgoing: {abs(min(negative_amounts)):.8f}")
-                stats.append(f"Average Outgoing: {abs(sum(negative_amounts)/len(negative_amounts)):.8f}")
+        stats.append(f"Total Transactions: {len(table)}")
+        stats.append(f"Incoming Transactions: {summary['incoming']}")
+        stats.append(f"Outgoing Transactions: {summary['outgoing']}")
+        
+        stats.append(f"\nAmounts ({config['symbol']}):")
+        if summary['largest_incoming'] is not None:
+            stats.append(f"Largest Incoming: {summary['largest_incoming']:.8f}")
+            stats.append(f"Average Incoming: {summary['average_incoming']:.8f}")
+        if summary['largest_outgoing'] is not None:
+            stats.append(f"Largest Outgoing: {summary['largest_outgoing']:.8f}")
+            stats.append(f"Average Outgoing: {summary['average_outgoing']:.8f}")
+        
+        for side in ('incoming', 'outgoing'):
+            if summary[f'{side}_percentiles'] is not None:
+                stats.append(f"Median {side.capitalize()}: {summary[f'median_{side}']:.8f}")
+                points = "  ".join(f"p{p}={v:.8f}" for p, v in summary[f'{side}_percentiles'].items())
+                stats.append(f"  {points}")
+        
+        stats.append(f"\nFlow balance ({config['symbol']}):")
+        stats.append(f"Net Flow: {summary['net_flow']:+.8f}")
+        if summary['imbalance'] is not None:
+            stats.append(f"Imbalance: {summary['imbalance']:+.3f} (-1 all out, +1 all in)")
+        stats.append(f"Total Fees: {summary['total_fees']:.8f}")
+        
+        if summary['counterparties']:
+            stats.append("\nCounterparty concentration:")
+            stats.append(f"Counterparties: {summary['counterparties']}")
+            stats.append(f"Largest Counterparty Share: {summary['top_counterparty_share']:.1%}")
+            stats.append(f"Top 10 Share: {summary['top10_share']:.1%}")
+            stats.append(f"HHI: {summary['hhi']:.4f}")
+            for party in summary['top_counterparties']:
+                stats.append(f"  {party['address'][:42]:<42} {party['volume']:>18.8f} {party['share']:>7.1%}")
+        
+        if summary['tokens']:
+            stats.append("\nToken transfers:")
+            stats.append(f"  {'Token':<12} {'Received':>22} {'Sent':>22} {'Txs':>7}")
+            for token in summary['tokens']:
+                stats.append(f"  {token['asset'][:12]:<12} {token['received']:>22.8f} {token['sent']:>22.8f} "
+                             f"{token['transactions']:>7}")
+        
+        if summary['monthly']:
+            stats.append(f"\nMonthly volume ({config['symbol']}):")
+            stats.append(f"  {'Month':<8} {'Received':>18} {'Sent':>18} {'Txs':>7}")
+            for bucket in summary['monthly']:
+                stats.append(f"  {bucket['period']:<8} {bucket['received']:>18.8f} {bucket['sent']:>18.8f} "
+                             f"{bucket['transactions']:>7}")
         
         stats.append(f"\nUSD values:")
         stats.append(f"Current Price: ${crypto_price:,.2f}")
@@ -1394,13 +1217,147 @@ class MoneyFlowAnalyzer:
             stats.append(f"Total Received Value: ${total_incoming * crypto_price:,.2f}")
         if total_outgoing > 0:
             stats.append(f"Total Sent Value: ${total_outgoing * crypto_price:,.2f}")
+        stats.append(f"Priced at Transaction Time: {summary['priced']} of {summary['transactions']}")
+        if summary['received_usd'] is not None:
+            stats.append(f"Received Value at Transaction Time: ${summary['received_usd']:,.2f}")
+            stats.append(f"Sent Value at Transaction Time: ${summary['sent_usd']:,.2f}")
         
         return "\n".join(flow), "\n".join(stats)
     
 
+    def flow_report_page(self, crypto, table, crypto_price, page, total):
+        """Transaction listing of one page of the Flow Details report"""
+        symbol = CRYPTO_CONFIGS[crypto]['symbol']
+        start = page * self.report_page_size
+        end = min(start + self.report_page_size, total)
+        
+        flow = []
+        flow.append("=" * 60)
+        flow.append(f"All Transactions ({total} total), {start + 1}-{end}")
+        flow.append("=" * 60)
+        
+        for i in range(start, end):
+            tx = table[i]
+            flow.append(f"\n{i + 1}. {tx['type'].upper()}: {abs(tx['amount']):.8f} {tx['asset'] or symbol}")
+            flow.append(f"   Date: {tx['timestamp'].strftime('%Y-%m-%d %H:%M') if tx['timestamp'] else 'Unknown'}")
+            if not tx['asset']:
+                flow.append(f"   Value: ${abs(tx['amount']) * crypto_price:,.2f}")
+            if tx['usd_price'] is not None:
+                flow.append(f"   Value at Transaction Time: ${abs(tx['amount']) * tx['usd_price']:,.2f} "
+                            f"(1 {symbol} = ${tx['usd_price']:,.2f})")
+            flow.append(f"   Hash: {tx['hash'][:50]}...")
+        
+        if end >= total:
+            flow.append("\n" + "=" * 60)
+            flow.append("END OF ANALYSIS")
+            flow.append("=" * 60)
+        return "\n".join(flow)
+    
+
+    def export_transactions(self, parent, table, crypto_price):
+        """Ask for a file and stream the transactions to it as CSV or JSON Lines"""
+        from tkinter import filedialog
+        
+        path = filedialog.asksaveasfilename(parent=parent, title="Export Transactions",
+                                            defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+        if not path:
+            return
+        self.status_var.set(f"Exporting {len(table)} transactions...")
+        self.progress_bar.start()
+        threading.Thread(target=self.perform_export, args=(path, table, crypto_price), daemon=True).start()
+
+
+    def perform_export(self, path, table, crypto_price):
+        """Write the export in background thread, one row at a time"""
+        try:
+            count = export_table(path, table, crypto_price)
+            self.root.after(0, lambda: self.status_var.set(f"Exported {count} transactions to {path}"))
+            self.root.after(0, self.progress_bar.stop)
+        except Exception as e:
+            self.show_error(f"Export error: {str(e)}")
+    
+
+    def save_session(self):
+        """Save the analyzed address, its graph and layout to a session file"""
+        from tkinter import filedialog
+        
+        table = self.transactions_data
+        if not table or self.balance_data is None:
+            messagebox.showwarning("Save Session", "Analyze an address before saving a session")
+            return
+        config = CRYPTO_CONFIGS[table.crypto]
+        path = filedialog.asksaveasfilename(title="Save Session", defaultextension=SESSION_EXTENSION,
+                                            initialfile=f"{config['symbol']}_{table.address[:12]}{SESSION_EXTENSION}",
+                                            filetypes=[("MoneyFlow session", f"*{SESSION_EXTENSION}")])
+        if not path:
+            return
+        
+        # The graph and positions are copied, the GUI keeps changing them while the file is written
+        flow_graph = FlowGraph.from_dict(self.flow_graph.to_dict()) if self.flow_graph is not None else None
+        positions = dict(self.graph_positions)
+        self.status_var.set(f"Saving session of {len(table)} transactions...")
+        self.progress_bar.start()
+        threading.Thread(target=self.perform_save_session,
+                         args=(path, table, self.balance_data, dict(self.current_prices), self.display_price,
+                               flow_graph, positions),
+                         daemon=True).start()
+
+
+    def perform_save_session(self, path, table, balance_data, prices, price, flow_graph, positions):
+        """Write the session file in background thread"""
+        try:
+            size = save_session(path, table, balance_data, prices, price, flow_graph, positions)
+            self.root.after(0, lambda: self.status_var.set(f"Session saved to {path} ({size / 1e6:.1f} MB)"))
+            self.root.after(0, self.progress_bar.stop)
+        except Exception as e:
+            self.show_error(f"Save error: {str(e)}")
+
+
+    def open_session(self):
+        """Show a saved session as it was, without any network request"""
+        from tkinter import filedialog
+        
+        path = filedialog.askopenfilename(title="Open Session",
+                                          filetypes=[("MoneyFlow session", f"*{SESSION_EXTENSION}"),
+                                                     ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            session = load_session(path)
+        except Exception as e:
+            self.show_error(f"Could not open session: {str(e)}")
+            return
+        
+        table = session['table']
+        crypto = session['crypto']
+        config = CRYPTO_CONFIGS[crypto]
+        self.crypto_var.set(f"{config['name']} ({config['symbol']})")
+        self.address.set(table.address)
+        self.on_crypto_change()
+        
+        # Live prices win, the saved ones fill in when there never was a quote
+        if not self.price_service.prices:
+            self.current_prices = dict(session['prices'])
+            self.update_price_labels()
+        
+        self.transactions_data = table
+        self.display_price = session['price']
+        self.transaction_table.set_rows(table, self.format_transaction_row)
+        self.graph_root = table.address
+        self.graph_positions = session['positions']
+        
+        balance_data = session['balance_data']
+        self.update_display(crypto, table.address, balance_data, session['price'],
+                            balance_data['balance'] * session['price'], session['flow_graph'])
+        saved_at = datetime.fromtimestamp(session['saved_at']).strftime('%Y-%m-%d %H:%M')
+        self.status_var.set(f"Opened session of {len(table)} transactions saved {saved_at}")
+
+
     def copy_to_clipboard(self, text):
-        # uses pyperclip 
+        # uses pyperclip, imported on first copy
         try:
+            import pyperclip
             pyperclip.copy(text)
             messagebox.showinfo("Copied", "Analysis copied to clipboard!")
         except Exception as e:
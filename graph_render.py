@@ -0,0 +1,302 @@
+"""Graph drawing for the money flow views.
+
+Small graphs are drawn with networkx as before (curved arrows, labels on
+every node). Past LARGE_GRAPH_NODES nodes or LARGE_GRAPH_EDGES edges
+draw_graph switches to LargeGraphView: a linear-time radial layout and
+one matplotlib collection for all nodes and two for all edges, with
+labels and thin edges only shown once the user zooms in.
+
+Layouts are cached by graph signature, and a graph that grew from one
+already laid out only places its new nodes (extend_layout), so nodes
+the user has seen never jump around.
+"""
+import math
+import random
+from collections import OrderedDict, defaultdict, deque
+
+import numpy as np
+import networkx as nx
+from matplotlib.collections import LineCollection
+
+
+LARGE_GRAPH_NODES = 300
+LARGE_GRAPH_EDGES = 1000
+
+_layout_cache = OrderedDict()
+LAYOUT_CACHE_SIZE = 16
+
+
+def is_large(G):
+    return G.number_of_nodes() > LARGE_GRAPH_NODES or G.number_of_edges() > LARGE_GRAPH_EDGES
+
+
+def graph_signature(G, root=None):
+    """Hashable identity of the graph's structure, used as the layout cache key"""
+    return hash((frozenset(G.nodes()), frozenset(G.edges()), root))
+
+
+def layout(G, root=None, seed=42, previous=None):
+    """Node positions, cached by graph signature.
+
+    Spring layout for small graphs, radial_layout around `root` for large
+    ones, where Fruchterman-Reingold gets too slow. When `previous`
+    positions are given, nodes found there keep them and only the others
+    are placed, see extend_layout.
+    """
+    large = is_large(G)
+    key = (graph_signature(G, root), seed, large)
+    if previous and any(n in previous for n in G):
+        if all(n in previous for n in G):
+            return {n: previous[n] for n in G}
+        pos = extend_layout(G, previous, root, seed)
+    elif key in _layout_cache:
+        _layout_cache.move_to_end(key)
+        return _layout_cache[key]
+    elif large and root is not None:
+        pos = radial_layout(G, root, seed)
+    else:
+        try:
+            k = 1.5 if len(G) <= 50 else 2 / math.sqrt(len(G))
+            pos = nx.spring_layout(G, k=k, iterations=100, seed=seed, weight=None)
+        except Exception:
+            pos = nx.circular_layout(G)
+
+    _layout_cache[key] = pos
+    _layout_cache.move_to_end(key)
+    while len(_layout_cache) > LAYOUT_CACHE_SIZE:
+        _layout_cache.popitem(last=False)
+    return pos
+
+
+def extend_layout(G, previous, root=None, seed=42):
+    """Positions for G that leave every node of `previous` where it was.
+
+    New nodes are fanned out on an arc next to the placed node that
+    reaches them first breadth-first, pointing away from the centre, so
+    the cost is O(new nodes + their edges) whatever the size of G. Nodes
+    not connected to anything placed hang off `root`.
+    """
+    rng = random.Random(seed)
+    adjacency = G.to_undirected(as_view=True)
+    pos = {n: np.asarray(previous[n], dtype=float) for n in G if n in previous}
+    if root in pos:
+        centre = pos[root]
+    else:
+        centre = np.mean(list(pos.values()), axis=0)
+
+    lengths = [np.linalg.norm(pos[u] - pos[v]) for u, v in G.edges() if u in pos and v in pos]
+    step = 0.6 * float(np.median(lengths)) if lengths else 0.3
+
+    children = defaultdict(list)
+    order = list(pos)
+    seen = set(pos)
+
+    def bfs(queue):
+        while queue:
+            node = queue.popleft()
+            for n in adjacency[node]:
+                if n not in seen:
+                    seen.add(n)
+                    children[node].append(n)
+                    order.append(n)
+                    queue.append(n)
+
+    bfs(deque(pos))
+    anchor = root if root in pos else order[0]
+    for node in G.nodes():
+        if node not in seen:
+            seen.add(node)
+            children[anchor].append(node)
+            order.append(node)
+            bfs(deque([node]))
+
+    for node in order:
+        kids = children.get(node)
+        if not kids:
+            continue
+        outward = pos[node] - centre
+        if np.linalg.norm(outward) > 1e-9:
+            direction = math.atan2(outward[1], outward[0])
+        else:
+            direction = rng.uniform(0, 2 * math.pi)
+        arc = min(math.pi, 0.4 * len(kids))
+        # Push crowded fans further out so siblings stay about half a step apart
+        radius = max(step, 0.5 * step * len(kids) / arc)
+        for i, kid in enumerate(kids):
+            angle = direction + (i / (len(kids) - 1) - 0.5) * arc if len(kids) > 1 else direction
+            pos[kid] = pos[node] + radius * np.array([math.cos(angle), math.sin(angle)])
+    return pos
+
+
+def radial_layout(G, root, seed=42):
+    """Rings by hop distance from `root`, each subtree in its own angular wedge.
+
+    Breadth-first over the undirected graph, so it runs in O(nodes + edges).
+    A wedge is proportional to the number of leaves below the node; nodes
+    not connected to `root` hang off it as if they were one hop out.
+    """
+    rng = random.Random(seed)
+    adjacency = G.to_undirected(as_view=True)
+
+    parent = {root: None}
+    depth = {root: 0}
+    children = {root: []}
+    order = [root]
+
+    def bfs(start):
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            neighbours = [n for n in adjacency[node] if n not in parent]
+            rng.shuffle(neighbours)
+            for n in neighbours:
+                parent[n] = node
+                depth[n] = depth[node] + 1
+                children[n] = []
+                children[node].append(n)
+                order.append(n)
+                queue.append(n)
+
+    bfs(root)
+    for node in G.nodes():
+        if node not in parent:
+            parent[node] = root
+            depth[node] = 1
+            children[node] = []
+            children[root].append(node)
+            order.append(node)
+            bfs(node)
+
+    leaves = {}
+    for node in reversed(order):
+        leaves[node] = sum(leaves[c] for c in children[node]) or 1
+
+    wedge = {root: (0.0, 2 * math.pi)}
+    pos = {root: np.zeros(2)}
+    for node in order:
+        start, span = wedge[node]
+        for child in children[node]:
+            child_span = span * leaves[child] / leaves[node]
+            wedge[child] = (start, child_span)
+            angle = start + child_span / 2
+            pos[child] = np.array([depth[child] * math.cos(angle), depth[child] * math.sin(angle)])
+            start += child_span
+    return pos
+
+
+def draw_graph(ax, G, root, node_colors, node_sizes, labels, edge_labels=None, seed=42, pos=None):
+    """Draw G on ax, picking the renderer by size.
+
+    `pos` defaults to layout(G, root, seed). Returns the LargeGraphView for
+    large graphs (keep a reference to it, it drives the level of detail
+    while zooming), None otherwise.
+    """
+    if pos is None:
+        pos = layout(G, root, seed)
+    if is_large(G):
+        return LargeGraphView(ax, G, pos, root, node_colors, node_sizes, labels)
+
+    nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=node_sizes,
+                           alpha=0.85, ax=ax, linewidths=0.5, edgecolors='white')
+
+    if G.edges():
+        edge_weights = [G[u][v].get('weight', 1) for u, v in G.edges()]
+        max_weight = max(edge_weights) or 1
+        edge_widths = [0.5 + (w / max_weight * 3) for w in edge_weights]
+
+        nx.draw_networkx_edges(G, pos, width=edge_widths, alpha=0.6, edge_color='#666666',
+                               arrows=True, arrowsize=8, arrowstyle='->', ax=ax,
+                               connectionstyle='arc3,rad=0.1')
+        if edge_labels:
+            nx.draw_networkx_edge_labels(G, pos, edge_labels, font_size=7, ax=ax, bbox=dict(alpha=0))
+
+    nx.draw_networkx_labels(G, pos, labels, font_size=8, font_weight='bold', ax=ax)
+    ax.axis('off')
+    return None
+
+
+class LargeGraphView:
+    """Batched drawing of a large graph with zoom-dependent level of detail.
+
+    All nodes are one scatter collection and edges are split into two
+    LineCollections: the `major_edges` heaviest ones, always shown, and the
+    thin rest, shown only when zoomed in past `detail_zoom`. Labels are
+    drawn for at most `max_labels` of the largest visible nodes once
+    zoomed in (the root is always labelled).
+    """
+
+    def __init__(self, ax, G, pos, root, node_colors, node_sizes, labels,
+                 major_edges=1500, detail_zoom=3.0, max_labels=150):
+        self.ax = ax
+        self.root = root
+        self.labels = labels
+        self.detail_zoom = detail_zoom
+        self.max_labels = max_labels
+        self.texts = []
+
+        self.nodes = list(G.nodes())
+        self.index = index = {n: i for i, n in enumerate(self.nodes)}
+        self.xy = np.array([pos[n] for n in self.nodes], dtype=float).reshape(-1, 2)
+        self.sizes = np.asarray(node_sizes, dtype=float)
+
+        edges = list(G.edges(data='weight', default=1))
+        if edges:
+            src = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+            dst = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))
+            weights = np.fromiter((w for _, _, w in edges), dtype=float, count=len(edges))
+            segments = np.stack([self.xy[src], self.xy[dst]], axis=1)
+            widths = 0.2 + weights / (weights.max() or 1) * 2.5
+            order = np.argsort(weights)[::-1]
+            major, minor = order[:major_edges], order[major_edges:]
+        else:
+            segments = np.empty((0, 2, 2))
+            widths = np.empty(0)
+            major = minor = np.empty(0, dtype=np.int64)
+
+        self.major_edges = LineCollection(segments[major], linewidths=widths[major],
+                                          colors='#666666', alpha=0.5, zorder=1)
+        self.minor_edges = LineCollection(segments[minor], linewidths=widths[minor],
+                                          colors='#888888', alpha=0.3, zorder=1)
+        ax.add_collection(self.major_edges)
+        ax.add_collection(self.minor_edges)
+        self.node_collection = ax.scatter(self.xy[:, 0], self.xy[:, 1], s=self.sizes, c=node_colors,
+                                          alpha=0.85, linewidths=0.3, edgecolors='white', zorder=2)
+
+        x_min, y_min = self.xy.min(axis=0)
+        x_max, y_max = self.xy.max(axis=0)
+        margin = max(x_max - x_min, y_max - y_min, 1) * 0.05
+        ax.set_xlim(x_min - margin, x_max + margin)
+        ax.set_ylim(y_min - margin, y_max + margin)
+        ax.set_aspect('equal')
+        ax.axis('off')
+        self.full_width = (x_max - x_min) + 2 * margin
+
+        ax.callbacks.connect('xlim_changed', self.update_detail)
+        ax.callbacks.connect('ylim_changed', self.update_detail)
+        self.update_detail()
+
+    def update_detail(self, ax=None):
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        zoom = self.full_width / max(abs(x1 - x0), 1e-12)
+        detailed = zoom >= self.detail_zoom
+        self.minor_edges.set_visible(detailed)
+
+        for text in self.texts:
+            text.remove()
+        self.texts = []
+
+        shown = []
+        if detailed:
+            inside = np.nonzero((self.xy[:, 0] >= min(x0, x1)) & (self.xy[:, 0] <= max(x0, x1)) &
+                                (self.xy[:, 1] >= min(y0, y1)) & (self.xy[:, 1] <= max(y0, y1)))[0]
+            if len(inside) > self.max_labels:
+                inside = inside[np.argsort(self.sizes[inside])[::-1][:self.max_labels]]
+            shown = [self.nodes[i] for i in inside]
+        if self.root in self.labels and self.root not in shown:
+            shown.append(self.root)
+
+        for node in shown:
+            x, y = self.xy[self.index[node]]
+            self.texts.append(self.ax.text(x, y, self.labels.get(node, ''), fontsize=7, fontweight='bold',
+                                           ha='center', va='center', zorder=3, clip_on=True))
@@ -0,0 +1,131 @@
+"""Incremental decoding of the large JSON arrays explorers and price APIs return.
+
+iter_items yields the elements of one array of a JSON document while the
+body is still downloading, each decoded on its own with the standard
+library decoder, so neither the whole body nor the whole list of dicts is
+ever held at once, and a caller that has what it needs can stop reading.
+"""
+import codecs
+import json
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = ',:]}' + _WHITESPACE
+
+
+class _Reader:
+    """Text buffer over a stream of byte chunks, refilled on demand"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.text = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        """Append the next chunk to the buffer, False once the stream is over"""
+        if self.eof:
+            return False
+        for chunk in self.chunks:
+            text = self.text.decode(chunk)
+            if text:
+                # Decoded text is dropped from the front as the buffer is refilled
+                self.buf = self.buf[self.pos:] + text
+                self.pos = 0
+                return True
+        self.eof = True
+        tail = self.text.decode(b'', final=True)
+        if tail:
+            self.buf = self.buf[self.pos:] + tail
+            self.pos = 0
+            return True
+        return False
+
+    def peek(self):
+        """Next non-whitespace character, '' at the end of the document"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.more():
+                    raise
+                continue
+            # A number cut by the end of the buffer may go on in the next chunk
+            if (end == len(self.buf) or self.buf[end] not in _DELIMITERS) and self.more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_items(chunks, path=(), header=None):
+    """Yield the elements of a JSON array decoded from an iterable of byte chunks.
+
+    `path` is the chain of object keys leading to the array, empty for a
+    document that is an array. The other top-level members are decoded
+    into `header` if one is given; those after the array are only there
+    once every item was consumed. A target that is not an array (an API
+    error message in place of the list) yields nothing and is stored in
+    `header` under its key.
+    """
+    yield from _walk(_Reader(chunks), tuple(path), header, True)
+
+
+def _walk(reader, path, header, top):
+    if not path:
+        if reader.peek() != '[':
+            reader.value()
+            return
+        reader.expect('[')
+        if reader.peek() == ']':
+            reader.pos += 1
+            return
+        while True:
+            yield reader.value()
+            char = reader.peek()
+            reader.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {char!r}")
+
+    if reader.peek() != '{':
+        reader.value()
+        return
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.pos += 1
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == path[0] and (len(path) > 1 or reader.peek() == '['):
+            yield from _walk(reader, path[1:], header, False)
+        else:
+            value = reader.value()
+            if top and header is not None:
+                header[key] = value
+        char = reader.peek()
+        reader.pos += 1
+        if char == '}':
+            return
+        if char != ',':
+            raise ValueError(f"Expected ',' or '}}' in JSON object, found {char!r}")
@@ -0,0 +1,77 @@
+"""Parsing of large transaction histories on a pool of processes.
+
+Decoding the provider JSON and parsing it is pure Python and holds the
+GIL, so a history of 100k transactions takes seconds on one core however
+many threads fetch it. ParsePool shards the raw transactions, parses each
+shard into a TransactionTable in a worker process (a table pickles as a
+handful of arrays, far less than the dicts it was built from) and merges
+the tables back newest first.
+"""
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from crypto_api import CRYPTO_CONFIGS, Cryptocurrency, MultiCryptoAPI
+from tx_columns import TransactionTable
+
+
+# Transactions per task; smaller shards balance better, larger ones pickle less
+SHARD_SIZE = 5000
+
+# Below this many transactions starting and feeding the workers costs more than it saves
+PARALLEL_MIN = 10000
+
+_api = None
+
+
+def parse_shard(crypto_value, address, raw_txs):
+    """TransactionTable of raw provider transactions, given as dicts or JSON text.
+
+    Runs in the worker processes; transactions the parser rejects are left out.
+    """
+    global _api
+    if _api is None:
+        _api = MultiCryptoAPI()
+    crypto = Cryptocurrency(crypto_value)
+    config = CRYPTO_CONFIGS[crypto]
+    parse = _api.parser(crypto)
+
+    table = TransactionTable(crypto, address)
+    for raw in raw_txs:
+        tx = parse(json.loads(raw) if isinstance(raw, str) else raw, address, config)
+        if tx:
+            table.append(tx, _api.counterparties(crypto, tx, address))
+    return table
+
+
+class ParsePool:
+    """Process pool turning raw transactions into one TransactionTable.
+
+    The workers are spawned on first use and kept for later analyses;
+    spawned rather than forked, the GUI process runs threads.
+    """
+
+    def __init__(self, workers=None, shard_size=SHARD_SIZE, parallel_min=PARALLEL_MIN):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.parallel_min = parallel_min
+        self._executor = None
+
+    def parse(self, crypto, address, raw_txs):
+        """TransactionTable of raw transactions, newest first"""
+        shards = [raw_txs[start:start + self.shard_size] for start in range(0, len(raw_txs), self.shard_size)]
+        if self.workers < 2 or len(shards) < 2 or len(raw_txs) < self.parallel_min:
+            chunks = [parse_shard(crypto.value, address, shard) for shard in shards]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            chunks = self._executor.map(parse_shard, repeat(crypto.value), repeat(address), shards)
+        return TransactionTable.merge(crypto, address, chunks)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
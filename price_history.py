@@ -0,0 +1,213 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+
+DEFAULT_PRICES_PATH = os.path.join(os.path.expanduser("~"), ".moneyflow", "prices.db")
+
+SECONDS_PER_DAY = 86400
+
+# A price older than this is not used for a transaction, its day was never fetched
+MAX_PRICE_AGE_DAYS = 3
+
+# Days asked for per request; past 90 days CoinGecko answers with one price per day
+RANGE_DAYS = 365
+
+
+def day_span(transactions, span=None):
+    """(first_day, last_day) of parsed transactions, widening `span` if given"""
+    days = [int(tx['timestamp'].timestamp() // SECONDS_PER_DAY) for tx in transactions
+            if isinstance(tx.get('timestamp'), datetime)]
+    if not days:
+        return span
+    if span is not None:
+        days += span
+    return min(days), max(days)
+
+
+def day_chunks(first_day, last_day, size=RANGE_DAYS, backward=False):
+    """(start, end) ranges of at most `size` days covering first_day..last_day, newest first if backward"""
+    starts = range(first_day, last_day + 1, size)
+    if backward:
+        starts = reversed(starts)
+    return [(start, min(start + size - 1, last_day)) for start in starts]
+
+
+def format_day(day):
+    return datetime.fromtimestamp(day * SECONDS_PER_DAY, timezone.utc).strftime('%Y-%m-%d')
+
+
+def table_day_span(table):
+    """(first_day, last_day) of a TransactionTable, None when no timestamp is known"""
+    first, last = table.time_range()
+    if first is None:
+        return None
+    return int(first.timestamp() // SECONDS_PER_DAY), int(last.timestamp() // SECONDS_PER_DAY)
+
+
+class PriceHistory:
+    """Daily USD prices per asset, kept on disk and looked up in bulk.
+
+    Assets are CoinGecko ids, the keys of current_prices. Each asset's
+    series covers one contiguous range of UTC days; ensure() only asks
+    CoinGecko for the days missing before or after it, in chunks of up to
+    RANGE_DAYS per request, so an address analyzed again costs no request
+    at all.
+    The series is held in memory as two sorted NumPy arrays and priced
+    with a single searchsorted over all the transaction timestamps.
+    """
+
+    URL = "https://api.coingecko.com/api/v3/coins/{asset}/market_chart/range"
+
+    def __init__(self, path=DEFAULT_PRICES_PATH, timeout=20):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS daily_prices (
+                asset TEXT NOT NULL,
+                day INTEGER NOT NULL,
+                price REAL NOT NULL,
+                PRIMARY KEY (asset, day)
+            );
+            CREATE TABLE IF NOT EXISTS coverage (
+                asset TEXT PRIMARY KEY,
+                first_day INTEGER NOT NULL,
+                last_day INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+        self.conn.commit()
+        self._series = {}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def coverage(self, asset):
+        """(first_day, last_day) fetched for the asset, None if nothing was"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT first_day, last_day FROM coverage WHERE asset = ?", (asset,)).fetchone()
+        return tuple(row) if row else None
+
+    def ensure(self, asset, first_day, last_day):
+        """Fetch whatever of the days first_day..last_day is not stored yet.
+
+        Days count from the epoch in UTC. Today is never fetched, its price
+        is not final; transactions of today get yesterday's.
+
+        Each missing range is fetched in chunks walking away from the stored
+        one. A chunk that fails does not stop the others: its days stay
+        unpriced, and the coverage only grows up to the first failed chunk,
+        so they are asked for again next time. Returns the number of
+        requests made and a message per failed chunk.
+        """
+        last_day = min(last_day, int(time.time() // SECONDS_PER_DAY) - 1)
+        if first_day > last_day:
+            return 0, []
+        covered = self.coverage(asset)
+        if covered is None:
+            missing = [(first_day, last_day, True)]
+        else:
+            # Stay contiguous: fill up to the stored range on both sides, (start, end, walking backward)
+            missing = []
+            if first_day < covered[0]:
+                missing.append((first_day, covered[0] - 1, True))
+            if last_day > covered[1]:
+                missing.append((covered[1] + 1, last_day, False))
+
+        sent = 0
+        failed = []
+        for start, end, backward in missing:
+            contiguous = True
+            for chunk_start, chunk_end in day_chunks(start, end, backward=backward):
+                sent += 1
+                try:
+                    prices = self.fetch_range(asset, chunk_start, chunk_end)
+                except Exception as e:
+                    failed.append(f"{format_day(chunk_start)} to {format_day(chunk_end)}: {e}")
+                    contiguous = False
+                    continue
+                self.store(asset, chunk_start, chunk_end, prices, covered=contiguous)
+        return sent, failed
+
+    def fetch_range(self, asset, first_day, last_day):
+        """{day: price} of one range of days, in a single request"""
+        params = {
+            'vs_currency': 'usd',
+            'from': first_day * SECONDS_PER_DAY,
+            'to': (last_day + 1) * SECONDS_PER_DAY,
+        }
+        response = self.session.get(self.URL.format(asset=asset), params=params, timeout=self.timeout)
+        response.raise_for_status()
+
+        # Short ranges come back hourly or finer, the last sample of a day is its price
+        prices = {}
+        for millis, price in response.json().get('prices', []):
+            if price is not None:
+                prices[int(millis // 1000 // SECONDS_PER_DAY)] = float(price)
+        return prices
+
+    def store(self, asset, first_day, last_day, prices, covered=True):
+        """Save fetched prices and, if `covered`, mark first_day..last_day as covered.
+
+        Days without a price in the range (before the asset was listed)
+        count as covered too, so they are not asked for again. Prices
+        stored past a gap (covered=False) are used but fetched again.
+        """
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO daily_prices VALUES (?, ?, ?)",
+                [(asset, day, price) for day, price in prices.items() if first_day <= day <= last_day])
+            if covered:
+                self.conn.execute("""
+                    INSERT INTO coverage (asset, first_day, last_day, updated_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (asset) DO UPDATE SET
+                        first_day = MIN(first_day, excluded.first_day),
+                        last_day = MAX(last_day, excluded.last_day),
+                        updated_at = excluded.updated_at
+                """, (asset, first_day, last_day, time.time()))
+            self.conn.commit()
+            self._series.pop(asset, None)
+
+    def series(self, asset):
+        """(days, prices) NumPy arrays of the stored series, sorted by day"""
+        import numpy as np
+
+        with self.lock:
+            series = self._series.get(asset)
+            if series is None:
+                rows = self.conn.execute(
+                    "SELECT day, price FROM daily_prices WHERE asset = ? ORDER BY day", (asset,)).fetchall()
+                days = np.fromiter((day for day, _ in rows), dtype=np.int64, count=len(rows))
+                prices = np.fromiter((price for _, price in rows), dtype=np.float64, count=len(rows))
+                series = self._series[asset] = (days, prices)
+        return series
+
+    def prices_at(self, asset, timestamps):
+        """USD price of the asset at each epoch timestamp, NaN where none is known"""
+        import numpy as np
+
+        timestamps = np.array(timestamps, dtype=np.float64)
+        days, prices = self.series(asset)
+        result = np.full(len(timestamps), np.nan)
+        if not len(days):
+            return result
+
+        known = ~np.isnan(timestamps)
+        tx_days = (timestamps[known] // SECONDS_PER_DAY).astype(np.int64)
+        index = np.searchsorted(days, tx_days, side='right') - 1
+        found = index >= 0
+        index = np.maximum(index, 0)
+        found &= tx_days - days[index] <= MAX_PRICE_AGE_DAYS
+        result[np.flatnonzero(known)[found]] = prices[index[found]]
+        return result
@@ -0,0 +1,194 @@
+"""Current USD prices, refreshed in the background from several providers.
+
+Providers are asked in a hedged way: the first one gets a head start of
+`hedge_delay` seconds and the next one is only sent when it has not
+answered by then (or failed), so a slow provider costs at most the delay
+and a healthy one costs a single request. The last good quote is kept on
+disk with its time, which is what the GUI shows at startup and whenever
+every provider fails, marked with its age.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+
+from json_stream import iter_items
+
+
+DEFAULT_QUOTE_PATH = os.path.join(os.path.expanduser("~"), ".moneyflow", "prices.json")
+
+ASSETS = ['bitcoin', 'ethereum', 'ripple', 'solana']
+
+# Ticker symbol of each asset on the providers that list coins by symbol
+SYMBOLS = {'btc': 'bitcoin', 'eth': 'ethereum', 'xrp': 'ripple', 'sol': 'solana'}
+
+
+def coingecko_prices(session, timeout):
+    response = session.get("https://api.coingecko.com/api/v3/simple/price",
+                           params={'ids': ','.join(ASSETS), 'vs_currencies': 'usd'}, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    return {asset: data.get(asset, {}).get('usd', 0) for asset in ASSETS}
+
+
+def coinmarketcap_prices(session, timeout):
+    """CoinMarketCap's public listing, no API key needed"""
+    params = {
+        'start': '1',
+        'limit': '100',
+        'sortBy': 'market_cap',
+        'sortType': 'desc',
+        'convert': 'USD'
+    }
+    response = session.get("https://api.coinmarketcap.com/data-api/v3/cryptocurrency/listing",
+                           params=params, timeout=timeout)
+    response.raise_for_status()
+    prices = {}
+    for coin in response.json().get('data', {}).get('cryptoCurrencyList', []):
+        asset = SYMBOLS.get(coin.get('symbol', '').lower())
+        if asset and asset not in prices:
+            prices[asset] = coin.get('quotes', [{}])[0].get('price', 0)
+    return prices
+
+
+def coinpaprika_prices(session, timeout):
+    """CoinPaprika lists thousands of tickers by rank, reading stops once ours are found"""
+    with session.get("https://api.coinpaprika.com/v1/tickers", timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        prices = {}
+        for coin in iter_items(response.iter_content(64 * 1024)):
+            asset = SYMBOLS.get(coin.get('symbol', '').lower())
+            if asset and asset not in prices:
+                prices[asset] = coin.get('quotes', {}).get('USD', {}).get('price', 0)
+                if len(prices) == len(ASSETS):
+                    break
+    return prices
+
+
+PROVIDERS = [
+    ("CoinGecko", coingecko_prices),
+    ("CoinMarketCap", coinmarketcap_prices),
+    ("CoinPaprika", coinpaprika_prices),
+]
+
+
+def check_prices(prices):
+    """The prices if every asset has a positive one, else raises ValueError"""
+    missing = [asset for asset in ASSETS if not (prices or {}).get(asset, 0) > 0]
+    if missing:
+        raise ValueError(f"Missing prices for {', '.join(missing)}")
+    return {asset: float(prices[asset]) for asset in ASSETS}
+
+
+class PriceService:
+    """Current prices with a TTL, kept fresh by a background thread.
+
+    `prices`, `updated_at` (epoch seconds, None before the first quote)
+    and `source` are the last good quote. `on_update()` is called from
+    the refresh thread after every refresh attempt, `on_error(message)`
+    when all providers failed.
+    """
+
+    def __init__(self, path=DEFAULT_QUOTE_PATH, ttl=300, hedge_delay=2.0, timeout=15,
+                 providers=None, on_update=None, on_error=None):
+        self.path = path
+        self.ttl = ttl
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.providers = providers or PROVIDERS
+        self.on_update = on_update
+        self.on_error = on_error
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.prices = {}
+        self.updated_at = None
+        self.source = None
+        self.load()
+
+    def load(self):
+        """Read the last good quote back from disk"""
+        try:
+            with open(self.path) as f:
+                quote = json.load(f)
+            self.prices = check_prices(quote.get('prices'))
+            self.updated_at = quote.get('updated_at')
+            self.source = quote.get('source')
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'prices': self.prices, 'updated_at': self.updated_at, 'source': self.source}, f)
+        os.replace(tmp_path, self.path)
+
+    def age(self):
+        """Seconds since the last good quote, None if there never was one"""
+        return None if self.updated_at is None else max(0.0, time.time() - self.updated_at)
+
+    def is_stale(self):
+        age = self.age()
+        return age is None or age > self.ttl
+
+    def start(self):
+        """Refresh now if the saved quote is stale, then every `ttl` seconds"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.is_stale():
+                self.refresh()
+            age = self.age()
+            wait_for = self.ttl if age is None or age > self.ttl else self.ttl - age
+            self._stop.wait(max(wait_for, 1))
+
+    def refresh(self):
+        """Fetch a quote from the providers, hedged; returns True when one arrived"""
+        errors = []
+        executor = ThreadPoolExecutor(max_workers=len(self.providers))
+        pending = {}
+        queue = list(self.providers)
+        try:
+            while queue or pending:
+                if queue:
+                    name, fetch = queue.pop(0)
+                    pending[executor.submit(fetch, self.session, self.timeout)] = name
+                # The next provider is sent when this one fails or takes longer than hedge_delay
+                done, _ = wait(pending, timeout=self.hedge_delay if queue else None,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        prices = check_prices(future.result())
+                    except Exception as e:
+                        errors.append(f"{name}: {e}")
+                        continue
+                    with self.lock:
+                        self.prices = prices
+                        self.updated_at = time.time()
+                        self.source = name
+                    try:
+                        self.save()
+                    except OSError:
+                        pass
+                    return True
+            if self.on_error:
+                self.on_error("All price providers failed (" + "; ".join(errors) + ")")
+            return False
+        finally:
+            # Slower providers still running are left to finish on their own
+            executor.shutdown(wait=False)
+            if self.on_update:
+                self.on_update()
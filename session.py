@@ -0,0 +1,138 @@
+"""Binary session snapshots: everything the GUI shows for one address, offline.
+
+A snapshot is the magic bytes, the length of a JSON header as a
+little-endian uint64, the header, then the raw columns of the
+TransactionTable, each starting on an ALIGN-byte boundary. The header
+holds the balance, the prices the session was shown with, the flow graph
+and its layout, and where each column starts.
+
+Loading maps the file read-only and wraps the columns as NumPy views of
+it, so opening a session costs the header and nothing per transaction;
+pages are only read from disk once the list, the graph or the report
+touch them.
+"""
+import json
+import mmap
+import os
+import struct
+import time
+
+from analysis import FlowGraph
+from crypto_api import Cryptocurrency
+from tx_columns import COLUMNS, PackedStrings, TransactionTable
+
+
+MAGIC = b'MFSNAP01'
+VERSION = 2
+ALIGN = 64
+SESSION_EXTENSION = '.mfsession'
+
+_LENGTH = struct.Struct('<Q')
+
+# What the GUI shows of fetch_balance's answer; the provider's raw reply is left out
+BALANCE_FIELDS = ('balance', 'transaction_count')
+
+
+def save_session(path, table, balance_data=None, prices=None, price=0, flow_graph=None, positions=None):
+    """Write a snapshot of `table` and what was shown with it to `path`.
+
+    The file is written next to `path` and renamed over it, so a failed
+    save never leaves a truncated session behind. Returns the size in bytes.
+    """
+    import numpy as np
+
+    hashes, hash_offsets = PackedStrings.pack(table.hashes)
+    parties, party_offsets = PackedStrings.pack(table.parties)
+    assets, asset_offsets = PackedStrings.pack(table.asset_names)
+    blobs = [(name, np.asarray(column, dtype=COLUMNS[name])) for name, column in table.columns().items()]
+    blobs += [
+        ('hashes', np.frombuffer(hashes, dtype='u1')),
+        ('hash_offsets', np.asarray(hash_offsets, dtype='<i8')),
+        ('parties', np.frombuffer(parties, dtype='u1')),
+        ('party_offsets', np.asarray(party_offsets, dtype='<i8')),
+        ('asset_names', np.frombuffer(assets, dtype='u1')),
+        ('asset_offsets', np.asarray(asset_offsets, dtype='<i8')),
+    ]
+
+    # Offsets are relative to the end of the header, whose length depends on them
+    columns = {}
+    offset = 0
+    for name, data in blobs:
+        offset = -(-offset // ALIGN) * ALIGN
+        columns[name] = {'dtype': data.dtype.str, 'offset': offset, 'count': len(data)}
+        offset += data.nbytes
+
+    header = {
+        'version': VERSION,
+        'crypto': table.crypto.value,
+        'address': table.address,
+        'saved_at': time.time(),
+        'balance_data': {key: balance_data.get(key) for key in BALANCE_FIELDS} if balance_data else None,
+        'prices': prices or {},
+        'price': price,
+        'flow_graph': flow_graph.to_dict() if flow_graph is not None else None,
+        'positions': {node: [float(x), float(y)] for node, (x, y) in (positions or {}).items()},
+        'columns': columns,
+    }
+    header = json.dumps(header).encode()
+    start = -(-(len(MAGIC) + _LENGTH.size + len(header)) // ALIGN) * ALIGN
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as out:
+        out.write(MAGIC)
+        out.write(_LENGTH.pack(len(header)))
+        out.write(header)
+        for name, data in blobs:
+            out.write(b'\0' * (start + columns[name]['offset'] - out.tell()))
+            out.write(data.tobytes())
+        size = out.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+def load_session(path):
+    """Open a snapshot written by save_session.
+
+    Returns a dict with the read-only 'table', 'crypto', 'balance_data',
+    'prices', 'price', 'flow_graph' (None if none was saved), 'positions'
+    and 'saved_at'. Raises ValueError for files that are not sessions.
+    """
+    import numpy as np
+
+    with open(path, 'rb') as f:
+        # The map stays open for as long as the table's views of it live
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    prefix = len(MAGIC) + _LENGTH.size
+    if len(mm) < prefix or mm[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{os.path.basename(path)} is not a MoneyFlow session")
+    length, = _LENGTH.unpack(mm[len(MAGIC):prefix])
+    header = json.loads(mm[prefix:prefix + length])
+    version = header.get('version')
+    if version != VERSION:
+        raise ValueError(f"Unsupported session version: {version}")
+    start = -(-(prefix + length) // ALIGN) * ALIGN
+
+    def column(name):
+        spec = header['columns'][name]
+        return np.frombuffer(mm, dtype=spec['dtype'], count=spec['count'], offset=start + spec['offset'])
+
+    crypto = Cryptocurrency(header['crypto'])
+    columns = {name: column(name) for name in COLUMNS}
+    table = TransactionTable.from_columns(
+        crypto, header['address'], columns,
+        PackedStrings(column('hashes'), column('hash_offsets')),
+        PackedStrings(column('parties'), column('party_offsets')),
+        PackedStrings(column('asset_names'), column('asset_offsets')),
+    )
+    graph = header['flow_graph']
+    return {
+        'table': table,
+        'crypto': crypto,
+        'balance_data': header['balance_data'],
+        'prices': header['prices'],
+        'price': header['price'],
+        'flow_graph': FlowGraph.from_dict(graph) if graph is not None else None,
+        'positions': {node: np.array(xy) for node, xy in header['positions'].items()},
+        'saved_at': header['saved_at'],
+    }
@@ -0,0 +1,172 @@
+"""Checksum validation against the published vectors.
+
+Base58Check addresses are well-known mainnet ones, the segwit ones come
+from BIP-173 and BIP-350, and the checksummed Ethereum ones from EIP-55.
+
+    python -m pytest tests
+"""
+import unittest
+from unittest import mock
+
+import address_check
+from address_check import (base58check, is_bitcoin_address, is_ethereum_address, is_solana_address,
+                           is_xrp_address, keccak256, screen, segwit_decode, to_checksum_address, XRP_ALPHABET)
+
+
+# (address, hrp, witness version, program hex), BIP-350 "valid segwit addresses"
+SEGWIT_VALID = [
+    ('BC1QW508D6QEJXTDG4Y5R3ZARVARY0C5XW7KV8F3T4', 'bc', 0, '751e76e8199196d454941c45d1b3a323f1433bd6'),
+    ('tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7', 'tb', 0,
+     '1863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262'),
+    ('bc1pw508d6qejxtdg4y5r3zarvary0c5xw7kw508d6qejxtdg4y5r3zarvary0c5xw7kt5nd6y', 'bc', 1,
+     '751e76e8199196d454941c45d1b3a323f1433bd6751e76e8199196d454941c45d1b3a323f1433bd6'),
+    ('BC1SW50QGDZ25J', 'bc', 16, '751e'),
+    ('bc1zw508d6qejxtdg4y5r3zarvaryvaxxpcs', 'bc', 2, '751e76e8199196d454941c45d1b3a323'),
+    ('tb1qqqqqp399et2xygdj5xreqhjjvcmzhxw4aywxecjdzew6hylgvsesrxh6hy', 'tb', 0,
+     '000000c4a5cad46221b2a187905e5266362b99d5e91c6ce24d165dab93e86433'),
+    ('tb1pqqqqp399et2xygdj5xreqhjjvcmzhxw4aywxecjdzew6hylgvsesf3hn0c', 'tb', 1,
+     '000000c4a5cad46221b2a187905e5266362b99d5e91c6ce24d165dab93e86433'),
+    ('bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0', 'bc', 1,
+     '79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798'),
+]
+
+# BIP-173 and BIP-350 "invalid segwit addresses"
+SEGWIT_INVALID = [
+    # Version 1 with a Bech32 checksum, version 0 with a Bech32m one
+    'bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqh2y7hd',
+    'BC1S0XLXVLHEMJA6C4DQV22UAPCTQUPFHLXM9H8Z3K2E72Q4K9HCZ7VQ54WELL',
+    'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kemeawh',
+    # Bad checksum
+    'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t5',
+    # Witness version above 16
+    'BC130XLXVLHEMJA6C4DQV22UAPCTQUPFHLXM9H8Z3K2E72Q4K9HCZ7VQ7ZWS8R',
+    # Programs of 1 and 41 bytes, and a 16-byte version 0 program
+    'bc1pw5dgrnzv',
+    'bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7v8n0nx0muaewav253zgeav',
+    'BC1QR508D6QEJXTDG4Y5R3ZARVARYV98GJ9P',
+    # Mixed case
+    'tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sL5k7',
+    # Non-zero padding, and more than 4 bits of it
+    'bc1zw508d6qejxtdg4y5r3zarvaryvqyzf3du',
+    'tb1pw508d6qejxtdg4y5r3zarqfsj6c3',
+    # Empty data section
+    'bc1gmk9yu',
+]
+
+# EIP-55 examples
+EIP55 = [
+    '0x52908400098527886E0F7030069857D2E4169EE7',
+    '0x8617E340B3D01FA5F11F306F4090FD50E238070D',
+    '0xde709f2102306220921060314715629080e2fb77',
+    '0x27b1fdb04752bbc536007a920d24acb045561c26',
+    '0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed',
+    '0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359',
+    '0xdbF03B407c01E7cD3CBea99509d93f8DDDC8C6FB',
+    '0xD1220A0cf47c7B9Be7A2E6BA89F429762e7b9aDb',
+]
+
+
+def flip_case(address, index):
+    """`address` with the letter at `index` in the other case"""
+    return address[:index] + address[index].swapcase() + address[index + 1:]
+
+
+class Base58CheckTest(unittest.TestCase):
+
+    def test_genesis_address(self):
+        payload = base58check('1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa')
+        self.assertEqual(payload.hex(), '0062e907b15cbf27d5425399ebf6f0fb50ebb88f18')
+
+    def test_mainnet_addresses(self):
+        self.assertTrue(is_bitcoin_address('1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa'))
+        self.assertTrue(is_bitcoin_address('1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2'))
+        self.assertTrue(is_bitcoin_address('3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy'))
+
+    def test_one_wrong_character(self):
+        self.assertFalse(is_bitcoin_address('1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb'))
+        self.assertFalse(is_bitcoin_address('3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLz'))
+
+    def test_characters_outside_the_alphabet(self):
+        self.assertFalse(is_bitcoin_address('1A1zP1eP5QGefi2DMPTfTL5SLmv7Divf0a'))
+        self.assertIsNone(base58check('0OIl'))
+
+    def test_testnet_needs_the_flag(self):
+        self.assertFalse(is_bitcoin_address('mipcBbFg9gMiCh81Kj8tqqdgoZub1ZJRfn'))
+        self.assertTrue(is_bitcoin_address('mipcBbFg9gMiCh81Kj8tqqdgoZub1ZJRfn', testnet=True))
+        self.assertFalse(is_bitcoin_address('1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa', testnet=True))
+
+    def test_xrp_addresses(self):
+        self.assertTrue(is_xrp_address('rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh'))
+        self.assertTrue(is_xrp_address('rrrrrrrrrrrrrrrrrrrrrhoLvTp'))
+        self.assertFalse(is_xrp_address('rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTj'))
+        self.assertEqual(base58check('rrrrrrrrrrrrrrrrrrrrrhoLvTp', XRP_ALPHABET), b'\0' * 21)
+
+
+class SegwitTest(unittest.TestCase):
+
+    def test_valid_vectors(self):
+        for address, hrp, version, program in SEGWIT_VALID:
+            self.assertEqual(segwit_decode(address), (hrp, version, bytes.fromhex(program)), address)
+
+    def test_invalid_vectors(self):
+        for address in SEGWIT_INVALID:
+            self.assertIsNone(segwit_decode(address), address)
+
+    def test_network_prefix(self):
+        self.assertTrue(is_bitcoin_address('bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4'))
+        self.assertFalse(is_bitcoin_address('tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7'))
+        self.assertTrue(is_bitcoin_address('tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7',
+                                           testnet=True))
+
+
+class EthereumChecksumTest(unittest.TestCase):
+
+    def test_keccak256(self):
+        self.assertEqual(keccak256(b'').hex(), 'c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470')
+        self.assertEqual(keccak256(b'abc').hex(), '4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45')
+
+    def test_pure_python_fallback(self):
+        # Longer than the 136-byte rate, so more than one block is absorbed
+        data = bytes(range(256)) * 2
+        self.assertEqual(address_check._keccak256(b'abc'), keccak256(b'abc'))
+        with mock.patch.object(address_check, '_pycryptodome_keccak', None), \
+                mock.patch.object(address_check, '_pysha3', None):
+            self.assertEqual(keccak256(data), address_check._keccak256(data))
+            self.assertTrue(is_ethereum_address(EIP55[4]))
+
+    def test_eip55_vectors(self):
+        for address in EIP55:
+            self.assertEqual(to_checksum_address(address.lower()), address)
+            self.assertTrue(is_ethereum_address(address), address)
+
+    def test_wrong_case_fails(self):
+        for address in EIP55[4:]:
+            self.assertFalse(is_ethereum_address(flip_case(address, address.index('a'))), address)
+
+    def test_shape(self):
+        self.assertFalse(is_ethereum_address('0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAe'))
+        self.assertFalse(is_ethereum_address('5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed'))
+        self.assertFalse(is_ethereum_address('0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeg'))
+
+
+class SolanaAndScreenTest(unittest.TestCase):
+
+    def test_solana_keys(self):
+        self.assertTrue(is_solana_address('11111111111111111111111111111111'))
+        self.assertTrue(is_solana_address('So11111111111111111111111111111111111111112'))
+        self.assertFalse(is_solana_address('So1111111111111111111111111111111111111111'))
+        self.assertFalse(is_solana_address('0OIl1111111111111111111111111111'))
+
+    def test_screen_checks_each_distinct_address_once(self):
+        seen = []
+
+        def is_valid(address):
+            seen.append(address)
+            return address.startswith('1')
+
+        self.assertEqual(screen(is_valid, ['1a', '2b', '1a', '1a', '2b']), [True, False, True, True, False])
+        self.assertEqual(seen, ['1a', '2b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
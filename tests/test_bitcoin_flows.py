@@ -0,0 +1,118 @@
+"""Integer satoshi flows of blockchain.info transactions (split_units, bitcoin_flows).
+
+    python -m pytest tests
+"""
+import unittest
+
+from crypto_api import bitcoin_flows, split_units
+
+
+ADDRESS = '1BoatSLRHtKNngkdXEeobR76b53LETtpyT'
+
+
+def tx(inputs, outputs, fee=None):
+    """blockchain.info rawaddr transaction from (address, satoshis) pairs"""
+    data = {
+        'inputs': [{'prev_out': {'addr': addr, 'value': value}} for addr, value in inputs],
+        'out': [{'addr': addr, 'value': value} for addr, value in outputs],
+    }
+    if fee is not None:
+        data['fee'] = fee
+    return data
+
+
+class SplitUnitsTest(unittest.TestCase):
+
+    def test_shares_add_up_exactly(self):
+        shares = split_units(100, {'a': 1, 'b': 1, 'c': 1})
+        self.assertEqual(sum(shares.values()), 100)
+        self.assertEqual(sorted(shares.values()), [33, 33, 34])
+
+    def test_largest_remainder_gets_the_extra_unit(self):
+        self.assertEqual(split_units(10, {'a': 2, 'b': 1}), {'a': 7, 'b': 3})
+
+    def test_proportional_split(self):
+        self.assertEqual(split_units(1000, {'a': 3, 'b': 1}), {'a': 750, 'b': 250})
+
+    def test_zero_shares_are_left_out(self):
+        self.assertEqual(split_units(1, {'a': 1, 'b': 1000}), {'b': 1})
+
+    def test_nothing_to_split(self):
+        self.assertEqual(split_units(0, {'a': 1}), {})
+        self.assertEqual(split_units(100, {}), {})
+        self.assertEqual(split_units(100, {'a': 0}), {})
+
+    def test_large_amounts_stay_exact(self):
+        amount = 21_000_000 * 10 ** 8 + 1
+        shares = split_units(amount, {'a': 7, 'b': 11, 'c': 13})
+        self.assertEqual(sum(shares.values()), amount)
+
+
+class BitcoinFlowsTest(unittest.TestCase):
+
+    def test_received_is_attributed_to_the_inputs(self):
+        flows = bitcoin_flows(tx([('A', 30000), ('B', 10000)], [(ADDRESS, 20000), ('A', 19000)]), ADDRESS)
+
+        self.assertFalse(flows['sender'])
+        self.assertEqual(flows['amount'], 20000)
+        self.assertEqual(flows['net'], 20000)
+        self.assertEqual(flows['fee'], 1000)
+        self.assertEqual(flows['parties'], {'A': 15000, 'B': 5000})
+
+    def test_sent_with_change(self):
+        flows = bitcoin_flows(tx([(ADDRESS, 50000)], [('C', 30000), (ADDRESS, 19000)]), ADDRESS)
+
+        self.assertTrue(flows['sender'])
+        self.assertEqual(flows['amount'], -30000)
+        self.assertEqual(flows['change'], 19000)
+        self.assertEqual(flows['fee'], 1000)
+        self.assertEqual(flows['net'], -31000)
+        self.assertEqual(flows['parties'], {'C': -30000})
+
+    def test_reported_fee_wins(self):
+        flows = bitcoin_flows(tx([(ADDRESS, 50000)], [('C', 30000)], fee=1500), ADDRESS)
+        self.assertEqual(flows['fee'], 1500)
+
+    def test_outputs_to_other_inputs_are_change(self):
+        # Common-input-ownership: B co-signs, so what goes back to B is not sent
+        flows = bitcoin_flows(tx([(ADDRESS, 40000), ('B', 40000)], [('C', 40000), ('B', 39000)]), ADDRESS)
+
+        self.assertEqual(flows['change'], 39000)
+        self.assertEqual(flows['parties'], {'C': -20000})
+        self.assertEqual(flows['amount'], -20000)
+
+    def test_coinjoin_charges_only_the_address_share(self):
+        flows = bitcoin_flows(tx([(ADDRESS, 10), ('B', 10)], [('C', 10), ('D', 10)], fee=0), ADDRESS)
+
+        self.assertEqual(flows['net'], -10)
+        self.assertEqual(flows['amount'], -10)
+        self.assertEqual(flows['parties'], {'C': -5, 'D': -5})
+
+    def test_coinjoin_share_never_exceeds_what_was_spent(self):
+        # The address gets 9 of its 10 back, so it cannot have sent more than 1
+        flows = bitcoin_flows(tx([(ADDRESS, 10), ('B', 30)], [('C', 30), (ADDRESS, 9)], fee=1), ADDRESS)
+
+        self.assertEqual(flows['amount'], -1)
+        self.assertEqual(sum(flows['parties'].values()), flows['amount'])
+
+    def test_parties_sum_to_amount(self):
+        flows = bitcoin_flows(tx([(ADDRESS, 70001), ('B', 29999)], [('C', 33333), ('D', 33333), ('E', 33333)],
+                                 fee=1), ADDRESS)
+        self.assertEqual(sum(flows['parties'].values()), flows['amount'])
+
+    def test_inputs_without_address_are_skipped(self):
+        data = tx([(ADDRESS, 5000)], [('C', 4000)])
+        data['inputs'].append({'prev_out': {'value': 1000}})
+        data['inputs'].append({})
+        flows = bitcoin_flows(data, ADDRESS)
+
+        self.assertEqual(flows['amount'], -4000)
+        self.assertEqual(flows['fee'], 2000)
+
+    def test_unrelated_transaction(self):
+        flows = bitcoin_flows(tx([('A', 5000)], [('C', 4000)]), ADDRESS)
+        self.assertEqual((flows['sender'], flows['amount'], flows['parties']), (False, 0, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
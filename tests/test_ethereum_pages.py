@@ -0,0 +1,209 @@
+"""Ethereum history over Etherscan's account lists, against a local stand-in.
+
+The stand-in serves txlist, tokentx and txlistinternal from canned rows
+with Etherscan's paging rules: block range, page and offset, status 0
+for an exhausted range and an error once page * offset passes the result
+window, which the tests shrink to a few rows.
+
+    python -m pytest tests
+"""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import crypto_api
+from crypto_api import CRYPTO_CONFIGS, Cryptocurrency, MultiCryptoAPI
+
+
+ADDRESS = '0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed'
+OWN = ADDRESS.lower()
+OTHER = '0xfb6916095ca1df60bb79ce92ce3ea74c37c5d359'
+TOKEN = '0xdac17f958d2ee523a2206206994597c13d831ec7'
+
+ETHEREUM = Cryptocurrency.ETHEREUM
+WINDOW = 10
+
+
+def row(n, block, **fields):
+    """Etherscan row n in `block`, 1 ETH from OTHER to the address unless told otherwise"""
+    data = {
+        'blockNumber': str(block),
+        'timeStamp': str(1700000000 + block * 12),
+        'hash': f'0x{n:064x}',
+        'from': OTHER,
+        'to': OWN,
+        'value': str(10 ** 18),
+        'gasUsed': '21000',
+        'gasPrice': str(10 ** 9),
+        'isError': '0',
+        'confirmations': '100',
+    }
+    data.update(fields)
+    return data
+
+
+class StandInEtherscan:
+    """Etherscan's account module over HTTP on localhost, answering from canned rows.
+
+    `lists` maps each action to its rows, newest first. Actions in
+    `failing` answer NOTOK. Every list request is kept in `requests` as
+    (action, startblock, endblock, page).
+    """
+
+    def __init__(self, lists):
+        self.lists = lists
+        self.failing = set()
+        self.requests = []
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                body = json.dumps(api.answer(query)).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/api'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, query):
+        action = query['action']
+        if action == 'balance':
+            return {'status': '1', 'message': 'OK', 'result': str(3 * 10 ** 18)}
+        start, end = int(query['startblock']), int(query['endblock'])
+        page, offset = int(query['page']), int(query['offset'])
+        self.requests.append((action, start, end, page))
+        if action in self.failing:
+            return {'status': '0', 'message': 'NOTOK', 'result': 'Error! Invalid address format'}
+        if page * offset > WINDOW:
+            return {'status': '0', 'message': 'NOTOK',
+                    'result': f'Result window is too large, PageNo x Offset size must be <= {WINDOW}'}
+        rows = [r for r in self.lists.get(action, []) if start <= int(r['blockNumber']) <= end]
+        rows = rows[(page - 1) * offset:page * offset]
+        if not rows:
+            return {'status': '0', 'message': 'No transactions found', 'result': []}
+        return {'status': '1', 'message': 'OK', 'result': rows}
+
+    def pages(self, action):
+        return [request[1:] for request in self.requests if request[0] == action]
+
+
+class EthereumPagesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lists = {'txlist': [], 'tokentx': [], 'txlistinternal': []}
+        self.etherscan = StandInEtherscan(self.lists)
+        self.addCleanup(self.etherscan.close)
+        config = mock.patch.dict(CRYPTO_CONFIGS[ETHEREUM], api_base=self.etherscan.url, page_size=5,
+                                 rate_limit=1000.0, burst=1000)
+        config.start()
+        self.addCleanup(config.stop)
+        window = mock.patch.object(crypto_api, 'ETHERSCAN_WINDOW', WINDOW)
+        window.start()
+        self.addCleanup(window.stop)
+        self.errors = []
+        self.api = MultiCryptoAPI(error_callback=self.errors.append)
+
+    def fetch(self, **kwargs):
+        walk = {}
+        transactions = [tx for batch in self.api.iter_transactions(ETHEREUM, ADDRESS, None, walk=walk, **kwargs)
+                        for tx in batch]
+        return transactions, walk
+
+    def test_window_is_narrowed_to_the_oldest_block(self):
+        # Three rows per block, so the window ends in the middle of block 97
+        self.lists['txlist'] = [row(n, 100 - n // 3) for n in range(23)]
+        transactions, walk = self.fetch()
+
+        self.assertEqual([tx['hash'] for tx in transactions], [f'0x{n:064x}' for n in range(23)])
+        self.assertTrue(walk['complete'])
+        self.assertEqual(self.errors, [])
+        # Two pages fill the window, then the range ends at block 97 and again at block 94,
+        # where a full page ends and the next one is empty
+        self.assertEqual(self.etherscan.pages('txlist'), [
+            (0, 99999999, 1), (0, 99999999, 2),
+            (0, 97, 1), (0, 97, 2),
+            (0, 94, 1), (0, 94, 2),
+        ])
+
+    def test_the_three_lists_are_merged_newest_first(self):
+        self.lists['txlist'] = [
+            row(1, 90, **{'from': OWN, 'to': OTHER, 'value': str(2 * 10 ** 18)}),
+            row(2, 70),
+        ]
+        self.lists['tokentx'] = [
+            row(1, 90, value='2500000', tokenSymbol='USDT', tokenDecimal='6', contractAddress=TOKEN, logIndex='4'),
+            row(3, 80, value='1000000', tokenSymbol='USDT', tokenDecimal='6', contractAddress=TOKEN, logIndex='0'),
+        ]
+        self.lists['txlistinternal'] = [
+            row(4, 85, value=str(5 * 10 ** 17), traceId='0_1'),
+            row(5, 60, isError='1', traceId='0'),
+        ]
+        transactions, walk = self.fetch()
+        summary = [(int(tx['raw_data']['blockNumber']), tx.get('asset'), tx['type'], tx['amount'])
+                   for tx in transactions]
+
+        self.assertTrue(walk['complete'])
+        # Rows of one block come in either order
+        self.assertEqual(set(summary[:2]), {(90, None, 'sent', -2.0), (90, 'USDT', 'received', 2.5)})
+        self.assertEqual(summary[2:], [
+            (85, None, 'received', 0.5),
+            (80, 'USDT', 'received', 1.0),
+            (70, None, 'received', 1.0),
+            (60, None, 'interaction', 0),
+        ])
+        by_entry = {tx.get('entry'): tx for tx in transactions}
+        self.assertEqual(set(by_entry), {None, 'tokentx:4', 'tokentx:0', 'txlistinternal:0_1', 'txlistinternal:0'})
+        # Gas is paid by the transaction, not by the transfers riding on it
+        self.assertEqual(by_entry['tokentx:4']['fee'], 0)
+        self.assertEqual(by_entry[None]['fee'], 21000 * 10 ** 9 / 10 ** 18)
+
+    def test_since_starts_every_list_at_the_cursor_block(self):
+        self.lists['txlist'] = [row(n, 100 - n) for n in range(8)]
+        self.lists['tokentx'] = [row(20, 99, tokenSymbol='USDT', tokenDecimal='6', logIndex='1')]
+        transactions, walk = self.fetch(since=97)
+
+        self.assertEqual([int(tx['raw_data']['blockNumber']) for tx in transactions], [100, 99, 99, 98, 97])
+        self.assertTrue(walk['complete'])
+        for action in crypto_api.ETHEREUM_ACTIONS:
+            self.assertTrue(all(start == 97 for start, _, _ in self.etherscan.pages(action)), action)
+
+    def test_an_error_answer_ends_the_walk(self):
+        self.lists['txlist'] = [row(n, 100 - n) for n in range(3)]
+        self.etherscan.failing = {'tokentx'}
+        _, walk = self.fetch()
+
+        self.assertFalse(walk['complete'])
+        self.assertEqual(self.errors, ['Etherscan API error: NOTOK'])
+
+    def test_transaction_count_covers_every_list(self):
+        self.lists['txlist'] = [row(n, 100 - n) for n in range(3)]
+        self.lists['tokentx'] = [row(10, 99, tokenSymbol='USDT', tokenDecimal='6', logIndex='1')]
+        self.lists['txlistinternal'] = [row(11, 98, traceId='0')]
+        balance = self.api.fetch_balance(ETHEREUM, ADDRESS)
+
+        self.assertEqual((balance['balance'], balance['transaction_count']), (3.0, 5))
+
+    def test_transaction_count_unknown_past_a_full_page(self):
+        self.lists['tokentx'] = [row(n, 100 - n, tokenSymbol='USDT', tokenDecimal='6', logIndex='0')
+                                 for n in range(5)]
+        self.assertIsNone(self.api.fetch_balance(ETHEREUM, ADDRESS)['transaction_count'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""flow_statistics over a TransactionTable: exact integer sums, buckets and tokens.
+
+    python -m pytest tests
+"""
+import math
+import unittest
+from datetime import datetime, timezone
+
+from analysis import flow_statistics
+from crypto_api import Cryptocurrency
+from tx_columns import MAX_UNITS, TransactionTable
+
+
+ADDRESS = 'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4'
+BITCOIN = Cryptocurrency.BITCOIN
+
+
+def at(day, hour=12):
+    """A time on day `day` of March 2024 (UTC), which starts on a Friday"""
+    return datetime(2024, 3, day, hour, tzinfo=timezone.utc)
+
+
+def tx(n, units, when, party='A', fee=0, asset=None):
+    parsed = {
+        'hash': f'h{n}',
+        'timestamp': when,
+        'type': 'received' if units > 0 else 'sent',
+        'units': units,
+        'fee_units': fee,
+    }
+    if asset:
+        parsed['asset'] = asset
+    return parsed, {party: units / 10 ** 8}
+
+
+def table_of(*rows):
+    table = TransactionTable(BITCOIN, ADDRESS)
+    for parsed, flows in rows:
+        table.append(parsed, flows)
+    return table
+
+
+class FlowStatisticsTest(unittest.TestCase):
+
+    def test_sums_are_exact(self):
+        # Ten times 0.1 BTC is 1 BTC, not the 0.9999999999999999 of a float sum
+        stats = flow_statistics(table_of(*(tx(n, 10 ** 7, at(1)) for n in range(10))))
+        self.assertEqual(stats['total_received'], 1.0)
+        self.assertEqual(stats['daily'], [{'period': '2024-03-01', 'received': 1.0, 'sent': 0.0, 'transactions': 10}])
+
+    def test_sums_beyond_float_precision(self):
+        # 2 ** 53 + 1 + 1 in float64 stays 2 ** 53
+        units = [2 ** 53, 1, 1]
+        stats = flow_statistics(table_of(*(tx(n, u, at(1)) for n, u in enumerate(units))))
+        self.assertEqual(stats['total_received'], (2 ** 53 + 2) / 10 ** 8)
+        self.assertNotEqual(stats['total_received'], float(2 ** 53) / 10 ** 8)
+        self.assertEqual(stats['daily'][0]['received'], (2 ** 53 + 2) / 10 ** 8)
+        self.assertEqual(stats['average_incoming'], (2 ** 53 + 2) / 10 ** 8 / 3)
+
+    def test_totals_and_sides(self):
+        stats = flow_statistics(table_of(
+            tx(1, 5 * 10 ** 8, at(1), 'A'),
+            tx(2, 3 * 10 ** 8, at(2), 'B'),
+            tx(3, -2 * 10 ** 8, at(9), 'C', fee=1000),
+        ))
+        self.assertEqual((stats['transactions'], stats['incoming'], stats['outgoing']), (3, 2, 1))
+        self.assertEqual((stats['total_received'], stats['total_sent'], stats['net_flow']), (8.0, 2.0, 6.0))
+        self.assertEqual(stats['total_fees'], 1e-05)
+        self.assertEqual(stats['imbalance'], 0.6)
+        self.assertEqual((stats['largest_incoming'], stats['median_incoming']), (5.0, 4.0))
+        self.assertEqual(stats['largest_outgoing'], 2.0)
+        self.assertEqual(stats['first_tx'], at(1).astimezone().replace(tzinfo=None))
+
+    def test_week_and_month_buckets(self):
+        # Friday 1, Monday 4 and Saturday 9 March, then Monday 1 April
+        april = datetime(2024, 4, 1, 12, tzinfo=timezone.utc)
+        stats = flow_statistics(table_of(tx(1, 100, at(1)), tx(2, 200, at(4)), tx(3, -50, at(9)), tx(4, 400, april)))
+        self.assertEqual([(b['period'], b['transactions']) for b in stats['weekly']],
+                         [('2024-02-26', 1), ('2024-03-04', 2), ('2024-04-01', 1)])
+        self.assertEqual(stats['monthly'], [
+            {'period': '2024-03', 'received': 3e-06, 'sent': 5e-07, 'transactions': 3},
+            {'period': '2024-04', 'received': 4e-06, 'sent': 0.0, 'transactions': 1},
+        ])
+
+    def test_usd_uses_each_transaction_price(self):
+        table = table_of(tx(1, 10 ** 8, at(1)), tx(2, 10 ** 8, at(2)), tx(3, -10 ** 8, at(3)))
+        table.set_usd_prices([60000.0, math.nan, 70000.0])
+        stats = flow_statistics(table)
+
+        self.assertEqual(stats['priced'], 2)
+        self.assertEqual((stats['received_usd'], stats['sent_usd']), (60000.0, 70000.0))
+
+    def test_tokens_are_counted_apart(self):
+        table = table_of(
+            tx(1, 10 ** 8, at(1), 'A'),
+            tx(2, 7 * 10 ** 8, at(2), 'T', fee=500, asset='USDT'),
+            tx(3, MAX_UNITS, at(3), 'T', asset='USDT'),
+            tx(4, -10 ** 8, at(3), 'U', asset='LINK'),
+        )
+        stats = flow_statistics(table)
+
+        self.assertEqual((stats['transactions'], stats['total_received'], stats['total_sent']), (1, 1.0, 0.0))
+        self.assertEqual(stats['total_fees'], 5e-06)
+        self.assertEqual(stats['counterparties'], 1)
+        self.assertEqual(stats['tokens'], [
+            {'asset': 'USDT', 'transactions': 2, 'received': (7 * 10 ** 8 + MAX_UNITS) / 10 ** 8, 'sent': 0.0},
+            {'asset': 'LINK', 'transactions': 1, 'received': 0.0, 'sent': 1.0},
+        ])
+
+    def test_concentration(self):
+        stats = flow_statistics(table_of(tx(1, 300, at(1), 'A'), tx(2, 100, at(1), 'B')))
+
+        self.assertEqual([party['address'] for party in stats['top_counterparties']], ['A', 'B'])
+        self.assertEqual(stats['top_counterparty_share'], 0.75)
+        self.assertEqual(stats['hhi'], 0.75 ** 2 + 0.25 ** 2)
+
+    def test_empty_table(self):
+        stats = flow_statistics(TransactionTable(BITCOIN, ADDRESS))
+
+        self.assertEqual((stats['transactions'], stats['total_received'], stats['imbalance']), (0, 0.0, None))
+        self.assertIsNone(stats['largest_incoming'])
+        self.assertEqual((stats['first_tx'], stats['daily'], stats['tokens']), (None, [], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""json_stream.iter_items over bodies cut into chunks at every possible byte.
+
+    python -m pytest tests
+"""
+import json
+import unittest
+
+from json_stream import iter_items
+
+
+DOCUMENT = {
+    'status': '1',
+    'n_tx': 123456789,
+    'txs': [
+        {'hash': 'a' * 64, 'value': 1234567890123, 'note': 'café € \U0001f680'},
+        {'hash': 'quote " and \\ backslash, ] and }', 'value': -1.5e-07},
+        12345678901234567890,
+        'plain [string], {with} brackets',
+        [1, [2, 3], {'deep': None}],
+        True,
+        -0.25,
+    ],
+    'message': 'OK',
+}
+
+
+def cut(body, *positions):
+    """Byte chunks of `body` split at `positions`"""
+    bounds = [0, *positions, len(body)]
+    return [body[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+class IterItemsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.body = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+
+    def items(self, chunks, path=('txs',), header=None):
+        return list(iter_items(chunks, path, header))
+
+    def test_whole_body(self):
+        header = {}
+        self.assertEqual(self.items([self.body], header=header), DOCUMENT['txs'])
+        self.assertEqual(header, {'status': '1', 'n_tx': 123456789, 'message': 'OK'})
+
+    def test_every_single_cut(self):
+        # Every cut lands somewhere: in a string, a number, a multi-byte character or between tokens
+        for position in range(1, len(self.body)):
+            header = {}
+            self.assertEqual(self.items(cut(self.body, position), header=header), DOCUMENT['txs'], position)
+            self.assertEqual(header['n_tx'], 123456789, position)
+
+    def test_one_byte_chunks(self):
+        header = {}
+        chunks = [self.body[i:i + 1] for i in range(len(self.body))]
+        self.assertEqual(self.items(chunks, header=header), DOCUMENT['txs'])
+        self.assertEqual(header['message'], 'OK')
+
+    def test_numbers_cut_between_digits(self):
+        body = b'[1,23,456,-7.5e+10,0.125]'
+        for position in range(1, len(body)):
+            self.assertEqual(self.items(cut(body, position), path=()), [1, 23, 456, -7.5e10, 0.125], position)
+
+    def test_number_at_the_end_of_the_stream(self):
+        body = b'{"txs": [1, 2], "n_tx": 1000}'
+        header = {}
+        self.assertEqual(self.items(cut(body, len(body) - 3), header=header), [1, 2])
+        self.assertEqual(header['n_tx'], 1000)
+
+    def test_strings_cut_at_escapes(self):
+        items = ['a\\"b', 'é\\u00e9', '\\\\']
+        body = ('[' + ','.join(f'"{item}"' for item in items) + ']').encode()
+        expected = json.loads(body)
+        for position in range(1, len(body)):
+            self.assertEqual(self.items(cut(body, position), path=()), expected, position)
+
+    def test_nested_path(self):
+        body = json.dumps({'result': {'meta': 1, 'transactions': [{'n': 1}, {'n': 2}]}}).encode()
+        self.assertEqual(self.items(cut(body, 20, 40), path=('result', 'transactions')), [{'n': 1}, {'n': 2}])
+
+    def test_error_in_place_of_the_list(self):
+        body = b'{"status": "0", "message": "NOTOK", "result": "Max rate limit reached"}'
+        header = {}
+        self.assertEqual(self.items(cut(body, 50), path=('result',), header=header), [])
+        self.assertEqual(header['result'], 'Max rate limit reached')
+
+    def test_empty_array(self):
+        self.assertEqual(self.items([b'{"txs": [ ]}']), [])
+
+    def test_stops_reading_once_the_caller_stops(self):
+        read = []
+
+        def chunks():
+            for i in range(0, len(self.body), 16):
+                read.append(i)
+                yield self.body[i:i + 16]
+
+        first = next(iter_items(chunks(), ('txs',)))
+        self.assertEqual(first, DOCUMENT['txs'][0])
+        self.assertLess(len(read) * 16, len(self.body))
+
+    def test_malformed_array(self):
+        with self.assertRaises(ValueError):
+            self.items([b'[1 2]'], path=())
+
+
+if __name__ == '__main__':
+    unittest.main()
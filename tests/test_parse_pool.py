@@ -0,0 +1,61 @@
+"""ParsePool: cached raw JSON parsed in shards, on worker processes or in line.
+
+    python -m pytest tests
+"""
+import json
+import unittest
+
+from crypto_api import Cryptocurrency
+from parse_pool import ParsePool
+
+
+ADDRESS = '1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2'
+BITCOIN = Cryptocurrency.BITCOIN
+
+
+def raw_tx(n):
+    """blockchain.info transaction n: n * 1000 satoshis received from sender n % 3"""
+    return json.dumps({
+        'hash': f'{n:064x}',
+        'time': 1700000000 + n * 600,
+        'block_height': 800000 + n,
+        'fee': 100,
+        'inputs': [{'prev_out': {'addr': f'sender{n % 3}', 'value': n * 1000 + 100}}],
+        'out': [{'addr': ADDRESS, 'value': n * 1000}],
+    })
+
+
+class ParsePoolTest(unittest.TestCase):
+
+    def setUp(self):
+        # Oldest first, as shards of a cache could come back in any order
+        self.raw = [raw_tx(n) for n in range(1, 26)]
+
+    def check(self, table):
+        self.assertEqual(len(table), 25)
+        self.assertEqual([row['hash'] for row in table], [f'{n:064x}' for n in range(25, 0, -1)])
+        self.assertEqual(list(table.amounts), [n * 1000 for n in range(25, 0, -1)])
+        self.assertEqual(table.flows(0), {'sender1': 25000 / 10 ** 8})
+        self.assertEqual(sorted(table.parties), ['sender0', 'sender1', 'sender2'])
+
+    def test_in_line_below_the_threshold(self):
+        pool = ParsePool(workers=2, shard_size=10)
+        self.addCleanup(pool.close)
+        self.check(pool.parse(BITCOIN, ADDRESS, self.raw))
+        self.assertIsNone(pool._executor)
+
+    def test_on_worker_processes(self):
+        pool = ParsePool(workers=2, shard_size=10, parallel_min=0)
+        self.addCleanup(pool.close)
+        self.check(pool.parse(BITCOIN, ADDRESS, self.raw))
+        self.assertIsNotNone(pool._executor)
+
+    def test_rejected_transactions_are_left_out(self):
+        pool = ParsePool(workers=1, shard_size=10)
+        self.addCleanup(pool.close)
+        table = pool.parse(BITCOIN, ADDRESS, self.raw[:3] + ['{"inputs": 5}'])
+        self.assertEqual(len(table), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""PriceHistory against a local stand-in for CoinGecko's market_chart/range.
+
+The stand-in answers one price per day, the day number itself, and a
+server error for the ranges listed in `failing`, so chunking, coverage
+and the lookups can be checked without the network.
+
+    python -m pytest tests
+"""
+import json
+import math
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from price_history import MAX_PRICE_AGE_DAYS, RANGE_DAYS, SECONDS_PER_DAY, PriceHistory, day_chunks
+
+
+# 2019-04-14
+DAY = 18000
+
+
+class StandInCoinGecko:
+    """market_chart/range over HTTP on localhost; every request is kept in `ranges`"""
+
+    def __init__(self):
+        self.ranges = []
+        self.failing = set()
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                first_day = int(query['from'][0]) // SECONDS_PER_DAY
+                last_day = int(query['to'][0]) // SECONDS_PER_DAY - 1
+                api.ranges.append((first_day, last_day))
+                if (first_day, last_day) in api.failing:
+                    self.send_error(500)
+                    return
+                # Two samples a day, the later one is the day's price
+                prices = [[(day * SECONDS_PER_DAY + hour * 3600) * 1000, day + hour / 100]
+                          for day in range(first_day, last_day + 1) for hour in (6, 12)]
+                body = json.dumps({'prices': prices}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/coins/{{asset}}/market_chart/range'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class DayChunksTest(unittest.TestCase):
+
+    def test_forward_and_backward(self):
+        self.assertEqual(day_chunks(0, 799), [(0, 364), (365, 729), (730, 799)])
+        self.assertEqual(day_chunks(0, 799, backward=True), [(730, 799), (365, 729), (0, 364)])
+        self.assertEqual(day_chunks(5, 5), [(5, 5)])
+
+
+class PriceHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = StandInCoinGecko()
+        self.addCleanup(self.api.close)
+        url = mock.patch.object(PriceHistory, 'URL', self.api.url)
+        url.start()
+        self.addCleanup(url.stop)
+        self.history = PriceHistory(':memory:', timeout=5)
+        self.addCleanup(self.history.close)
+
+    def test_long_ranges_are_fetched_in_chunks_newest_first(self):
+        sent, failed = self.history.ensure('bitcoin', DAY, DAY + 799)
+
+        self.assertEqual((sent, failed), (3, []))
+        self.assertEqual(self.api.ranges, [(DAY + 730, DAY + 799), (DAY + 365, DAY + 729), (DAY, DAY + 364)])
+        self.assertTrue(all(end - start < RANGE_DAYS for start, end in self.api.ranges))
+        self.assertEqual(self.history.coverage('bitcoin'), (DAY, DAY + 799))
+
+    def test_covered_days_cost_nothing(self):
+        self.history.ensure('bitcoin', DAY, DAY + 99)
+        self.api.ranges.clear()
+
+        self.assertEqual(self.history.ensure('bitcoin', DAY + 10, DAY + 50), (0, []))
+        self.assertEqual(self.api.ranges, [])
+
+    def test_only_the_missing_sides_are_fetched(self):
+        self.history.ensure('bitcoin', DAY, DAY + 99)
+        self.api.ranges.clear()
+
+        self.assertEqual(self.history.ensure('bitcoin', DAY - 10, DAY + 109), (2, []))
+        self.assertEqual(self.api.ranges, [(DAY - 10, DAY - 1), (DAY + 100, DAY + 109)])
+        self.assertEqual(self.history.coverage('bitcoin'), (DAY - 10, DAY + 109))
+
+    def test_a_failed_chunk_does_not_stop_the_others(self):
+        self.api.failing = {(DAY + 365, DAY + 729)}
+        sent, failed = self.history.ensure('bitcoin', DAY, DAY + 799)
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(len(failed), 1)
+        self.assertTrue(failed[0].startswith('2020-04-13 to 2021-04-12: 500 Server Error'), failed[0])
+        # The oldest chunk is stored and used, but coverage stops at the gap
+        self.assertEqual(self.history.coverage('bitcoin'), (DAY + 730, DAY + 799))
+        prices = self.history.prices_at('bitcoin', [(DAY + 10.5) * SECONDS_PER_DAY, (DAY + 400.5) * SECONDS_PER_DAY])
+        self.assertEqual(prices[0], DAY + 10.12)
+        self.assertTrue(math.isnan(prices[1]))
+
+        # Next time the gap and what lies beyond it are asked for again
+        self.api.failing.clear()
+        self.api.ranges.clear()
+        self.assertEqual(self.history.ensure('bitcoin', DAY, DAY + 799), (2, []))
+        self.assertEqual(self.api.ranges, [(DAY + 365, DAY + 729), (DAY, DAY + 364)])
+        self.assertEqual(self.history.coverage('bitcoin'), (DAY, DAY + 799))
+
+    def test_today_is_never_fetched(self):
+        with mock.patch('price_history.time.time', return_value=(DAY + 5.5) * SECONDS_PER_DAY):
+            self.history.ensure('bitcoin', DAY, DAY + 9)
+            self.assertEqual(self.history.ensure('bitcoin', DAY + 5, DAY + 5), (0, []))
+
+        self.assertEqual(self.api.ranges, [(DAY, DAY + 4)])
+
+    def test_prices_at(self):
+        self.history.ensure('ethereum', DAY, DAY + 9)
+        timestamps = [
+            (DAY + 3) * SECONDS_PER_DAY,                            # midnight: that day's price
+            (DAY + 9 + MAX_PRICE_AGE_DAYS + 0.5) * SECONDS_PER_DAY,  # past the series, still recent enough
+            (DAY + 10 + MAX_PRICE_AGE_DAYS) * SECONDS_PER_DAY,       # too long after the last price
+            (DAY - 1) * SECONDS_PER_DAY,                            # before the series
+            math.nan,
+        ]
+        prices = self.history.prices_at('ethereum', timestamps)
+
+        self.assertEqual(prices[:2].tolist(), [DAY + 3.12, DAY + 9.12])
+        self.assertTrue(all(math.isnan(price) for price in prices[2:]))
+
+    def test_unknown_asset(self):
+        self.assertTrue(math.isnan(self.history.prices_at('dogecoin', [DAY * SECONDS_PER_DAY])[0]))
+        self.assertIsNone(self.history.coverage('dogecoin'))
+
+
+if __name__ == '__main__':
+    unittest.main()
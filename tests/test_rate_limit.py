@@ -0,0 +1,179 @@
+"""Per-host rate limiting, Retry-After and retries of transient failures.
+
+Retries run against a local stand-in explorer answering a scripted
+sequence of statuses.
+
+    python -m pytest tests
+"""
+import threading
+import time
+import unittest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import urlparse
+
+import requests
+
+from crypto_api import CRYPTO_CONFIGS, Cryptocurrency, MultiCryptoAPI, RateLimiter
+
+
+XRP = Cryptocurrency.XRP
+
+
+class StandInExplorer:
+    """HTTP on localhost answering (status, headers, body) from `script`, then 200 OK"""
+
+    def __init__(self):
+        self.script = []
+        self.hits = 0
+
+        explorer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                explorer.hits += 1
+                status, headers, body = explorer.script.pop(0) if explorer.script else (200, {}, b'{"ok": true}')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        limiter = RateLimiter(rate=50.0, burst=5)
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - started, 0.05)
+        for _ in range(5):
+            limiter.acquire()
+        # Five more at 50 a second
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def test_throttling_halves_the_rate_down_to_a_tenth(self):
+        limiter = RateLimiter(rate=10.0, burst=1)
+        limiter.throttled()
+        self.assertEqual((limiter.rate, limiter.tokens), (5.0, 0))
+        for _ in range(10):
+            limiter.throttled()
+        self.assertEqual(limiter.rate, 1.0)
+
+    def test_success_wins_the_rate_back(self):
+        limiter = RateLimiter(rate=10.0, burst=1)
+        limiter.throttled()
+        limiter.succeeded()
+        self.assertEqual(limiter.rate, 5.5)
+        for _ in range(20):
+            limiter.succeeded()
+        self.assertEqual(limiter.rate, 10.0)
+
+    def test_retry_after_blocks_the_host(self):
+        limiter = RateLimiter(rate=1000.0, burst=10)
+        limiter.throttled(0.2)
+        started = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+
+class RetryAfterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = MultiCryptoAPI()
+
+    def retry_after(self, value):
+        response = requests.Response()
+        if value is not None:
+            response.headers['Retry-After'] = value
+        return self.api._retry_after(response)
+
+    def test_seconds(self):
+        self.assertEqual(self.retry_after('7'), 7.0)
+        self.assertEqual(self.retry_after('1.5'), 1.5)
+
+    def test_http_date(self):
+        seconds = self.retry_after(format_datetime(datetime.now(timezone.utc) + timedelta(seconds=20), usegmt=True))
+        self.assertTrue(18 <= seconds <= 20, seconds)
+        self.assertEqual(self.retry_after(format_datetime(datetime(2000, 1, 1, tzinfo=timezone.utc), usegmt=True)), 0)
+
+    def test_capped_at_backoff_max(self):
+        self.assertEqual(self.retry_after('3600'), self.api.backoff_max)
+
+    def test_missing_or_unreadable(self):
+        self.assertIsNone(self.retry_after(None))
+        self.assertIsNone(self.retry_after('soon'))
+
+
+class RetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.explorer = StandInExplorer()
+        self.addCleanup(self.explorer.close)
+        config = mock.patch.dict(CRYPTO_CONFIGS[XRP], api_base=self.explorer.url, rate_limit=1000.0, burst=1000)
+        config.start()
+        self.addCleanup(config.stop)
+        self.api = MultiCryptoAPI()
+        self.api.backoff_base = 0.01
+        self.limiter = self.api.rate_limiters[urlparse(self.explorer.url).netloc]
+
+    def get(self):
+        return self.api._send(self.explorer.url + '/account', None, timeout=5)
+
+    def test_throttled_requests_are_retried_after_the_header(self):
+        self.explorer.script = [(429, {'Retry-After': '0.2'}, b''), (429, {'Retry-After': '0'}, b'')]
+        started = time.monotonic()
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((self.explorer.hits, self.api.requests_sent), (3, 3))
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        # Halved twice, then one success
+        self.assertEqual(self.limiter.rate, 1000.0 / 4 + 1000.0 / 20)
+
+    def test_rate_limit_body_counts_as_throttled(self):
+        self.explorer.script = [(200, {}, b'{"status":"0","message":"NOTOK","result":"Max rate limit reached"}')]
+        response = self.get()
+
+        self.assertEqual((response.status_code, response.json()), (200, {'ok': True}))
+        self.assertEqual(self.explorer.hits, 2)
+
+    def test_transient_errors_are_retried_up_to_max_retries(self):
+        self.explorer.script = [(503, {}, b'')] * 10
+        response = self.get()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.explorer.hits, self.api.max_retries + 1)
+        # Server errors are not throttling, the rate stays
+        self.assertEqual(self.limiter.rate, 1000.0)
+
+    def test_other_errors_are_returned_as_they_are(self):
+        self.explorer.script = [(404, {}, b'{"error": "not found"}')]
+        self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(self.explorer.hits, 1)
+
+    def test_connection_errors_are_retried_then_raised(self):
+        self.api.max_retries = 1
+        self.explorer.close()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.get()
+        self.assertEqual(self.api.requests_sent, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
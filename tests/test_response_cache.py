@@ -0,0 +1,153 @@
+"""MultiCryptoAPI.get: identical requests in flight coalesced, responses cached.
+
+The stand-in explorer holds every answer until `gate` is set, so callers
+can be lined up behind a request that is still on the wire.
+
+    python -m pytest tests
+"""
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+from crypto_api import CRYPTO_CONFIGS, Cryptocurrency, MultiCryptoAPI
+
+
+XRP = Cryptocurrency.XRP
+
+
+class StandInExplorer:
+    """HTTP on localhost echoing the request path and a hit number, `status` for every answer"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.status = 200
+        self.hits = 0
+        self.delay = 0
+
+        explorer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                explorer.hits += 1
+                hit = explorer.hits
+                explorer.gate.wait(5)
+                time.sleep(explorer.delay)
+                body = json.dumps({'path': self.path, 'hit': hit}).encode()
+                self.send_response(explorer.status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.gate.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.explorer = StandInExplorer()
+        self.addCleanup(self.explorer.close)
+        config = mock.patch.dict(CRYPTO_CONFIGS[XRP], api_base=self.explorer.url, rate_limit=1000.0, burst=1000)
+        config.start()
+        self.addCleanup(config.stop)
+        self.api = MultiCryptoAPI()
+        self.api.backoff_base = 0.01
+        self.url = self.explorer.url + '/account'
+        self.timeout = 2
+
+    def get(self, **params):
+        return self.api.get(self.url, params=params or None, timeout=self.timeout)
+
+    def held_calls(self, count, **params):
+        """Start `count` identical gets while the first is held at the stand-in, then let it answer"""
+        self.explorer.gate.clear()
+        pool = ThreadPoolExecutor(count)
+        self.addCleanup(pool.shutdown)
+        futures = [pool.submit(self.get, **params)]
+        while self.explorer.hits < 1:
+            time.sleep(0.005)
+        futures += [pool.submit(self.get, **params) for _ in range(count - 1)]
+        # Time for the others to line up behind the request on the wire
+        time.sleep(0.1)
+        self.explorer.gate.set()
+        return futures
+
+    def test_identical_requests_in_flight_are_sent_once(self):
+        futures = self.held_calls(8, marker='a')
+        responses = [future.result(5) for future in futures]
+
+        self.assertEqual((self.explorer.hits, self.api.requests_sent), (1, 1))
+        self.assertTrue(all(response is responses[0] for response in responses))
+        self.assertEqual(self.api._inflight, {})
+
+    def test_waiters_get_the_error_of_the_request_they_waited_for(self):
+        self.api.max_retries = 0
+        self.explorer.delay = 1
+        self.timeout = 0.3
+        futures = self.held_calls(4)
+
+        for future in futures:
+            with self.assertRaises(requests.exceptions.Timeout):
+                future.result(5)
+        self.assertEqual(self.explorer.hits, 1)
+        self.assertEqual(self.api._inflight, {})
+
+    def test_responses_are_reused_within_the_ttl(self):
+        first = self.get()
+        self.assertIs(self.get(), first)
+        self.assertEqual(self.explorer.hits, 1)
+
+        self.api.cache_ttl = 0
+        self.api.clear_cache()
+        self.get()
+        self.assertEqual(self.get().json()['hit'], 3)
+
+    def test_parameters_are_part_of_the_key(self):
+        self.get(marker='a', page=1)
+        self.get(page=1, marker='a')
+        self.get(marker='a', page=2)
+
+        self.assertEqual(self.explorer.hits, 2)
+
+    def test_errors_are_not_cached(self):
+        self.explorer.status = 404
+        self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(self.get().status_code, 404)
+
+        self.assertEqual(self.explorer.hits, 2)
+        self.assertEqual(len(self.api._response_cache), 0)
+
+    def test_oldest_entries_are_evicted(self):
+        self.api.cache_max_entries = 2
+        for page in (1, 2, 3):
+            self.get(page=page)
+        self.assertEqual(len(self.api._response_cache), 2)
+        self.assertEqual(self.api._cache_bytes, sum(len(response.content)
+                                                    for _, response in self.api._response_cache.values()))
+
+        # Page 1 went first, page 3 is still cached
+        self.get(page=3)
+        self.assertEqual(self.explorer.hits, 3)
+        self.get(page=1)
+        self.assertEqual(self.explorer.hits, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
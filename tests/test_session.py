@@ -0,0 +1,110 @@
+"""Session snapshots saved and opened again, columns mapped straight from the file.
+
+    python -m pytest tests
+"""
+import json
+import math
+import os
+import struct
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from analysis import FlowGraph
+from crypto_api import Cryptocurrency
+from session import ALIGN, MAGIC, load_session, save_session
+from tx_columns import COLUMNS, TransactionTable
+
+
+ADDRESS = '0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed'
+ETHEREUM = Cryptocurrency.ETHEREUM
+
+
+def table_of_three():
+    table = TransactionTable(ETHEREUM, ADDRESS)
+    table.append({'hash': '0x01', 'timestamp': datetime(2024, 5, 3, tzinfo=timezone.utc), 'type': 'received',
+                  'amount': 2.5, 'fee': 0.0}, {'0xaaa': 2.5})
+    table.append({'hash': '0x02', 'timestamp': datetime(2024, 5, 2, tzinfo=timezone.utc), 'type': 'sent',
+                  'amount': -1000.0, 'fee': 0.001, 'asset': 'USDT'}, {'0xbbb': -600.0, 'ÿñïçødé': -400.0})
+    table.append({'hash': '0x03', 'type': 'interaction', 'amount': 0.0, 'fee': 0.002})
+    table.set_usd_prices([3100.0, 3000.0, math.nan])
+    return table
+
+
+class SessionTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'case.mfsession')
+
+    def test_round_trip(self):
+        table = table_of_three()
+        graph = FlowGraph(ETHEREUM)
+        graph.add_node(ADDRESS, hop=0)
+        graph.add_transfer('0xaaa', ADDRESS, 2.5, '0x01')
+        balance = {'balance': 1.5, 'total_received': None, 'total_sent': None, 'transaction_count': 3,
+                   'raw_data': {'status': '1', 'result': '1500000000000000000'}}
+
+        size = save_session(self.path, table, balance, {'ethereum': 3200.0}, 3200.0, graph, {ADDRESS: (0.5, -1.0)})
+        self.assertEqual(size, os.path.getsize(self.path))
+        session = load_session(self.path)
+
+        loaded = session['table']
+        self.assertEqual(session['crypto'], ETHEREUM)
+        self.assertEqual(loaded.address, ADDRESS)
+        self.assertEqual(list(loaded), list(table))
+        self.assertEqual([loaded.flows(i) for i in range(3)], [table.flows(i) for i in range(3)])
+        for name in COLUMNS:
+            # Byte for byte, so the NaN prices and timestamps compare equal too
+            self.assertEqual(getattr(loaded, name).tobytes(), bytes(getattr(table, name)), name)
+        self.assertEqual(list(loaded.asset_names), ['ETH', 'USDT'])
+        self.assertEqual((session['prices'], session['price']), ({'ethereum': 3200.0}, 3200.0))
+        self.assertEqual(session['flow_graph'].to_dict(), graph.to_dict())
+        self.assertEqual(session['positions'][ADDRESS].tolist(), [0.5, -1.0])
+
+    def test_only_the_shown_balance_fields_are_saved(self):
+        balance = {'balance': 1.5, 'total_received': 9.0, 'transaction_count': None, 'raw_data': {'big': 'x' * 1000}}
+        save_session(self.path, table_of_three(), balance)
+
+        self.assertEqual(load_session(self.path)['balance_data'], {'balance': 1.5, 'transaction_count': None})
+
+    def test_columns_are_aligned_views_of_the_file(self):
+        save_session(self.path, table_of_three())
+        loaded = load_session(self.path)['table']
+
+        self.assertFalse(loaded.amounts.flags.writeable)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        length, = struct.unpack('<Q', data[len(MAGIC):len(MAGIC) + 8])
+        start = -(-(len(MAGIC) + 8 + length) // ALIGN) * ALIGN
+        for spec in json.loads(data[len(MAGIC) + 8:len(MAGIC) + 8 + length])['columns'].values():
+            self.assertEqual((start + spec['offset']) % ALIGN, 0)
+
+    def test_empty_table(self):
+        save_session(self.path, TransactionTable(ETHEREUM, ADDRESS))
+        session = load_session(self.path)
+
+        self.assertEqual(len(session['table']), 0)
+        self.assertIsNone(session['flow_graph'])
+
+    def test_not_a_session(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'{"not": "a session"}')
+        with self.assertRaises(ValueError):
+            load_session(self.path)
+
+    def test_other_versions_are_refused(self):
+        save_session(self.path, table_of_three())
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        # Same header length, other version
+        data = data.replace(b'"version": 2', b'"version": 1', 1)
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        with self.assertRaisesRegex(ValueError, 'Unsupported session version: 1'):
+            load_session(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
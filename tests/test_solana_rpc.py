@@ -0,0 +1,203 @@
+"""Solana history over batched JSON-RPC, against a local stand-in node.
+
+The node serves canned answers for getSignaturesForAddress and
+getTransaction batches, so paging with `before`, null results and error
+objects can be checked without the network.
+
+    python -m pytest tests
+"""
+import json
+import random
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from crypto_api import CRYPTO_CONFIGS, Cryptocurrency, MultiCryptoAPI
+
+
+ADDRESS = 'Me11111111111111111111111111111111111111111'
+OTHER = 'Other1111111111111111111111111111111111111'
+FEE_PAYER = 'Payer1111111111111111111111111111111111111'
+
+SOLANA = Cryptocurrency.SOLANA
+
+
+def signature_info(n):
+    """Signature n, newer ones in higher slots"""
+    return {'signature': f'sig{n}', 'slot': 1000 + n, 'blockTime': 1700000000 + n, 'err': None}
+
+
+def transaction(n):
+    """Signature n: even ones receive n * 1000 lamports from OTHER, odd ones send it, fee 5000"""
+    amount = n * 1000
+    if n % 2:
+        keys = [ADDRESS, OTHER]
+        pre, post = [10 ** 9, 0], [10 ** 9 - amount - 5000, amount]
+    else:
+        keys = [FEE_PAYER, OTHER, ADDRESS]
+        pre, post = [10 ** 9, 10 ** 9, 0], [10 ** 9 - 5000, 10 ** 9 - amount, amount]
+    return {
+        'slot': 1000 + n,
+        'blockTime': 1700000000 + n,
+        'meta': {'fee': 5000, 'preBalances': pre, 'postBalances': post, 'err': None},
+        'transaction': {'message': {'accountKeys': keys}},
+    }
+
+
+class StandInNode:
+    """JSON-RPC node over HTTP on localhost, answering from canned data.
+
+    `signatures` are newest first. getTransaction answers null for the
+    signatures in `pruned` and an error object for those in `failing`;
+    getSignaturesForAddress answers an error object while
+    `signatures_fail` is set. Every batch received is kept in `batches`.
+    """
+
+    def __init__(self, signatures):
+        self.signatures = signatures
+        self.pruned = set()
+        self.failing = set()
+        self.signatures_fail = False
+        self.batches = []
+        self.random = random.Random(7)
+
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                calls = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                node.batches.append(calls)
+                answers = [node.answer(call) for call in calls]
+                # Batch answers may come back in any order
+                node.random.shuffle(answers)
+                body = json.dumps(answers).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, call):
+        method, params = call['method'], call['params']
+        if method == 'getSignaturesForAddress':
+            if self.signatures_fail:
+                return self.error(call, -32005, 'Node is behind')
+            options = params[1]
+            start = 0
+            if 'before' in options:
+                start = [sig['signature'] for sig in self.signatures].index(options['before']) + 1
+            return self.result(call, self.signatures[start:start + options['limit']])
+        if method == 'getTransaction':
+            signature = params[0]
+            if signature in self.failing:
+                return self.error(call, -32009, 'Slot skipped')
+            if signature in self.pruned:
+                return self.result(call, None)
+            return self.result(call, transaction(int(signature[3:])))
+        return self.error(call, -32601, 'Method not found')
+
+    def result(self, call, result):
+        return {'jsonrpc': '2.0', 'id': call['id'], 'result': result}
+
+    def error(self, call, code, message):
+        return {'jsonrpc': '2.0', 'id': call['id'], 'error': {'code': code, 'message': message}}
+
+    def calls(self, method):
+        return [call for batch in self.batches for call in batch if call['method'] == method]
+
+
+class SolanaRPCTest(unittest.TestCase):
+
+    def setUp(self):
+        self.node = StandInNode([signature_info(n) for n in range(12, 0, -1)])
+        self.addCleanup(self.node.close)
+        # The stand-in node needs no rate limit
+        config = mock.patch.dict(CRYPTO_CONFIGS[SOLANA], api_base=self.node.url, page_size=5, rpc_batch=2,
+                                 rate_limit=1000.0, burst=1000)
+        config.start()
+        self.addCleanup(config.stop)
+        self.errors = []
+        self.api = MultiCryptoAPI(error_callback=self.errors.append)
+
+    def fetch(self, **kwargs):
+        walk = {}
+        transactions = [tx for batch in self.api.iter_transactions(SOLANA, ADDRESS, None, walk=walk, **kwargs)
+                        for tx in batch]
+        return transactions, walk
+
+    def test_pages_with_before(self):
+        transactions, walk = self.fetch()
+
+        self.assertEqual([tx['hash'] for tx in transactions], [f'sig{n}' for n in range(12, 0, -1)])
+        self.assertTrue(walk['complete'])
+        self.assertEqual(self.errors, [])
+        pages = self.node.calls('getSignaturesForAddress')
+        self.assertEqual([page['params'][1].get('before') for page in pages], [None, 'sig8', 'sig3'])
+        # 3 signature pages, then 5 + 5 + 2 transactions at 2 getTransaction calls per request
+        self.assertEqual(len(self.node.batches), 3 + 3 + 3 + 1)
+        self.assertTrue(all(len(batch) <= 2 for batch in self.node.batches))
+
+    def test_amounts_and_counterparties(self):
+        transactions, _ = self.fetch()
+        by_hash = {tx['hash']: tx for tx in transactions}
+
+        received, sent = by_hash['sig4'], by_hash['sig5']
+        self.assertEqual((received['type'], received['units'], received['fee_units']), ('received', 4000, 0))
+        self.assertEqual(received['flows'], {OTHER: 4000})
+        self.assertEqual((sent['type'], sent['units'], sent['fee_units']), ('sent', -5000, 5000))
+        self.assertEqual(sent['flows'], {OTHER: -5000})
+        self.assertEqual(self.api.counterparties(SOLANA, sent, ADDRESS), {OTHER: -5e-06})
+
+    def test_null_and_error_results_keep_their_signature(self):
+        self.node.pruned = {'sig7'}
+        self.node.failing = {'sig2'}
+        transactions, walk = self.fetch()
+
+        self.assertEqual(len(transactions), 12)
+        self.assertTrue(walk['complete'])
+        by_hash = {tx['hash']: tx for tx in transactions}
+        for signature in ('sig7', 'sig2'):
+            tx = by_hash[signature]
+            self.assertEqual((tx['type'], tx['units'], tx['flows']), ('interaction', 0, {}))
+            self.assertEqual(tx['confirmations'], signature_info(int(signature[3:]))['slot'])
+        self.assertEqual(by_hash['sig6']['units'], 6000)
+
+    def test_signature_error_ends_the_walk(self):
+        self.node.signatures_fail = True
+        transactions, walk = self.fetch()
+
+        self.assertEqual(transactions, [])
+        self.assertFalse(walk['complete'])
+        self.assertEqual(self.errors, ["Failed to fetch Solana signatures from the RPC node"])
+        self.assertEqual(self.node.calls('getTransaction'), [])
+
+    def test_since_stops_at_the_slot(self):
+        transactions, walk = self.fetch(since=1009)
+
+        self.assertEqual([tx['hash'] for tx in transactions], ['sig12', 'sig11', 'sig10', 'sig9'])
+        self.assertTrue(walk['complete'])
+        self.assertEqual(len(self.node.calls('getSignaturesForAddress')), 1)
+
+    def test_balance(self):
+        with mock.patch.object(StandInNode, 'answer',
+                               lambda node, call: node.result(call, {'context': {'slot': 1}, 'value': 2500000000})):
+            balance = self.api.fetch_balance(SOLANA, ADDRESS)
+
+        self.assertEqual(balance['balance'], 2.5)
+        self.assertEqual(self.node.batches[0][0]['method'], 'getBalance')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""TransactionCache: raw JSON storage and the cursor of incremental refreshes.
+
+Refreshes run against the stand-in Solana node of test_solana_rpc, whose
+slots make the cursor.
+
+    python -m pytest tests
+"""
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from crypto_api import CRYPTO_CONFIGS, Cryptocurrency, MultiCryptoAPI
+from test_solana_rpc import ADDRESS, StandInNode, signature_info
+from tx_cache import TransactionCache
+
+
+SOLANA = Cryptocurrency.SOLANA
+
+
+class StoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = TransactionCache(':memory:')
+        self.addCleanup(self.cache.close)
+
+    def tx(self, tx_hash, day, entry=None):
+        parsed = {'hash': tx_hash, 'timestamp': datetime(2024, 1, day, tzinfo=timezone.utc),
+                  'raw_data': {'hash': tx_hash, 'day': day}}
+        if entry:
+            parsed['entry'] = entry
+        return parsed
+
+    def test_raw_json_newest_first(self):
+        self.cache.store(SOLANA, ADDRESS, [self.tx('a', 1), self.tx('c', 3), self.tx('b', 2)])
+
+        raw = self.cache.raw_transactions(SOLANA, ADDRESS)
+        self.assertEqual([json.loads(text)['hash'] for text in raw], ['c', 'b', 'a'])
+        self.assertEqual(len(self.cache.raw_transactions(SOLANA, ADDRESS, 2)), 2)
+
+    def test_stored_again_replaces(self):
+        self.cache.store(SOLANA, ADDRESS, [self.tx('a', 1)])
+        self.cache.store(SOLANA, ADDRESS, [self.tx('a', 1)])
+        self.assertEqual(len(self.cache.raw_transactions(SOLANA, ADDRESS)), 1)
+
+    def test_transfers_of_one_transaction_are_kept_apart(self):
+        transfers = [self.tx('a', 1), self.tx('a', 1, 'tokentx:3'), self.tx('a', 1, 'tokentx:4')]
+        self.cache.store(SOLANA, ADDRESS, transfers)
+        self.assertEqual(len(self.cache.raw_transactions(SOLANA, ADDRESS)), 3)
+
+    def test_only_the_raw_json_and_its_time_are_kept(self):
+        columns = [row[1] for row in self.cache.conn.execute("PRAGMA table_info(transactions)")]
+        self.assertEqual(columns, ['crypto', 'address', 'hash', 'timestamp', 'raw'])
+
+    def test_cursor_never_goes_back(self):
+        self.assertIsNone(self.cache.get_cursor(SOLANA, ADDRESS))
+        self.assertFalse(self.cache.is_cached(SOLANA, ADDRESS))
+        self.cache.store(SOLANA, ADDRESS, [], 100)
+        self.cache.store(SOLANA, ADDRESS, [], 90)
+        self.cache.store(SOLANA, ADDRESS, [self.tx('a', 1)])
+
+        self.assertTrue(self.cache.is_cached(SOLANA, ADDRESS))
+        self.assertEqual(self.cache.get_cursor(SOLANA, ADDRESS), 100)
+
+    def test_clear(self):
+        self.cache.store(SOLANA, ADDRESS, [self.tx('a', 1)], 5)
+        self.cache.clear(SOLANA, ADDRESS)
+
+        self.assertFalse(self.cache.is_cached(SOLANA, ADDRESS))
+        self.assertEqual(self.cache.raw_transactions(SOLANA, ADDRESS), [])
+
+
+class FetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.node = StandInNode([signature_info(n) for n in range(12, 0, -1)])
+        self.addCleanup(self.node.close)
+        config = mock.patch.dict(CRYPTO_CONFIGS[SOLANA], api_base=self.node.url, page_size=5, rpc_batch=5,
+                                 rate_limit=1000.0, burst=1000)
+        config.start()
+        self.addCleanup(config.stop)
+        self.errors = []
+        self.api = MultiCryptoAPI(error_callback=self.errors.append)
+        # No response served from the short-lived cache of an earlier walk
+        self.api.cache_ttl = 0
+        self.cache = TransactionCache(':memory:')
+        self.addCleanup(self.cache.close)
+
+    def fetch(self, limit=500):
+        return [tx['hash'] for batch in self.cache.fetch(self.api, SOLANA, ADDRESS, limit) for tx in batch]
+
+    def add_signatures(self, *numbers):
+        self.node.signatures[:0] = [signature_info(n) for n in sorted(numbers, reverse=True)]
+
+    def test_complete_walk_sets_the_cursor(self):
+        self.assertEqual(len(self.fetch()), 12)
+        self.assertEqual(self.cache.get_cursor(SOLANA, ADDRESS), 1012)
+        self.assertEqual(len(self.cache.raw_transactions(SOLANA, ADDRESS)), 12)
+
+    def test_refresh_fetches_only_what_is_newer(self):
+        self.fetch()
+        self.add_signatures(13, 14)
+
+        # The cursor's own slot is walked again, it may hold more than was seen
+        self.assertEqual(self.fetch(), ['sig14', 'sig13', 'sig12'])
+        self.assertEqual(self.cache.get_cursor(SOLANA, ADDRESS), 1014)
+        self.assertEqual(len(self.cache.raw_transactions(SOLANA, ADDRESS)), 14)
+
+    def test_refresh_ignores_the_limit(self):
+        self.fetch()
+        self.add_signatures(*range(13, 21))
+
+        self.assertEqual(len(self.fetch(limit=3)), 9)
+        self.assertEqual(self.cache.get_cursor(SOLANA, ADDRESS), 1020)
+
+    def test_failed_refresh_keeps_the_cursor(self):
+        self.fetch()
+        self.add_signatures(13)
+        self.node.signatures_fail = True
+
+        self.assertEqual(self.fetch(), [])
+        self.assertEqual(self.cache.get_cursor(SOLANA, ADDRESS), 1012)
+        self.node.signatures_fail = False
+        self.assertEqual(self.fetch(), ['sig13', 'sig12'])
+        self.assertEqual(self.cache.get_cursor(SOLANA, ADDRESS), 1013)
+
+    def test_walk_cut_short_sets_no_cursor(self):
+        answer = StandInNode.answer
+
+        def fail_past_first_page(node, call):
+            if call['method'] == 'getSignaturesForAddress' and 'before' in call['params'][1]:
+                return node.error(call, -32005, 'Node is behind')
+            return answer(node, call)
+
+        with mock.patch.object(StandInNode, 'answer', fail_past_first_page):
+            self.assertEqual(len(self.fetch()), 5)
+        # Cached, but with no cursor: the next analysis walks the history again
+        self.assertTrue(self.cache.is_cached(SOLANA, ADDRESS))
+        self.assertIsNone(self.cache.get_cursor(SOLANA, ADDRESS))
+
+        self.assertEqual(len(self.fetch()), 12)
+        self.assertEqual(self.cache.get_cursor(SOLANA, ADDRESS), 1012)
+
+    def test_caller_stopping_sets_no_cursor(self):
+        batches = self.cache.fetch(self.api, SOLANA, ADDRESS, 500)
+        next(batches)
+        batches.close()
+        self.assertIsNone(self.cache.get_cursor(SOLANA, ADDRESS))
+
+    def test_nothing_found_leaves_the_address_uncached(self):
+        self.node.signatures = []
+        self.assertEqual(self.fetch(), [])
+        self.assertFalse(self.cache.is_cached(SOLANA, ADDRESS))
+
+
+if __name__ == '__main__':
+    unittest.main()
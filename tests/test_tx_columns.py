@@ -0,0 +1,139 @@
+"""TransactionTable: rows into typed columns and back, prices and assets.
+
+    python -m pytest tests
+"""
+import math
+import unittest
+from datetime import datetime, timezone
+
+from crypto_api import Cryptocurrency
+from tx_columns import MAX_UNITS, TYPE_CODES, TransactionTable
+
+
+ADDRESS = '0xde709f2102306220921060314715629080e2fb77'
+ETHEREUM = Cryptocurrency.ETHEREUM
+BITCOIN = Cryptocurrency.BITCOIN
+
+
+def when(seconds):
+    return datetime.fromtimestamp(1700000000 + seconds, tz=timezone.utc)
+
+
+def tx(n, seconds, amount, tx_type='received', fee=0.0, asset=None):
+    parsed = {'hash': f'0x{n:064x}', 'timestamp': when(seconds), 'amount': amount, 'type': tx_type, 'fee': fee}
+    if asset:
+        parsed['asset'] = asset
+    return parsed
+
+
+class AppendTest(unittest.TestCase):
+
+    def test_row_round_trip(self):
+        table = TransactionTable(ETHEREUM, ADDRESS)
+        table.append(tx(1, 0, -1.5, 'sent', fee=0.000021), {'0xabc': -1.0, '0xdef': -0.5})
+
+        row = table.row(0)
+        self.assertEqual(row['hash'], f'0x{1:064x}')
+        self.assertEqual(row['timestamp'], when(0).astimezone().replace(tzinfo=None))
+        self.assertEqual((row['amount'], row['fee'], row['type']), (-1.5, 0.000021, 'sent'))
+        # The largest flow is the main counterparty
+        self.assertEqual(row['counterparty'], '0xabc')
+        self.assertEqual((row['usd_price'], row['asset']), (None, None))
+        self.assertEqual(table.flows(0), {'0xabc': -1.0, '0xdef': -0.5})
+
+    def test_wei_are_stored_as_gwei(self):
+        table = TransactionTable(ETHEREUM, ADDRESS)
+        table.append(tx(1, 0, 12.345678912))
+
+        self.assertEqual(table.scale, 10 ** 9)
+        self.assertFalse(table.exact_units)
+        self.assertEqual(table.amounts[0], 12345678912)
+
+    def test_base_units_are_kept_exact(self):
+        table = TransactionTable(BITCOIN, ADDRESS)
+        table.append({'hash': 'h', 'timestamp': when(0), 'type': 'received', 'amount': 0.1,
+                      'units': 10000001, 'fee_units': 7})
+
+        self.assertEqual((table.amounts[0], table.fees[0]), (10000001, 7))
+
+    def test_huge_token_amounts_are_clamped(self):
+        table = TransactionTable(ETHEREUM, ADDRESS)
+        table.append(tx(1, 0, 10.0 ** 30, asset='SHIB'))
+        table.append(tx(2, 0, -10.0 ** 30, 'sent', asset='SHIB'))
+
+        self.assertEqual(list(table.amounts), [MAX_UNITS, -MAX_UNITS])
+
+    def test_assets_are_interned(self):
+        table = TransactionTable(ETHEREUM, ADDRESS)
+        table.extend([tx(1, 2, 5.0, asset='USDT'), tx(2, 1, 1.0), tx(3, 0, 7.0, asset='USDT')])
+
+        self.assertEqual(table.asset_names, ['ETH', 'USDT'])
+        self.assertEqual(list(table.assets), [1, 0, 1])
+        self.assertEqual([row['asset'] for row in table], ['USDT', None, 'USDT'])
+
+    def test_missing_fields(self):
+        table = TransactionTable(ETHEREUM, ADDRESS)
+        table.append({'type': 'Contract Call'})
+
+        row = table.row(0)
+        self.assertEqual((row['hash'], row['timestamp'], row['type'], row['counterparty']),
+                         ('Unknown', None, 'unknown', None))
+        self.assertEqual(table.types[0], TYPE_CODES['unknown'])
+        self.assertEqual(table.time_range(), (None, None))
+
+
+class MergeTest(unittest.TestCase):
+
+    def chunk(self, *rows):
+        table = TransactionTable(ETHEREUM, ADDRESS)
+        for parsed, flows in rows:
+            table.append(parsed, flows)
+        return table
+
+    def test_newest_first_across_chunks(self):
+        first = self.chunk((tx(1, 30, 1.0), {'0xa': 1.0}), (tx(2, 10, 2.0, asset='USDT'), {'0xb': 2.0}))
+        second = self.chunk((tx(3, 20, -3.0, 'sent'), {'0xb': -3.0}), (tx(4, 40, 4.0, asset='LINK'), {'0xc': 4.0}))
+        merged = TransactionTable.merge(ETHEREUM, ADDRESS, [first, second])
+
+        self.assertEqual([row['hash'][-1] for row in merged], ['4', '1', '3', '2'])
+        self.assertEqual([row['amount'] for row in merged], [4.0, 1.0, -3.0, 2.0])
+        # Parties and assets are interned again in the merged table
+        self.assertEqual([row['asset'] for row in merged], ['LINK', None, None, 'USDT'])
+        self.assertEqual(merged.asset_names, ['ETH', 'LINK', 'USDT'])
+        self.assertEqual(merged.parties, ['0xc', '0xa', '0xb'])
+        self.assertEqual([merged.flows(i) for i in range(4)], [{'0xc': 4.0}, {'0xa': 1.0}, {'0xb': -3.0},
+                                                                {'0xb': 2.0}])
+
+    def test_ties_keep_chunk_order_and_unknown_times_go_last(self):
+        first = self.chunk((tx(1, 10, 1.0), None), ({'hash': 'undated', 'type': 'received', 'amount': 1.0}, None))
+        second = self.chunk((tx(2, 10, 2.0), None), (tx(3, 20, 3.0), None))
+        merged = TransactionTable.merge(ETHEREUM, ADDRESS, [first, second])
+
+        self.assertEqual([row['hash'][-1] for row in merged], ['3', '1', '2', 'd'])
+
+    def test_prices_come_along(self):
+        chunk = self.chunk((tx(1, 0, 1.0), None), (tx(2, 5, 1.0), None))
+        chunk.set_usd_prices([100.0, 200.0])
+        merged = TransactionTable.merge(ETHEREUM, ADDRESS, [chunk])
+
+        self.assertEqual([row['usd_price'] for row in merged], [200.0, 100.0])
+
+
+class USDPricesTest(unittest.TestCase):
+
+    def test_token_rows_stay_unpriced(self):
+        table = TransactionTable(ETHEREUM, ADDRESS)
+        table.extend([tx(1, 2, 1.0), tx(2, 1, 5.0, asset='USDT'), tx(3, 0, 2.0)])
+        table.set_usd_prices([3000.0, 3000.0, math.nan])
+
+        self.assertEqual([row['usd_price'] for row in table], [3000.0, None, None])
+
+    def test_one_price_per_row(self):
+        table = TransactionTable(ETHEREUM, ADDRESS)
+        table.extend([tx(1, 0, 1.0)])
+        with self.assertRaises(ValueError):
+            table.set_usd_prices([1.0, 2.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""XRP ledger amounts: drops, issued currencies (IOUs) and delivered_amount.
+
+    python -m pytest tests
+"""
+import unittest
+from datetime import datetime, timezone
+
+from crypto_api import CRYPTO_CONFIGS, Cryptocurrency, MultiCryptoAPI, xrp_amount, xrp_currency, xrp_flows
+from tx_columns import TransactionTable
+
+
+ADDRESS = 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh'
+OTHER = 'rf1BiGeXwwQoi8Z2ueFYTEXSwuJYfV2Jpn'
+ISSUER = 'rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B'
+
+XRP = Cryptocurrency.XRP
+
+
+def payment(account, destination, amount, delivered=None, result='tesSUCCESS', **fields):
+    tx = {
+        'TransactionType': 'Payment',
+        'Account': account,
+        'Destination': destination,
+        'Amount': amount,
+        'Fee': '12',
+        'hash': 'A' * 64,
+        'meta': {'TransactionResult': result},
+    }
+    if delivered is not None:
+        tx['meta']['delivered_amount'] = delivered
+    tx.update(fields)
+    return tx
+
+
+def usd(value):
+    return {'currency': 'USD', 'issuer': ISSUER, 'value': value}
+
+
+class XRPAmountTest(unittest.TestCase):
+
+    def test_drops(self):
+        self.assertEqual(xrp_amount('25000000'), (25000000, None))
+        self.assertEqual(xrp_amount(None), (0, None))
+
+    def test_xrp_written_as_an_object(self):
+        self.assertEqual(xrp_amount({'currency': 'XRP', 'value': '1.5'}), (1500000, None))
+
+    def test_issued_currency(self):
+        self.assertEqual(xrp_amount(usd('1e-3')), (None, usd('1e-3')))
+
+    def test_currency_codes(self):
+        self.assertEqual(xrp_currency('USD'), 'USD')
+        self.assertEqual(xrp_currency('534F4C4F00000000000000000000000000000000'), 'SOLO')
+        # Not ASCII: kept as the hex code
+        code = '80' + '00' * 19
+        self.assertEqual(xrp_currency(code), code)
+
+
+class XRPFlowsTest(unittest.TestCase):
+
+    def test_sent_xrp(self):
+        flows = xrp_flows(payment(ADDRESS, OTHER, '1000000', delivered='1000000'), ADDRESS)
+        self.assertEqual(flows, {'type': 'sent', 'amount': -1000000, 'fee': 12, 'parties': {OTHER: -1000000},
+                                 'asset': None})
+
+    def test_received_xrp_pays_no_fee(self):
+        flows = xrp_flows(payment(OTHER, ADDRESS, '1000000', delivered='1000000'), ADDRESS)
+        self.assertEqual((flows['type'], flows['amount'], flows['fee']), ('received', 1000000, 0))
+        self.assertEqual(flows['parties'], {OTHER: 1000000})
+
+    def test_partial_payment_counts_what_was_delivered(self):
+        flows = xrp_flows(payment(OTHER, ADDRESS, '100000000000', delivered='2500', Flags=0x00020000), ADDRESS)
+        self.assertEqual(flows['amount'], 2500)
+
+    def test_capitalized_delivered_amount(self):
+        tx = payment(OTHER, ADDRESS, '5000')
+        tx['meta']['DeliveredAmount'] = '4000'
+        self.assertEqual(xrp_flows(tx, ADDRESS)['amount'], 4000)
+
+    def test_old_ledgers_fall_back_to_amount(self):
+        flows = xrp_flows(payment(OTHER, ADDRESS, '7000', delivered='unavailable'), ADDRESS)
+        self.assertEqual(flows['amount'], 7000)
+
+    def test_issued_currency_in_millionths(self):
+        flows = xrp_flows(payment(OTHER, ADDRESS, usd('100'), delivered=usd('12.3456789')), ADDRESS)
+
+        self.assertEqual(flows['asset'], 'USD')
+        self.assertEqual(flows['amount'], 12345679)
+        self.assertEqual(flows['parties'], {OTHER: 12345679})
+
+    def test_issued_currency_in_exponent_form(self):
+        flows = xrp_flows(payment(ADDRESS, OTHER, usd('1e-3'), delivered=usd('1e-3')), ADDRESS)
+        self.assertEqual((flows['type'], flows['amount'], flows['asset']), ('sent', -1000, 'USD'))
+
+    def test_hex_currency_code(self):
+        code = '534F4C4F00000000000000000000000000000000'
+        delivered = {'currency': code, 'issuer': ISSUER, 'value': '3'}
+        flows = xrp_flows(payment(OTHER, ADDRESS, delivered, delivered=delivered), ADDRESS)
+        self.assertEqual((flows['asset'], flows['amount']), ('SOLO', 3000000))
+
+    def test_failed_payment_is_an_interaction_that_still_pays_its_fee(self):
+        flows = xrp_flows(payment(ADDRESS, OTHER, '1000', delivered='1000', result='tecUNFUNDED_PAYMENT'), ADDRESS)
+        self.assertEqual((flows['type'], flows['amount'], flows['fee'], flows['parties']),
+                         ('interaction', 0, 12, {}))
+
+    def test_other_transaction_types(self):
+        tx = payment(ADDRESS, None, None, TransactionType='TrustSet')
+        self.assertEqual(xrp_flows(tx, ADDRESS)['type'], 'interaction')
+
+
+class ParseXRPTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = MultiCryptoAPI()
+        self.config = CRYPTO_CONFIGS[XRP]
+
+    def test_iso_date_with_z(self):
+        tx = payment(OTHER, ADDRESS, '1000000', delivered='1000000', date='2024-03-01T12:00:00Z')
+        parsed = self.api._parse_xrp_tx(tx, ADDRESS, self.config)
+        self.assertEqual(parsed['timestamp'], datetime(2024, 3, 1, 12, tzinfo=timezone.utc))
+        self.assertEqual((parsed['amount'], parsed['units']), (1.0, 1000000))
+        self.assertNotIn('asset', parsed)
+
+    def test_ripple_epoch_seconds(self):
+        tx = payment(OTHER, ADDRESS, '1', delivered='1', date=1)
+        parsed = self.api._parse_xrp_tx(tx, ADDRESS, self.config)
+        self.assertEqual(parsed['timestamp'], datetime(2000, 1, 1, 0, 0, 1, tzinfo=timezone.utc))
+
+    def test_iou_goes_to_the_asset_column(self):
+        transactions = [
+            self.api._parse_xrp_tx(payment(OTHER, ADDRESS, usd('2'), delivered=usd('2'), date=20), ADDRESS,
+                                   self.config),
+            self.api._parse_xrp_tx(payment(OTHER, ADDRESS, '3000000', delivered='3000000', date=10), ADDRESS,
+                                   self.config),
+        ]
+        table = TransactionTable(XRP, ADDRESS)
+        table.extend(transactions, lambda tx: self.api.counterparties(XRP, tx, ADDRESS))
+
+        self.assertEqual([table.row(i)['asset'] for i in range(2)], ['USD', None])
+        self.assertEqual(list(table.amounts), [2000000, 3000000])
+        self.assertEqual(table.asset_names[table.assets[0]], 'USD')
+
+
+if __name__ == '__main__':
+    unittest.main()
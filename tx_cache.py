@@ -0,0 +1,148 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".moneyflow", "transactions.db")
+
+
+class TransactionCache:
+    """On-disk store of fetched transactions, keyed by (crypto, address, hash).
+
+    Token and internal transfers share their transaction's hash; their
+    'entry' (which transfer of it they are) is kept in the key after a '#'.
+    Only the provider JSON is kept, with the time it is ordered by: cached
+    histories are read back with raw_transactions and parsed again, so
+    every field the parsers add comes back with it.
+
+    Also remembers the newest block / ledger index seen per address so a
+    re-analysis only has to ask the provider for the delta since then.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(transactions)")]
+        if 'amount' in columns:
+            # Caches written before only the raw JSON was kept are fetched again from scratch
+            self.conn.executescript("DROP TABLE transactions; DROP TABLE IF EXISTS addresses;")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                crypto TEXT NOT NULL,
+                address TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                raw TEXT NOT NULL,
+                PRIMARY KEY (crypto, address, hash)
+            );
+            CREATE INDEX IF NOT EXISTS transactions_by_time
+                ON transactions (crypto, address, timestamp);
+            CREATE TABLE IF NOT EXISTS addresses (
+                crypto TEXT NOT NULL,
+                address TEXT NOT NULL,
+                cursor INTEGER,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (crypto, address)
+            );
+        """)
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def get_cursor(self, crypto, address):
+        """Newest block / ledger index stored for the address, None if never cached"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT cursor FROM addresses WHERE crypto = ? AND address = ?",
+                (crypto.value, address)).fetchone()
+        return row[0] if row else None
+
+    def is_cached(self, crypto, address):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM addresses WHERE crypto = ? AND address = ?",
+                (crypto.value, address)).fetchone()
+        return row is not None
+
+    def store(self, crypto, address, transactions, cursor=None):
+        """Merge the raw JSON of parsed transactions into the cache and advance the address cursor"""
+        rows = []
+        for tx in transactions:
+            timestamp = tx.get('timestamp')
+            epoch = timestamp.timestamp() if isinstance(timestamp, datetime) else 0
+            key = tx.get('hash', '')
+            if tx.get('entry'):
+                key += '#' + tx['entry']
+            rows.append((
+                crypto.value,
+                address,
+                key,
+                epoch,
+                json.dumps(tx.get('raw_data'), default=str),
+            ))
+        
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?)", rows)
+            # MAX() keeps the stored cursor when the new one is older or unknown
+            self.conn.execute("""
+                INSERT INTO addresses (crypto, address, cursor, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (crypto, address) DO UPDATE SET
+                    cursor = COALESCE(MAX(cursor, excluded.cursor), cursor, excluded.cursor),
+                    updated_at = excluded.updated_at
+            """, (crypto.value, address, cursor, time.time()))
+            self.conn.commit()
+
+    def fetch(self, api, crypto, address, limit):
+        """Walk the address's history into the cache through `api`, yielding each page.
+
+        An address with a cursor only gets what is newer than it, all of
+        it: a limit would leave a gap under the new transactions that no
+        later refresh fills. Otherwise the newest `limit` are walked. The
+        cursor only moves once the walk is complete (see iter_transactions);
+        a walk cut short by an error or by the caller is fetched again next
+        time, and a first one that found nothing leaves the address uncached.
+        """
+        cached = self.is_cached(crypto, address)
+        cursor = self.get_cursor(crypto, address) if cached else None
+        newest = cursor
+        walk = {}
+        fetched = 0
+        for batch in api.iter_transactions(crypto, address, None if cursor is not None else limit,
+                                           since=cursor, walk=walk):
+            newest = api.newest_cursor(crypto, batch, newest)
+            fetched += len(batch)
+            self.store(crypto, address, batch)
+            yield batch
+        if walk['complete'] and (cached or fetched):
+            self.store(crypto, address, [], newest)
+
+    def raw_transactions(self, crypto, address, limit=None):
+        """The provider JSON text of cached transactions, newest first, for re-parsing"""
+        query = ("SELECT raw FROM transactions WHERE crypto = ? AND address = ? "
+                 "ORDER BY timestamp DESC")
+        params = [crypto.value, address]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [raw for raw, in rows if raw]
+
+    def clear(self, crypto, address):
+        with self.lock:
+            self.conn.execute("DELETE FROM transactions WHERE crypto = ? AND address = ?",
+                              (crypto.value, address))
+            self.conn.execute("DELETE FROM addresses WHERE crypto = ? AND address = ?",
+                              (crypto.value, address))
+            self.conn.commit()
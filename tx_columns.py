@@ -0,0 +1,287 @@
+"""Compact columnar storage for the parsed transactions of one address.
+
+A parsed transaction is a dict holding the provider's JSON in 'raw_data',
+easily several kilobytes each. TransactionTable keeps only what the GUI
+shows and analyzes, one typed array per field, and drops the JSON once
+the counterparties have been taken out of it; the raw transactions stay
+on disk in the TransactionCache.
+"""
+import heapq
+import math
+from array import array
+from datetime import datetime
+from operator import itemgetter
+
+from crypto_api import CRYPTO_CONFIGS
+
+
+TYPE_NAMES = ['received', 'sent', 'interaction', 'unknown']
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+# A signed 64-bit integer only holds about 9.2 ETH in wei, so amounts are
+# never stored finer than 1e-9 of a coin (gwei, lamports)
+MAX_UNIT_DECIMALS = 9
+
+# Token amounts beyond about 9.2 billion tokens are stored at this bound
+MAX_UNITS = 2 ** 63 - 1
+
+
+def clamp_units(units):
+    return max(-MAX_UNITS, min(MAX_UNITS, units))
+
+# Numeric columns of a TransactionTable and their little-endian dtypes
+COLUMNS = {
+    'timestamps': '<f8',
+    'usd_prices': '<f8',
+    'amounts': '<i8',
+    'fees': '<i8',
+    'types': 'i1',
+    'assets': '<i4',
+    'party': '<i8',
+    'flow_start': '<i8',
+    'flow_party': '<i8',
+    'flow_amount': '<i8',
+}
+
+
+class PackedStrings:
+    """Read-only sequence of strings kept as one UTF-8 blob plus end offsets.
+
+    `blob` and `offsets` can be views into a memory-mapped file; a string
+    is only decoded when it is asked for.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @staticmethod
+    def pack(strings):
+        """(blob, offsets) of a list of strings, offsets[i]:offsets[i + 1] being the i-th"""
+        encoded = [s.encode() for s in strings]
+        offsets = array('q', [0])
+        end = 0
+        for item in encoded:
+            end += len(item)
+            offsets.append(end)
+        return b''.join(encoded), offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode()
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class TransactionTable:
+    """Transactions of one address as typed array columns.
+
+    Per transaction: hash, epoch timestamp (NaN when unknown), signed
+    amount and fee in integer base units, type code, the id of the main
+    counterparty (-1 when none) and the USD price of the coin at the time
+    of the transaction (NaN until set_usd_prices is given one). Every counterparty with its signed
+    amount is kept as well, flow_start[i]:flow_start[i + 1] indexing into
+    flow_party/flow_amount, so the flow graph needs no provider JSON.
+    Addresses are interned: ids index into `parties`.
+
+    Token transfers (ERC-20, XRP issued currencies) share the table with
+    the coin's own transactions: the asset column indexes into
+    `asset_names`, 0 being the coin itself, and their amounts are in
+    tokens at the same scale. Fees are always in the coin.
+
+    Indexing or iterating yields the usual parsed-transaction dicts,
+    built on the fly, so it can stand in for a list of them. Tables made
+    by from_columns (saved sessions) are read-only.
+    """
+
+    def __init__(self, crypto, address):
+        self.crypto = crypto
+        self.address = address
+        self.symbol = CRYPTO_CONFIGS[crypto]['symbol']
+        self.decimals = min(CRYPTO_CONFIGS[crypto]['decimals'], MAX_UNIT_DECIMALS)
+        self.scale = 10 ** self.decimals
+        # Parsers that work in base units ('units', 'fee_units') are stored as they are
+        self.exact_units = self.decimals == CRYPTO_CONFIGS[crypto]['decimals']
+
+        self.hashes = []
+        self.timestamps = array('d')
+        self.usd_prices = array('d')
+        self.amounts = array('q')
+        self.fees = array('q')
+        self.types = array('b')
+        self.assets = array('i')
+        self.party = array('q')
+        self.flow_start = array('q', [0])
+        self.flow_party = array('q')
+        self.flow_amount = array('q')
+        self.parties = []
+        self._party_ids = {}
+        self.asset_names = [self.symbol]
+        self._asset_ids = {}
+
+    @classmethod
+    def from_columns(cls, crypto, address, columns, hashes, parties, asset_names=None):
+        """Table over existing columns, e.g. NumPy views of a memory-mapped snapshot"""
+        table = cls(crypto, address)
+        for name in COLUMNS:
+            setattr(table, name, columns[name])
+        table.hashes = hashes
+        table.parties = parties
+        if asset_names is not None:
+            table.asset_names = asset_names
+        return table
+
+    @classmethod
+    def merge(cls, crypto, address, chunks):
+        """One table of the rows of several, newest first.
+
+        Rows without a timestamp go last; rows with the same timestamp keep
+        the order of the chunks they came from.
+        """
+        table = cls(crypto, address)
+        for _, chunk, index in heapq.merge(*(chunk._newest_first() for chunk in chunks), key=itemgetter(0)):
+            table.append_row(chunk, index)
+        return table
+
+    def _newest_first(self):
+        """(sort key, self, index) of every row, newest first"""
+        keys = [math.inf if math.isnan(timestamp) else -timestamp for timestamp in self.timestamps]
+        for index in sorted(range(len(keys)), key=keys.__getitem__):
+            yield keys[index], self, index
+
+    def columns(self):
+        """The numeric columns by name, see COLUMNS"""
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __getitem__(self, index):
+        return self.row(index)
+
+    def __iter__(self):
+        for index in range(len(self.hashes)):
+            yield self.row(index)
+
+    def to_units(self, value):
+        return clamp_units(round((value or 0) * self.scale))
+
+    def party_id(self, address):
+        party = self._party_ids.get(address)
+        if party is None:
+            party = self._party_ids[address] = len(self.parties)
+            self.parties.append(address)
+        return party
+
+    def asset_id(self, asset):
+        """Id of a token symbol in asset_names, 0 for the coin itself (asset None)"""
+        if not asset:
+            return 0
+        asset_id = self._asset_ids.get(asset)
+        if asset_id is None:
+            asset_id = self._asset_ids[asset] = len(self.asset_names)
+            self.asset_names.append(asset)
+        return asset_id
+
+    def append(self, tx, counterparties=None):
+        """Add one parsed transaction; `counterparties` is its {party: signed amount}"""
+        timestamp = tx.get('timestamp')
+        self.hashes.append(tx.get('hash', 'Unknown'))
+        self.timestamps.append(timestamp.timestamp() if isinstance(timestamp, datetime) else math.nan)
+        self.usd_prices.append(math.nan)
+        if self.exact_units and tx.get('units') is not None:
+            self.amounts.append(clamp_units(tx['units']))
+            self.fees.append(tx.get('fee_units') or 0)
+        else:
+            self.amounts.append(self.to_units(tx.get('amount')))
+            self.fees.append(self.to_units(tx.get('fee')))
+        self.types.append(TYPE_CODES.get(str(tx.get('type', 'unknown')).lower(), TYPE_CODES['unknown']))
+        self.assets.append(self.asset_id(tx.get('asset')))
+
+        main, largest = -1, -1
+        for address, amount in (counterparties or {}).items():
+            party = self.party_id(address)
+            units = self.to_units(amount)
+            self.flow_party.append(party)
+            self.flow_amount.append(units)
+            if abs(units) > largest:
+                main, largest = party, abs(units)
+        self.party.append(main)
+        self.flow_start.append(len(self.flow_party))
+
+    def append_row(self, other, index):
+        """Copy one row of another table of the same address"""
+        self.hashes.append(other.hashes[index])
+        self.timestamps.append(other.timestamps[index])
+        self.usd_prices.append(other.usd_prices[index])
+        self.amounts.append(other.amounts[index])
+        self.fees.append(other.fees[index])
+        self.types.append(other.types[index])
+        asset = other.assets[index]
+        self.assets.append(self.asset_id(other.asset_names[asset]) if asset else 0)
+        party = other.party[index]
+        self.party.append(self.party_id(other.parties[party]) if party >= 0 else -1)
+        for i in range(other.flow_start[index], other.flow_start[index + 1]):
+            self.flow_party.append(self.party_id(other.parties[other.flow_party[i]]))
+            self.flow_amount.append(other.flow_amount[i])
+        self.flow_start.append(len(self.flow_party))
+
+    def extend(self, transactions, counterparties=None):
+        """Add parsed transactions, `counterparties(tx)` giving each one's {party: signed amount}"""
+        for tx in transactions:
+            self.append(tx, counterparties(tx) if counterparties else None)
+
+    def set_usd_prices(self, prices):
+        """Replace the USD price column, one price (NaN if unknown) per transaction.
+
+        The prices are the coin's; token transfers keep NaN.
+        """
+        if len(prices) != len(self):
+            raise ValueError(f"{len(prices)} prices for {len(self)} transactions")
+        import numpy as np
+
+        prices = np.where(np.asarray(self.assets) == 0, np.asarray(prices, dtype=np.float64), np.nan)
+        self.usd_prices = array('d', prices.tobytes())
+
+    def row(self, index):
+        """One transaction as a parsed-transaction dict, without 'raw_data'"""
+        timestamp = self.timestamps[index]
+        usd_price = self.usd_prices[index]
+        party = self.party[index]
+        asset = self.assets[index]
+        return {
+            'index': index,
+            'hash': self.hashes[index],
+            'timestamp': None if math.isnan(timestamp) else datetime.fromtimestamp(timestamp),
+            'amount': int(self.amounts[index]) / self.scale,
+            'type': TYPE_NAMES[self.types[index]],
+            'fee': int(self.fees[index]) / self.scale,
+            'counterparty': self.parties[party] if party >= 0 else None,
+            'usd_price': None if math.isnan(usd_price) else float(usd_price),
+            'asset': self.asset_names[asset] if asset else None,
+        }
+
+    def flows(self, index):
+        """{party: signed amount} of one transaction"""
+        start, end = self.flow_start[index], self.flow_start[index + 1]
+        return {self.parties[self.flow_party[i]]: int(self.flow_amount[i]) / self.scale for i in range(start, end)}
+
+    def counterparties(self, tx, address):
+        """Same contract as MultiCryptoAPI.counterparties, for rows of this table"""
+        return self.flows(tx['index'])
+
+    def time_range(self):
+        """(first, last) transaction datetimes, None when no timestamp is known"""
+        import numpy as np
+
+        timestamps = np.array(self.timestamps, dtype=np.float64)
+        timestamps = timestamps[~np.isnan(timestamps)]
+        if not len(timestamps):
+            return None, None
+        return datetime.fromtimestamp(timestamps.min()), datetime.fromtimestamp(timestamps.max())
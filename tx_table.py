@@ -0,0 +1,182 @@
+"""Virtualized transaction list for the GUI.
+
+A ttk.Treeview slows down with every row inserted into it, so the list
+only ever holds the rows that fit on screen. Scrolling re-fills those
+same items from the in-memory row table instead of moving the view, and
+the formatted values of the rows around the visible ones are kept in a
+small buffer so scrolling back and forth does not format them again.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTreeview:
+    """Drive a Treeview and its scrollbar from a row sequence.
+
+    `rows` is anything with len() and indexing; `format_row(row)` returns
+    the (values, tags) to show for one of them. Appending to `rows` and
+    calling rows_added() is all a producer has to do; redraws triggered
+    by many appends in a row are coalesced into one after_idle callback.
+    """
+
+    def __init__(self, tree, scrollbar, buffer=200):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.buffer = buffer
+        self.rows = []
+        self.format_row = None
+        self.first = 0
+        self.page = int(tree.cget('height'))
+        self.selected = None
+        self._formatted = {}
+        self._pending = None
+
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand='')
+        tree.bind('<Configure>', self.on_resize)
+        tree.bind('<<TreeviewSelect>>', self.on_select)
+        tree.bind('<MouseWheel>', self.on_wheel)
+        tree.bind('<Button-4>', self.on_wheel)
+        tree.bind('<Button-5>', self.on_wheel)
+        for key, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', 'page-'), ('<Next>', 'page+'),
+                          ('<Home>', 'home'), ('<End>', 'end')):
+            tree.bind(key, lambda event, step=step: self.on_key(step))
+
+    def set_rows(self, rows, format_row):
+        """Show a new row table, dropping everything kept for the previous one"""
+        self.rows = rows
+        self.format_row = format_row
+        self.first = 0
+        self.selected = None
+        self._formatted.clear()
+        self.refresh()
+
+    def reformat(self):
+        """Format the rows in view again, after values of rows already shown changed"""
+        self._formatted.clear()
+        self.refresh()
+
+    def clear(self):
+        self.set_rows([], None)
+
+    def rows_added(self):
+        """Schedule a redraw after rows were appended to the table"""
+        if self._pending is None:
+            self._pending = self.tree.after_idle(self._flush)
+
+    def _flush(self):
+        self._pending = None
+        self.refresh()
+
+    def row_index(self, item):
+        """Index in the row table of a Treeview item, None for blank space"""
+        if not item:
+            return None
+        index = self.first + self.tree.index(item)
+        return index if index < len(self.rows) else None
+
+    def row(self, item):
+        index = self.row_index(item)
+        return None if index is None else self.rows[index]
+
+    def refresh(self):
+        """Re-fill the Treeview items with the rows currently scrolled into view"""
+        total = len(self.rows)
+        self.first = max(0, min(self.first, total - self.page))
+        count = min(self.page, total - self.first)
+
+        items = self.tree.get_children()
+        if len(items) > count:
+            self.tree.delete(*items[count:])
+            items = items[:count]
+
+        # Keep only the formatted rows within the buffer around the view
+        low, high = self.first - self.buffer, self.first + self.page + self.buffer
+        if len(self._formatted) > 2 * (self.page + 2 * self.buffer):
+            self._formatted = {i: v for i, v in self._formatted.items() if low <= i < high}
+
+        selection = []
+        for offset in range(count):
+            index = self.first + offset
+            formatted = self._formatted.get(index)
+            if formatted is None:
+                formatted = self._formatted[index] = self.format_row(self.rows[index])
+            values, tags = formatted
+            if offset < len(items):
+                item = items[offset]
+                self.tree.item(item, values=values, tags=tags)
+            else:
+                item = self.tree.insert('', tk.END, values=values, tags=tags)
+            if index == self.selected:
+                selection.append(item)
+
+        if tuple(self.tree.selection()) != tuple(selection):
+            self.tree.selection_set(selection)
+
+        if total:
+            self.scrollbar.set(self.first / total, (self.first + count) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, first):
+        first = max(0, min(int(first), len(self.rows) - self.page))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def yview(self, *args):
+        """Scrollbar command, in row table coordinates"""
+        if args[0] == 'moveto':
+            self.scroll_to(float(args[1]) * len(self.rows))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self.page if args[2] == 'pages' else 1)
+            self.scroll_to(self.first + step)
+
+    def on_resize(self, event):
+        style = ttk.Style()
+        row_height = int(style.lookup('Treeview', 'rowheight') or 20)
+        items = self.tree.get_children()
+        if items:
+            bbox = self.tree.bbox(items[0])
+            if bbox:
+                row_height = bbox[3]
+        # The heading takes about one row
+        page = max(1, event.height // row_height - 1)
+        if page != self.page:
+            self.page = page
+            self.refresh()
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.selected = self.row_index(selection[0])
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return 'break'
+
+    def on_key(self, step):
+        total = len(self.rows)
+        if not total:
+            return 'break'
+        if step == 'home':
+            self.selected = 0
+        elif step == 'end':
+            self.selected = total - 1
+        elif step in ('page-', 'page+'):
+            direction = -1 if step == 'page-' else 1
+            self.selected = (self.first if self.selected is None else self.selected) + direction * self.page
+        else:
+            self.selected = (self.first if self.selected is None else self.selected + step)
+        self.selected = max(0, min(self.selected, total - 1))
+
+        # Scroll just enough to bring the selected row into view
+        if self.selected < self.first:
+            self.first = self.selected
+        elif self.selected >= self.first + self.page:
+            self.first = self.selected - self.page + 1
+        self.refresh()
+        return 'break'